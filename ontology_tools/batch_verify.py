@@ -1,50 +1,170 @@
 #!/usr/bin/env python3
 """
-Batch verify all ontology terms in a document.
+Batch verify all ontology terms in one or more documents.
+
+Documents can be given as files, directories (every *.md inside) or glob
+patterns. Terms from all documents are verified in one pass, so each
+ontology is loaded at most once however many documents are checked.
+
+Results are cached per term and ontology version (see
+verification_cache.py). On a rerun each document is diffed against the
+revision verified last time: only changed lines are re-read, only terms
+without a current cached result are looked up, and only report sections
+whose terms changed are rebuilt.
+
+Besides the slot checks, every term usage is run through the declarative
+rules in verification_rules.json (see rule_engine.py), which supply the
+critical errors, warnings and recommendations of each report.
+
+Secondary IDs (alt_id) and obsolete terms are listed with the current
+term to use instead, following replaced_by chains and falling back to
+the consider candidates. A term that is not found but carries a label in
+its YAML slot gets the best name matches for that label as replacement
+candidates, ranked by Lin similarity to the document's verified terms of
+the same ontology (see similarity.py). The ranking needs NumPy (pip
+install numpy), which is optional: it is imported on first use, and
+without it (or when a server did the search) candidates stay in
+name-match order.
+
+With --ndjson, results are also streamed as one JSON record per term
+occurrence and finding (see verification_records.py); the markdown
+reports are rendered from those same records.
 """
 
+import os
 import sys
-import re
+import json
+import glob
+import time
+import difflib
+import argparse
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Set
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple, Set
 from collections import defaultdict
-from verify_term import OntologyVerifier
+from verify_term import OntologyVerifier, REDIRECT_LABELS
+from ontology_client import get_client
+from ontology_parser import ALT_ID, OBSOLETE, MAX_REDIRECT_HOPS, follow_redirects, term_redirect
+from verification_cache import VerificationCache
+from curie_extractor import get_default_extractor
+from slot_validation import Finding, SlotRuleEngine
+from rule_engine import RuleEngine, build_usages, get_default_engine
+from verification_records import RecordWriter, document_records, results_from_records
 
 
-def extract_terms_from_file(file_path: str) -> Dict[str, List[int]]:
-    """Extract all ontology terms from a file with their line numbers"""
+# verification_results, term_definitions, terms_with_lines, slot and rule findings
+DocumentResult = Tuple[Dict[str, bool], Dict[str, str], Dict[str, List[int]], List[Finding]]
+
+# Replacement candidates listed per NOT FOUND term, and name matches ranked to choose them
+CANDIDATE_COUNT = 3
+CANDIDATE_POOL = 20
+
+# Combined summary of a multi-document run, unless --summary says otherwise
+DEFAULT_SUMMARY = Path('verification_summary.md')
+
+
+def extract_terms_from_lines(lines: List[str], line_numbers: Optional[Iterable[int]] = None
+                             ) -> Dict[str, List[int]]:
+    """Extract CURIEs from document lines (all, or only the given 1-based line numbers)"""
     terms = defaultdict(list)
+    extractor = get_default_extractor()
+    if line_numbers is None:
+        matches = extractor.extract(lines)
+    else:
+        matches = extractor.extract_lines(lines, line_numbers)
     
-    # Pattern to match ontology terms
-    # Matches patterns like OMP:0005009, CHEBI:12345, etc.
-    pattern = r'\b([A-Z]+:[0-9]+)\b'
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            matches = re.findall(pattern, line)
-            for match in matches:
-                terms[match].append(line_num)
+    for match in matches:
+        terms[match.curie].append(match.line)
     
     return dict(terms)
 
 
-def verify_document_terms(file_path: str) -> Tuple[Dict[str, bool], Dict[str, str]]:
-    """Verify all terms in a document"""
-    print(f"Extracting terms from {file_path}...")
-    terms_with_lines = extract_terms_from_file(file_path)
+def extract_terms_from_file(file_path: str) -> Dict[str, List[int]]:
+    """Extract all CURIEs from a file with their line numbers"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return extract_terms_from_lines(f)
+
+
+def verifiable_terms(term_ids: Iterable[str]) -> List[str]:
+    """Sorted term IDs whose prefix belongs to a configured ontology"""
+    prefixes = get_default_extractor().registry.ontology_prefixes
+    return sorted(term_id for term_id in term_ids if term_id.split(':')[0] in prefixes)
+
+
+def update_document_terms(old_lines: List[str], new_lines: List[str],
+                          old_terms_with_lines: Dict[str, List[int]]
+                          ) -> Tuple[Dict[str, List[int]], int]:
+    """Carry terms over from a previous revision, re-reading only changed lines
     
-    print(f"Found {len(terms_with_lines)} unique terms")
+    Returns the new revision's terms with line numbers and the number of
+    changed lines.
+    """
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    moved = {}
+    changed = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            for offset in range(i2 - i1):
+                moved[i1 + offset + 1] = j1 + offset + 1
+        else:
+            changed.extend(range(j1 + 1, j2 + 1))
     
-    # Load ontologies
-    verifier = OntologyVerifier()
-    verifier.load_all()
+    terms = defaultdict(list)
+    for term_id, line_nums in old_terms_with_lines.items():
+        for line_num in line_nums:
+            if line_num in moved:
+                terms[term_id].append(moved[line_num])
+    for term_id, line_nums in extract_terms_from_lines(new_lines, changed).items():
+        terms[term_id].extend(line_nums)
+    for line_nums in terms.values():
+        line_nums.sort()
+    return dict(terms), len(changed)
+
+
+def expand_document_paths(patterns: Iterable[str], exclude: Iterable[Path] = ()) -> List[Path]:
+    """Resolve files, directories and glob patterns to a de-duplicated list of documents
     
-    # Verify each term
+    Per-document reports, combined summaries under the default name and the
+    paths in exclude (such as this run's --summary) are left out.
+    """
+    paths = []
+    seen = {Path(path).resolve() for path in exclude}
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = [Path(match) for match in sorted(glob.glob(pattern, recursive=True))]
+        elif Path(pattern).is_dir():
+            matches = sorted(Path(pattern).glob('*.md'))
+        else:
+            matches = [Path(pattern)]
+        for path in matches:
+            # Reports from earlier runs are outputs, not documents to check
+            if path.is_dir() or path.stem.endswith('_verification_report') \
+                    or path.name == DEFAULT_SUMMARY.name:
+                continue
+            key = path.resolve()
+            if key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return paths
+
+
+def _collect_results(terms_with_lines: Dict[str, List[int]], terms: Dict[str, object],
+                     redirects: Optional[Dict[str, Dict[str, object]]] = None
+                     ) -> Tuple[Dict[str, bool], Dict[str, Dict[str, object]]]:
+    """Split verified terms into per-term status and definition info for one document
+    
+    CURIEs that were not looked up (no configured ontology) are left out.
+    Secondary and obsolete IDs carry their entry from redirects.
+    """
+    redirects = redirects or {}
     verification_results = {}
     term_definitions = {}
     
-    for term_id in sorted(terms_with_lines.keys()):
-        term = verifier.verify_term(term_id)
+    for term_id in sorted(terms_with_lines):
+        if term_id not in terms:
+            continue
+        term = terms[term_id]
         verification_results[term_id] = term is not None
         
         if term:
@@ -53,28 +173,386 @@ def verify_document_terms(file_path: str) -> Tuple[Dict[str, bool], Dict[str, st
                 'definition': term.definition,
                 'obsolete': term.is_obsolete
             }
+            if term_id in redirects:
+                term_definitions[term_id]['redirect'] = redirects[term_id]
+    
+    return verification_results, term_definitions
+
+
+def _lookup_terms(term_ids: List[str], verifier: OntologyVerifier,
+                  use_server: bool = True, workers: int = 1) -> Dict[str, object]:
+    """Verify term IDs in one batch, via a running server or a local verifier"""
+    client = get_client() if use_server else None
+    if client:
+        print(f"Verifying with ontology server at {client.url}")
+        return client.verify_terms(term_ids)
+    
+    # Ontologies are loaded on demand, so only prefixes used in the documents are parsed
+    if workers > 1:
+        names = {verifier.ontology_for_prefix(term_id.split(':')[0]) for term_id in term_ids}
+        verifier.preload(sorted(name for name in names if name), workers=workers)
+    loaded = len(verifier.load_times)
+    terms = verifier.verify_terms(term_ids)
+    # Reported once per batch that loads something; absent IDs rejected by a
+    # Bloom filter may leave nothing loaded at all
+    if len(verifier.load_times) > loaded:
+        report = verifier.format_load_report()
+    else:
+        report = verifier.format_filter_report() if not verifier.load_times else ''
+    if report:
+        print(report)
+    return terms
+
+
+def _resolve_redirects(terms: Dict[str, object], verifier: OntologyVerifier,
+                       use_server: bool = True, workers: int = 1,
+                       known: Optional[Dict[str, object]] = None) -> Dict[str, Dict[str, object]]:
+    """Suggested replacements for the secondary and obsolete IDs among looked-up terms
+    
+    The replacement IDs are looked up too, and theirs in turn for chains of
+    replaced_by, so each suggestion names a current term and its label.
+    known holds terms looked up before; replacements are only looked up if
+    missing there, and are added to it. Returns {term ID: {'kind': ...,
+    'replacements': [{'term': ..., 'name': ...}]}}.
+    """
+    redirected = [term_id for term_id, term in terms.items()
+                  if term is not None and (term.is_obsolete or term.id != term_id)]
+    if not redirected:
+        return {}
+    
+    known = {} if known is None else known
+    known.update(terms)
+    step = {term_id: terms[term_id] for term_id in redirected}
+    for _ in range(MAX_REDIRECT_HOPS):
+        pending = set()
+        for term_id, term in step.items():
+            redirect = term_redirect(term_id, term) if term is not None else None
+            if redirect:
+                pending.update(target for target in redirect.targets if target not in known)
+        if not pending:
+            break
+        step = _lookup_terms(sorted(pending), verifier, use_server, workers)
+        known.update(step)
+    
+    redirects = {}
+    for term_id in redirected:
+        redirect = follow_redirects(term_id, known.get)
+        redirects[term_id] = {
+            'kind': redirect.kind,
+            'replacements': [{'term': target, 'name': known[target].name if known.get(target) else ''}
+                             for target in redirect.targets],
+        }
+    return redirects
+
+
+def _similarity_engine(index):
+    """SimilarityEngine over an index's hierarchy, or None when NumPy is not installed"""
+    try:
+        from similarity import SimilarityEngine
+    except ImportError:
+        return None
+    return SimilarityEngine.for_index(index)
+
+
+def _suggest_candidates(verification_results: Dict[str, bool], labels: Dict[str, List[str]],
+                        terms: Dict[str, object], verifier: OntologyVerifier,
+                        use_server: bool = True, engines: Optional[Dict[str, object]] = None
+                        ) -> Dict[str, List[Dict[str, object]]]:
+    """Replacement candidates for the labelled NOT FOUND terms of one document
+    
+    Each label is searched in the term's own ontology; the matches are ranked
+    by mean Lin similarity to the document's verified terms of that ontology.
+    engines caches a SimilarityEngine per ontology across documents.
+    Returns {term ID: [{'term': ..., 'name': ..., 'score': float or None}]}.
+    """
+    engines = {} if engines is None else engines
+    client = None
+    suggestions = {}
+    for term_id, verified in verification_results.items():
+        if verified or not labels.get(term_id):
+            continue
+        name = verifier.ontology_for_prefix(term_id.split(':')[0])
+        if name is None:
+            continue
+        query = labels[term_id][0]
+        
+        client = client or (get_client() if use_server else None)
+        if client:
+            try:
+                matches = client.search(name, query, max_results=CANDIDATE_POOL)
+            except RuntimeError:
+                continue
+            suggestions[term_id] = [{'term': term.id, 'name': term.name, 'score': None}
+                                    for term in matches[:CANDIDATE_COUNT]]
+            continue
+        
+        index = verifier.ensure_loaded(name)
+        if index is None:
+            continue
+        matches = [term for term, _ in index.search_ranked(query, CANDIDATE_POOL) if not term.is_obsolete]
+        context = [terms[other].id for other, other_verified in verification_results.items()
+                   if other_verified and verifier.ontology_for_prefix(other.split(':')[0]) == name]
+        engine = engines.get(name) if context else None
+        if context and engine is None:
+            # Never cache a missing engine: later documents may have context
+            engine = _similarity_engine(index)
+            if engine is not None:
+                engines[name] = engine
+        if engine is not None:
+            ranked = engine.rank_candidates([term.id for term in matches], context)
+        else:
+            ranked = [(term.id, None) for term in matches]
+        suggestions[term_id] = [{'term': candidate, 'name': index.terms[candidate].name, 'score': score}
+                                for candidate, score in ranked[:CANDIDATE_COUNT]]
+    return suggestions
+
+
+def verify_document_terms(file_path: str, use_server: bool = True) -> Tuple[Dict[str, bool], Dict[str, str]]:
+    """Verify all terms in a document
+    
+    Terms are sent to a running ontology server in one batch when there is
+    one; otherwise the needed ontologies are loaded locally.
+    """
+    print(f"Extracting terms from {file_path}...")
+    terms_with_lines = extract_terms_from_file(file_path)
+    
+    print(f"Found {len(terms_with_lines)} unique terms")
+    
+    verifier = OntologyVerifier(lazy=True)
+    terms = _lookup_terms(verifiable_terms(terms_with_lines), verifier, use_server)
+    redirects = _resolve_redirects(terms, verifier, use_server)
+    verification_results, term_definitions = _collect_results(terms_with_lines, terms, redirects)
     
     return verification_results, term_definitions, terms_with_lines
 
 
+def _term_versions(term_ids: Iterable[str], verifier: OntologyVerifier) -> Dict[str, str]:
+    """Content hash of the ontology file each term is verified against
+    
+    Terms whose prefix has no configured ontology are left out. Digests come
+    from the cache each ontology is loaded through, so a per-ontology
+    cache_dir in the registry is honoured.
+    """
+    digests = {}
+    versions = {}
+    for term_id in term_ids:
+        name = verifier.ontology_for_prefix(term_id.split(':')[0])
+        if name is None:
+            continue
+        if name not in digests:
+            file_path = verifier.ontology_paths[name]
+            cache = verifier.cache_for(name)
+            digests[name] = cache.source_digest(file_path) if file_path.exists() else 'missing'
+        versions[term_id] = digests[name]
+    return versions
+
+
+def _read_document(path: Path, result_cache: Optional[VerificationCache]
+                   ) -> Tuple[List[str], Dict[str, List[int]], Optional[int]]:
+    """Read a document and its terms, diffing against the cached revision if there is one"""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    previous = result_cache.document(path) if result_cache else None
+    if previous is None:
+        return lines, extract_terms_from_lines(lines), None
+    terms_with_lines, changed = update_document_terms(
+        previous['lines'], lines, previous['terms_with_lines'])
+    return lines, terms_with_lines, changed
+
+
+def verify_documents(paths: List[Path], use_server: bool = True, workers: int = 1,
+                     verifier: Optional[OntologyVerifier] = None,
+                     result_cache: Optional[VerificationCache] = None,
+                     rules: Optional[RuleEngine] = None
+                     ) -> Dict[Path, DocumentResult]:
+    """Verify the terms of several documents with one load of each ontology
+    
+    Returns (verification_results, term_definitions, terms_with_lines) per
+    document, as verify_document_terms does for a single one, followed by
+    the slot findings for the document's YAML blocks and the findings of
+    the declarative rules (default: verification_rules.json). With a result_cache,
+    only terms lacking a result for the current ontology version are
+    looked up, and each document's new revision is recorded.
+    """
+    return dict(iter_verified_documents(paths, use_server, workers, verifier, result_cache, rules))
+
+
+def iter_verified_documents(paths: List[Path], use_server: bool = True, workers: int = 1,
+                            verifier: Optional[OntologyVerifier] = None,
+                            result_cache: Optional[VerificationCache] = None,
+                            rules: Optional[RuleEngine] = None
+                            ) -> Iterator[Tuple[Path, DocumentResult]]:
+    """Like verify_documents, but verify and yield one document at a time
+    
+    Each document's terms are looked up as it is reached, skipping those
+    already looked up for an earlier document; the verifier keeps every
+    ontology it loads, so each is still loaded at most once. The next
+    document is read while the current one is checked.
+    """
+    use_server = use_server and verifier is None
+    verifier = verifier or OntologyVerifier(lazy=True)
+    engine = SlotRuleEngine()
+    rules = rules or get_default_engine()
+    similarity_engines = {}
+    # Every term looked up so far, including redirect targets
+    terms: Dict[str, object] = {}
+    
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        reading = pool.submit(_read_document, paths[0], result_cache) if paths else None
+        for i, path in enumerate(paths):
+            lines, terms_with_lines, changed = reading.result()
+            reading = pool.submit(_read_document, paths[i + 1], result_cache) if i + 1 < len(paths) else None
+            
+            term_ids = verifiable_terms(terms_with_lines)
+            new_ids = [term_id for term_id in term_ids if term_id not in terms]
+            print(f"{path}: {len(term_ids)} ontology terms, {len(new_ids)} not yet looked up")
+            if result_cache is None:
+                if new_ids:
+                    terms.update(_lookup_terms(new_ids, verifier, use_server, workers))
+            else:
+                if changed is not None:
+                    print(f"  {changed} changed lines since the last verified revision")
+                versions = _term_versions(new_ids, verifier)
+                pending = [term_id for term_id in new_ids
+                           if term_id not in versions or not result_cache.has(term_id, versions[term_id])]
+                print(f"  reusing {len(new_ids) - len(pending)} cached results, verifying {len(pending)} terms")
+                found = _lookup_terms(pending, verifier, use_server, workers) if pending else {}
+                for term_id in new_ids:
+                    if term_id in found:
+                        terms[term_id] = found[term_id]
+                        if term_id in versions:
+                            result_cache.put(term_id, versions[term_id], found[term_id])
+                    else:
+                        terms[term_id] = result_cache.get(term_id, versions[term_id])
+                previous = result_cache.document(path)
+                sections = previous['sections'] if previous else {}
+                result_cache.set_document(path, lines, terms_with_lines, sections)
+            
+            document_terms = {term_id: terms[term_id] for term_id in term_ids}
+            redirects = _resolve_redirects(document_terms, verifier, use_server, workers, terms)
+            verification_results, term_definitions = _collect_results(terms_with_lines, document_terms, redirects)
+            
+            # Slot checks and rules reuse the lookups above
+            values, findings = engine.parse_document(lines)
+            findings.extend(engine.check(values, document_terms))
+            labels = defaultdict(list)
+            for value in values:
+                if value.label:
+                    for curie in value.curies:
+                        labels[curie].append(value.label)
+            candidates = _suggest_candidates(verification_results, labels, document_terms, verifier,
+                                             use_server, similarity_engines)
+            for term_id, suggestions in candidates.items():
+                if suggestions:
+                    term_definitions[term_id] = {'candidates': suggestions}
+            findings.extend(rules.check(build_usages(lines, terms_with_lines, document_terms, labels)))
+            findings.sort(key=lambda finding: finding.line)
+            yield path, (verification_results, term_definitions, terms_with_lines, findings)
+
+
+def _format_redirect(redirect: Dict[str, object]) -> str:
+    """'Replaced by `ID` (label)' text for a redirect entry of term_definitions"""
+    targets = ', '.join(f"`{target['term']}` ({target['name']})" if target['name'] else f"`{target['term']}`"
+                        for target in redirect['replacements'])
+    return f"{REDIRECT_LABELS[redirect['kind']]} {targets}"
+
+
+def _format_candidate(candidate: Dict[str, object]) -> str:
+    """'`ID` (label, similarity)' text for a replacement candidate of a NOT FOUND term"""
+    details = [detail for detail in (candidate['name'],
+                                     f"similarity {candidate['score']:.2f}" if candidate['score'] is not None else '')
+               if detail]
+    return f"`{candidate['term']}` ({', '.join(details)})" if details else f"`{candidate['term']}`"
+
+
+def _ontology_section(
+    ontology: str,
+    terms: List[Tuple[str, bool]],
+    term_definitions: Dict[str, str],
+    terms_with_lines: Dict[str, List[int]]
+) -> List[str]:
+    """Report lines for the terms of one ontology"""
+    report = []
+    verified = sum(1 for _, v in terms if v)
+    total = len(terms)
+    
+    report.append(f"\n### {ontology} ({verified}/{total} verified)")
+    
+    # Show verified terms first
+    verified_terms = [(t, v) for t, v in terms if v]
+    if verified_terms:
+        report.append("\n**Verified Terms:**")
+        for term_id, _ in sorted(verified_terms):
+            lines = terms_with_lines[term_id]
+            line_str = f"lines {', '.join(map(str, lines[:5]))}"
+            if len(lines) > 5:
+                line_str += f" and {len(lines)-5} more"
+            
+            term_info = term_definitions.get(term_id, {})
+            name = term_info.get('name', '')
+            obsolete = term_info.get('obsolete', False)
+            
+            redirect = term_info.get('redirect')
+            
+            status = "✅"
+            if obsolete:
+                status = "⚠️ OBSOLETE"
+            elif redirect and redirect['kind'] == ALT_ID:
+                status = "⚠️ SECONDARY ID"
+            
+            entry = f"- {status} `{term_id}`: {name} ({line_str})"
+            if redirect and redirect['replacements']:
+                entry += f" → {_format_redirect(redirect)}"
+            elif redirect and redirect['kind'] == OBSOLETE:
+                entry += " → no replacement given"
+            report.append(entry)
+    
+    # Show unverified terms
+    unverified_terms = [(t, v) for t, v in terms if not v]
+    if unverified_terms:
+        report.append("\n**NOT FOUND:**")
+        for term_id, _ in sorted(unverified_terms):
+            lines = terms_with_lines[term_id]
+            line_str = f"lines {', '.join(map(str, lines[:5]))}"
+            if len(lines) > 5:
+                line_str += f" and {len(lines)-5} more"
+            entry = f"- ❌ `{term_id}` ({line_str})"
+            candidates = term_definitions.get(term_id, {}).get('candidates')
+            if candidates:
+                entry += " → candidates: " + ', '.join(_format_candidate(candidate) for candidate in candidates)
+            report.append(entry)
+    
+    return report
+
+
 def generate_verification_report(
     file_path: str, 
     verification_results: Dict[str, bool], 
     term_definitions: Dict[str, str],
-    terms_with_lines: Dict[str, List[int]]
+    terms_with_lines: Dict[str, List[int]],
+    section_cache: Optional[Dict[str, object]] = None,
+    findings: Optional[List[Finding]] = None,
+    advice: Optional[Dict[str, Dict[str, object]]] = None
 ) -> str:
-    """Generate a detailed verification report"""
+    """Generate a detailed verification report
+    
+    section_cache maps each ontology prefix to its last rendered section;
+    sections whose terms are unchanged are reused from it. findings are
+    the slot and rule findings for the document; advice maps the advice
+    keys of rule findings to the blocks shown under Recommendations
+    (default: those of verification_rules.json).
+    """
     report = []
-    report.append(f"# Ontology Term Verification Report")
+    report.append("# Ontology Term Verification Report")
     report.append(f"\n**Document**: {file_path}")
-    report.append(f"**Date**: 2025-01-03")
+    report.append("**Date**: 2025-01-03")
     report.append(f"**Total unique terms**: {len(verification_results)}")
     
     # Summary statistics
     verified_count = sum(1 for v in verification_results.values() if v)
     unverified_count = len(verification_results) - verified_count
     
-    report.append(f"\n## Summary")
+    report.append("\n## Summary")
     report.append(f"- ✅ Verified: {verified_count} terms")
     report.append(f"- ❌ Not found: {unverified_count} terms")
     
@@ -85,124 +563,265 @@ def generate_verification_report(
         by_ontology[prefix].append((term_id, verified))
     
     # Detailed results by ontology
-    report.append(f"\n## Detailed Results by Ontology")
+    report.append("\n## Detailed Results by Ontology")
     
     for ontology in sorted(by_ontology.keys()):
         terms = by_ontology[ontology]
-        verified = sum(1 for _, v in terms if v)
-        total = len(terms)
-        
-        report.append(f"\n### {ontology} ({verified}/{total} verified)")
+        if section_cache is None:
+            report.extend(_ontology_section(ontology, terms, term_definitions, terms_with_lines))
+            continue
         
-        # Show verified terms first
-        verified_terms = [(t, v) for t, v in terms if v]
-        if verified_terms:
-            report.append("\n**Verified Terms:**")
-            for term_id, _ in sorted(verified_terms):
-                lines = terms_with_lines[term_id]
-                line_str = f"lines {', '.join(map(str, lines[:5]))}"
-                if len(lines) > 5:
-                    line_str += f" and {len(lines)-5} more"
-                
-                term_info = term_definitions.get(term_id, {})
-                name = term_info.get('name', '')
-                obsolete = term_info.get('obsolete', False)
-                
-                status = "✅"
-                if obsolete:
-                    status = "⚠️ OBSOLETE"
-                    
-                report.append(f"- {status} `{term_id}`: {name} ({line_str})")
-        
-        # Show unverified terms
-        unverified_terms = [(t, v) for t, v in terms if not v]
-        if unverified_terms:
-            report.append("\n**NOT FOUND:**")
-            for term_id, _ in sorted(unverified_terms):
-                lines = terms_with_lines[term_id]
-                line_str = f"lines {', '.join(map(str, lines[:5]))}"
-                if len(lines) > 5:
-                    line_str += f" and {len(lines)-5} more"
-                report.append(f"- ❌ `{term_id}` ({line_str})")
-    
-    # Special section for critical errors
-    critical_errors = []
-    
-    # Check for OMP:0005009 specifically
-    if 'OMP:0005009' in verification_results:
-        if verification_results['OMP:0005009']:
-            term_info = term_definitions.get('OMP:0005009', {})
-            if 'acidophile' in term_info.get('name', '').lower():
-                critical_errors.append(
-                    "- **OMP:0005009** is 'acidophile' (pH phenotype) but document uses it as 'hexose utilization'"
-                )
+        # Reuse the rendered section unless one of its terms or line numbers changed
+        key = tuple((term_id, verified, term_definitions.get(term_id), tuple(terms_with_lines[term_id]))
+                    for term_id, verified in sorted(terms))
+        cached = section_cache.get(ontology)
+        if cached is None or cached[0] != key:
+            cached = (key, _ontology_section(ontology, terms, term_definitions, terms_with_lines))
+            section_cache[ontology] = cached
+        report.extend(cached[1])
+    
+    if section_cache is not None:
+        for ontology in set(section_cache) - set(by_ontology):
+            del section_cache[ontology]
+    
+    # Identifiers without an ontology to check them against
+    others = defaultdict(list)
+    for term_id in terms_with_lines:
+        if term_id not in verification_results:
+            others[term_id.split(':')[0]].append(term_id)
+    if others:
+        report.append("\n## Other Identifiers (not verified)")
+        for prefix in sorted(others):
+            term_ids = sorted(others[prefix])
+            examples = ', '.join(f"`{term_id}`" for term_id in term_ids[:5])
+            if len(term_ids) > 5:
+                examples += f" and {len(term_ids) - 5} more"
+            report.append(f"- {prefix}: {examples}")
+    
+    # Secondary and obsolete IDs with a current term to use instead
+    replaceable = sorted(term_id for term_id, info in term_definitions.items()
+                         if info.get('redirect') and info['redirect']['replacements'])
+    if replaceable:
+        report.append("\n## Suggested Replacements")
+        report.append(f"\nSingle replacements can be applied with `term_upgrade.py {file_path} --in-place`.")
+        report.append("\n| Term | Lines | Suggestion |")
+        report.append("|---|---|---|")
+        for term_id in replaceable:
+            lines = ', '.join(map(str, terms_with_lines.get(term_id, [])))
+            report.append(f"| `{term_id}` | {lines} | {_format_redirect(term_definitions[term_id]['redirect'])} |")
+    
+    # Special section for critical errors: slot rule violations, labels
+    # that do not match the term an ID points at, and error rules
+    findings = findings or []
+    critical_errors = [f"- line {finding.line} `{finding.slot}`: {finding.message}"
+                       for finding in findings if finding.severity == 'error']
     
     if critical_errors:
         report.append("\n## ⚠️ CRITICAL ERRORS")
         report.extend(critical_errors)
     
-    # Recommendations
+    warnings = [f"- line {finding.line}: {finding.message}"
+                for finding in findings if finding.severity == 'warning']
+    if warnings:
+        report.append("\n## Warnings")
+        report.extend(warnings)
+    
+    # Recommendations: one block per advice key used by a rule finding,
+    # followed by the term-specific suggestions
     report.append("\n## Recommendations")
     
-    if unverified_count > 0:
-        report.append(f"\n### Terms Requiring Replacement:")
-        
-        # Group unverified terms by what they might be
-        carbon_terms = []
-        other_terms = []
-        
+    advice = get_default_engine().advice if advice is None else advice
+    advised = defaultdict(list)
+    for finding in findings:
+        key = getattr(finding, 'advice', None)
+        if key in advice and finding.curie not in advised[key]:
+            advised[key].append(finding.curie)
+    for key, term_ids in advised.items():
+        report.append(f"\n**{advice[key]['title']}** ({', '.join(f'`{term_id}`' for term_id in term_ids)})")
+        report.extend(advice[key]['lines'])
+    
+    suggestions = [f"- line {finding.line}: {finding.message}" for finding in findings
+                   if finding.severity == 'recommendation' and getattr(finding, 'advice', None) is None]
+    if suggestions:
+        report.append("")
+        report.extend(suggestions)
+    
+    return '\n'.join(report)
+
+
+def generate_combined_summary(results: Dict[Path, DocumentResult]) -> str:
+    """Generate a cross-document summary of verification results"""
+    report = []
+    report.append("# Combined Ontology Term Verification Summary")
+    report.append(f"\n**Documents**: {len(results)}")
+    
+    all_terms = {}
+    documents_by_term = defaultdict(list)
+    for path, (verification_results, *_) in results.items():
         for term_id, verified in verification_results.items():
-            if not verified:
-                if term_id in ['OMP:0005040', 'OMP:0005001', 'OMP:0005135']:
-                    if 'utilization' in str(terms_with_lines):
-                        carbon_terms.append(term_id)
-                    else:
-                        other_terms.append(term_id)
-        
-        if carbon_terms:
-            report.append("\n**Carbon utilization phenotypes:** Use post-composition approach")
-            report.append("```yaml")
-            report.append('id: "[PLACEHOLDER: carbon utilization phenotype]"')
-            report.append('extension: "RO:0002503 towards CHEBI:xxxxx"  # specific compound')
-            report.append("```")
-        
-        if other_terms:
-            report.append("\n**Other phenotypes:** Search for appropriate terms or request new ones")
+            all_terms[term_id] = verified
+            documents_by_term[term_id].append(path)
+    verified_count = sum(1 for v in all_terms.values() if v)
+    report.append(f"**Total unique terms**: {len(all_terms)}")
+    report.append(f"- ✅ Verified: {verified_count} terms")
+    report.append(f"- ❌ Not found: {len(all_terms) - verified_count} terms")
+    
+    report.append("\n## Per-Document Results")
+    report.append("\n| Document | Unique terms | Verified | Not found | Errors |")
+    report.append("|---|---|---|---|---|")
+    for path, (verification_results, _, _, findings) in results.items():
+        verified = sum(1 for v in verification_results.values() if v)
+        errors = sum(1 for finding in findings if finding.severity == 'error')
+        report.append(f"| {path} | {len(verification_results)} | {verified} | "
+                      f"{len(verification_results) - verified} | {errors} |")
+    
+    not_found = sorted(term_id for term_id, verified in all_terms.items() if not verified)
+    if not_found:
+        report.append("\n## Terms Not Found")
+        report.append("\nMost widely used first:")
+        for term_id in sorted(not_found, key=lambda term_id: (-len(documents_by_term[term_id]), term_id)):
+            documents = ', '.join(str(path) for path in documents_by_term[term_id])
+            report.append(f"- ❌ `{term_id}` ({len(documents_by_term[term_id])} documents: {documents})")
     
     return '\n'.join(report)
 
 
+def write_document_report(path: Path, verification_results: Dict[str, bool],
+                          term_definitions: Dict[str, str],
+                          terms_with_lines: Dict[str, List[int]],
+                          findings: Optional[List[Finding]] = None,
+                          section_cache: Optional[Dict[str, object]] = None,
+                          advice: Optional[Dict[str, Dict[str, object]]] = None) -> Path:
+    """Generate and save the report for one document next to it"""
+    report = generate_verification_report(
+        str(path), verification_results, term_definitions, terms_with_lines, section_cache,
+        findings, advice
+    )
+    report_path = path.parent / f"{path.stem}_verification_report.md"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(report)
+    return report_path
+
+
 def main():
     """Main batch verification function"""
-    if len(sys.argv) < 2:
-        print("Usage: batch_verify.py <document_path>")
-        print("Example: batch_verify.py ../ontology_annotation_examples_v4.md")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description='Verify every ontology term in one or more documents',
+        epilog='Example: batch_verify.py ../ontology_annotation_examples_v*.md ../archive')
+    parser.add_argument('documents', nargs='+', metavar='document',
+                       help='Document files, directories (all *.md inside) or glob patterns')
+    parser.add_argument('--no-server', action='store_true',
+                       help='Load ontologies locally even if an ontology server is running')
+    parser.add_argument('--workers', '-j', type=int, default=1,
+                       help='Worker processes for loading several ontologies at once')
+    parser.add_argument('--summary', type=Path,
+                       help='Where to write the combined summary when checking several documents '
+                            '(default: verification_summary.md in the current directory)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Re-verify every term instead of reusing cached results')
+    parser.add_argument('--rules', type=Path,
+                       help='Declarative rules file (default: verification_rules.json)')
+    parser.add_argument('--ndjson', metavar='PATH',
+                       help='Stream one JSON record per term occurrence and finding to PATH '
+                            '(- for stdout; see verification_records.py)')
+    parser.add_argument('--json-summary', type=Path, metavar='PATH',
+                       help='Write the run summary as JSON to PATH')
+    parser.add_argument('--no-markdown', action='store_true',
+                       help='Do not write markdown reports (useful with --ndjson)')
     
-    file_path = sys.argv[1]
-    if not Path(file_path).exists():
-        print(f"Error: File not found: {file_path}")
+    args = parser.parse_args()
+    
+    paths = expand_document_paths(args.documents, exclude=[args.summary or DEFAULT_SUMMARY])
+    missing = [path for path in paths if not path.exists()]
+    if missing:
+        for path in missing:
+            print(f"Error: File not found: {path}")
+        sys.exit(1)
+    if not paths:
+        print("Error: No documents matched")
         sys.exit(1)
     
-    # Verify all terms
-    verification_results, term_definitions, terms_with_lines = verify_document_terms(file_path)
+    # With records on stdout, progress messages go to stderr
+    if args.ndjson == '-':
+        stdout = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            run_verification(args, paths, stdout)
+    elif args.ndjson:
+        with open(args.ndjson, 'w', encoding='utf-8') as f:
+            run_verification(args, paths, f)
+    else:
+        run_verification(args, paths, None)
+
+
+def run_verification(args: argparse.Namespace, paths: List[Path], ndjson: Optional[IO[str]]):
+    """Verify documents, streaming records and writing reports as each document is done"""
+    start = time.perf_counter()
+    result_cache = None if args.no_cache else VerificationCache()
+    rules = RuleEngine.load(args.rules) if args.rules else get_default_engine()
+    writer = RecordWriter(ndjson)
+    write_markdown = not args.no_markdown
     
-    # Generate report
-    report = generate_verification_report(
-        file_path, verification_results, term_definitions, terms_with_lines
-    )
+    # Markdown reports are rendered from the same records that are streamed
+    def write_report(path: Path, result: DocumentResult) -> Path:
+        sections = result_cache.document(path)['sections'] if result_cache else None
+        return write_document_report(path, *result, section_cache=sections, advice=rules.advice)
     
-    # Save report
-    report_path = Path(file_path).parent / f"{Path(file_path).stem}_verification_report.md"
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(report)
+    results = {}
+    documents = {}
+    reports = {}
+    
+    def write_records(path: Path, result: DocumentResult) -> Iterator[Dict[str, object]]:
+        """Write each record of a document as it is produced, passing it on"""
+        for record in document_records(path, result):
+            writer.write(record)
+            if record['type'] == 'document':
+                documents[path] = record
+            yield record
+        writer.flush()
+    
+    with ThreadPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as pool:
+        for path, result in iter_verified_documents(paths, use_server=not args.no_server,
+                                                    workers=args.workers, result_cache=result_cache,
+                                                    rules=rules):
+            records = write_records(path, result)
+            if write_markdown:
+                results[path] = results_from_records(records)[path]
+                reports[path] = pool.submit(write_report, path, results[path])
+            else:
+                for _ in records:
+                    pass
+        report_paths = {path: future.result() for path, future in reports.items()}
+    if result_cache:
+        try:
+            result_cache.save()
+        except OSError as e:
+            print(f"Warning: could not write verification cache {result_cache.path}: {e}")
+    elapsed = time.perf_counter() - start
     
-    print(f"\nVerification report saved to: {report_path}")
+    summary = writer.summary(elapsed)
+    writer.write_all([summary])
+    if args.json_summary:
+        with open(args.json_summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"JSON summary saved to: {args.json_summary}")
+    
+    print()
+    for path, document in documents.items():
+        destination = f" -> {report_paths[path]}" if path in report_paths else ''
+        print(f"{path}: {document['verified']}/{document['terms']} terms verified, "
+              f"{document['errors']} errors{destination}")
+    
+    if write_markdown and len(paths) > 1:
+        summary_path = args.summary or DEFAULT_SUMMARY
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write(generate_combined_summary(results))
+        print(f"\nCombined summary saved to: {summary_path}")
     
     # Print summary
-    verified_count = sum(1 for v in verification_results.values() if v)
-    print(f"\nSummary: {verified_count}/{len(verification_results)} terms verified")
+    term_count = sum(document['terms'] for document in documents.values())
+    print(f"\nVerified {term_count} document terms in {len(paths)} documents in {elapsed:.2f}s "
+          f"({term_count / elapsed:.0f} terms/sec, {len(paths) / elapsed:.2f} documents/sec)")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
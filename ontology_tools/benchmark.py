@@ -0,0 +1,791 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for the ontology tools.
+
+Each subcommand times one part of the pipeline against real ontology files
+(by default every configured ontology that exists on disk).
+"""
+
+import re
+import sys
+import time
+import pickle
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+from ontology_cache import OntologyCache
+from text_tokenizer import Tokenizer
+from ontology_parser import OBOParser, OWLParser, OntologyTerm, TERM_FIELDS, build_index, pack_terms, parse_ontology, unpack_terms
+
+
+def _default_files() -> List[Path]:
+    """Registered ontology files that exist on disk"""
+    from ontology_registry import get_default_registry
+    return [p for p in get_default_registry().paths().values() if p.exists()]
+
+
+def _resolve_files(files: List[str]) -> List[Path]:
+    """Turn CLI arguments into existing ontology paths"""
+    paths = [Path(f) for f in files] if files else _default_files()
+    missing = [p for p in paths if not p.exists()]
+    for p in missing:
+        print(f"Skipping missing file: {p}")
+    return [p for p in paths if p.exists()]
+
+
+def _timed(func, *args, **kwargs):
+    """Run func and return (result, seconds)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_cache(files: List[Path]) -> List[Dict[str, object]]:
+    """Compare a cold parse with a warm snapshot load for each ontology"""
+    rows = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = OntologyCache(Path(cache_dir))
+        for file_path in files:
+            index, cold = _timed(lambda: build_index(parse_ontology(str(file_path), use_cache=False)))
+            cache.store_index(file_path, index)
+            warm_index, warm = _timed(cache.load_index, file_path)
+            assert len(warm_index.terms) == len(index.terms)
+            rows.append({
+                'file': file_path.name,
+                'terms': len(index.terms),
+                'cold_s': cold,
+                'warm_s': warm,
+                'speedup': cold / warm if warm else float('inf'),
+                'snapshot_mb': sum(cache.entry_path(file_path, kind).stat().st_size
+                                   for kind in ('terms', 'index')) / (1024 * 1024),
+            })
+    return rows
+
+
+def _peak_memory(func, *args, **kwargs):
+    """Run func under tracemalloc and return (result, seconds, peak MB)"""
+    tracemalloc.start()
+    try:
+        result, elapsed = _timed(func, *args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+
+def bench_owl(files: List[Path]) -> List[Dict[str, object]]:
+    """Compare streaming and whole-tree OWL parsing for speed, memory and output"""
+    rows = []
+    for file_path in files:
+        if file_path.suffix != '.owl':
+            continue
+        tree_terms, tree_s, tree_mb = _peak_memory(OWLParser(file_path, streaming=False).parse)
+        stream_terms, stream_s, stream_mb = _peak_memory(OWLParser(file_path).parse)
+        rows.append({
+            'file': file_path.name,
+            'terms': len(stream_terms),
+            'tree_s': tree_s,
+            'stream_s': stream_s,
+            'tree_peak_mb': tree_mb,
+            'stream_peak_mb': stream_mb,
+            'identical': pack_terms(tree_terms) == pack_terms(stream_terms),
+        })
+    return rows
+
+
+class _DictTerm:
+    """The original OntologyTerm layout: instance __dict__ and list fields"""
+    def __init__(self, *values):
+        for field, value in zip(TERM_FIELDS, values):
+            setattr(self, field, list(value) if isinstance(value, tuple) else value)
+
+
+def _retained_bytes(blob: bytes, build) -> int:
+    """Bytes still allocated after building terms from freshly unpickled columns"""
+    tracemalloc.start()
+    try:
+        columns = pickle.loads(blob)
+        terms = build(columns)
+        del columns
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del terms
+    return current
+
+
+def bench_terms(files: List[Path]) -> List[Dict[str, object]]:
+    """Bytes per term for the dict/list layout versus slotted, tuple-backed terms"""
+    def build_legacy(columns):
+        return {row[0]: _DictTerm(*row) for row in zip(*(columns[f] for f in TERM_FIELDS))}
+    
+    rows = []
+    for file_path in files:
+        terms = parse_ontology(str(file_path), use_cache=False)
+        if not terms:
+            continue
+        blob = pickle.dumps(pack_terms(terms), protocol=pickle.HIGHEST_PROTOCOL)
+        before = _retained_bytes(blob, build_legacy)
+        after = _retained_bytes(blob, unpack_terms)
+        rows.append({
+            'file': file_path.name,
+            'terms': len(terms),
+            'before_b_per_term': before / len(terms),
+            'after_b_per_term': after / len(terms),
+            'saved_pct': 100.0 * (before - after) / before,
+        })
+    return rows
+
+
+def bench_search(files: List[Path], queries: List[str], k: int = 20) -> List[Dict[str, object]]:
+    """Average query latency of the unranked keyword union versus top-k BM25"""
+    rows = []
+    for file_path in files:
+        index = build_index(parse_ontology(str(file_path)))
+        for query in queries:
+            _, union_s = _timed(lambda: sorted(index.search_by_keyword(query), key=lambda t: t.id))
+            ranked, ranked_s = _timed(index.search_ranked, query, k)
+            rows.append({
+                'file': file_path.name,
+                'query': query,
+                'union_matches': len(index.search_by_keyword(query)),
+                'union_ms': union_s * 1000,
+                'bm25_ms': ranked_s * 1000,
+                'top_hit': ranked[0][0].id if ranked else '-',
+            })
+    return rows
+
+
+class _SplitTokenizer(Tokenizer):
+    """The original whitespace tokenization, for comparison"""
+    def tokenize(self, text: str) -> List[str]:
+        return text.lower().split()
+
+
+def bench_index(files: List[Path]) -> List[Dict[str, object]]:
+    """add_terms throughput with whitespace splitting versus the shared tokenizer"""
+    tokenizers = {
+        'split': _SplitTokenizer(),
+        'tokenizer': Tokenizer(),
+        'tokenizer+stem': Tokenizer(stem=True),
+    }
+    rows = []
+    for file_path in files:
+        terms = parse_ontology(str(file_path))
+        if not terms:
+            continue
+        for label, tokenizer in tokenizers.items():
+            index, seconds = _timed(build_index, terms, tokenizer)
+            rows.append({
+                'file': file_path.name,
+                'tokenizer': label,
+                'terms': len(terms),
+                'seconds': seconds,
+                'terms_per_s': len(terms) / seconds,
+                'vocabulary': len(index.postings),
+            })
+    return rows
+
+
+def bench_lookup(files: List[Path], queries: List[str], max_distance: int = 2) -> List[Dict[str, object]]:
+    """Latency of prefix and fuzzy name lookup, including first-use build time"""
+    rows = []
+    for file_path in files:
+        index = build_index(parse_ontology(str(file_path)))
+        _, prefix_build = _timed(index.search_prefix, 'zz', 1)
+        _, fuzzy_build = _timed(index.search_fuzzy, 'zz', 0, 1)
+        for query in queries:
+            prefix_hits, prefix_s = _timed(index.search_prefix, query)
+            fuzzy_hits, fuzzy_s = _timed(index.search_fuzzy, query, max_distance)
+            rows.append({
+                'file': file_path.name,
+                'query': query,
+                'prefix_build_ms': prefix_build * 1000,
+                'prefix_ms': prefix_s * 1000,
+                'prefix_hits': len(prefix_hits),
+                'fuzzy_build_ms': fuzzy_build * 1000,
+                'fuzzy_ms': fuzzy_s * 1000,
+                'fuzzy_hits': len(fuzzy_hits),
+            })
+    return rows
+
+
+def bench_server(url: str, term_ids: List[str], requests: int, concurrency: int,
+                 batch: int) -> Dict[str, object]:
+    """Load-test a running ontology server with batched /verify requests"""
+    import random
+    import threading
+    from ontology_client import OntologyClient
+    
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    per_thread = max(1, requests // concurrency)
+    
+    def worker(seed: int):
+        rng = random.Random(seed)
+        client = OntologyClient(url)
+        local = []
+        for _ in range(per_thread):
+            ids = [rng.choice(term_ids) for _ in range(batch)]
+            start = time.perf_counter()
+            try:
+                client.verify_terms(ids)
+            except (OSError, RuntimeError):
+                with lock:
+                    errors[0] += 1
+                continue
+            local.append(time.perf_counter() - start)
+        client.close()
+        with lock:
+            latencies.extend(local)
+    
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+    
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'concurrency': concurrency,
+        'batch': batch,
+        'req_per_s': len(latencies) / elapsed,
+        'terms_per_s': len(latencies) * batch / elapsed,
+        'p50_ms': percentile(0.50),
+        'p99_ms': percentile(0.99),
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+_SYNTHETIC_LINES = [
+    '## Phenotype {i}: growth on CHEBI:{n} (see PMID:{n})\n',
+    '  - id: "OMP:{n:07d}"  # observed 2024-01-03T12:30:45Z by ANL:562.{n}\n',
+    '    extension: "RO:0002503 towards CHEBI:{n}; modelseed.compound:cpd{n:05d}"\n',
+    '    organism: NCBITaxon:{n}  gene: EcoGene:EG{n:05d}  mco:has_condition: MCO:{n:07d}\n',
+    'row{i}\tGO:{n:07d}\tECO:{n:07d}\tbiolink:affects\thttp://example.org/x?a=1:2\n',
+    'Plain prose line without identifiers, timings like 10:45 and ratios 3:1.\n',
+    'Growth was scored after 48 h at 37 C; strains that failed to grow were re-tested in triplicate.\n',
+    'The phenotype is defined relative to the wild type grown on the same medium and plate.\n',
+    'Media were prepared fresh for each run, and plates were read at 600 nm every 30 minutes.\n',
+    'Replicates that disagreed by more than one growth category were excluded from the summary table.\n',
+    '> Note: these annotations follow the v6 conventions described in the README for this release.\n',
+    '| Strain | Condition | Growth | Notes |\n',
+    '\n',
+]
+
+
+def _write_synthetic_document(path: Path, size_mb: float) -> int:
+    """Write a mixed markdown/YAML/TSV document of roughly size_mb; returns its line count"""
+    target = int(size_mb * 1024 * 1024)
+    written = 0
+    lines = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < target:
+            template = _SYNTHETIC_LINES[lines % len(_SYNTHETIC_LINES)]
+            line = template.format(i=lines, n=(lines * 7919) % 100000)
+            f.write(line)
+            written += len(line)
+            lines += 1
+    return lines
+
+
+def bench_extract(size_mb: float) -> List[Dict[str, object]]:
+    """CURIE extraction throughput: legacy per-line findall vs the compiled registry pass"""
+    import re
+    from curie_extractor import get_default_extractor
+    
+    legacy_pattern = r'\b([A-Z]+:[0-9]+)\b'
+    
+    def legacy(path: Path) -> int:
+        count = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                count += len(re.findall(legacy_pattern, line))
+        return count
+    
+    def compiled(path: Path) -> int:
+        return sum(1 for _ in get_default_extractor().extract_file(path))
+    
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'synthetic.md'
+        lines = _write_synthetic_document(path, size_mb)
+        mb = path.stat().st_size / (1024 * 1024)
+        get_default_extractor()
+        for name, func in (('legacy findall', legacy), ('curie_extractor', compiled)):
+            matches, seconds = _timed(func, path)
+            rows.append({
+                'extractor': name,
+                'size_mb': mb,
+                'lines': lines,
+                'matches': matches,
+                'seconds': seconds,
+                'mb_per_s': mb / seconds,
+                'lines_per_s': int(lines / seconds),
+            })
+    return rows
+
+
+def bench_upgrade(size_mb: float) -> List[Dict[str, object]]:
+    """Streaming term upgrade of a synthetic document: rewrite plus unified diff"""
+    from batch_verify import extract_terms_from_file
+    from term_upgrade import upgrade_document
+    
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'synthetic.md'
+        _write_synthetic_document(path, size_mb)
+        terms_with_lines = extract_terms_from_file(str(path))
+        # Every other OMP and GO term is treated as obsolete with a successor
+        replaceable = sorted(term_id for term_id in terms_with_lines if term_id.split(':')[0] in ('OMP', 'GO'))
+        replacements = {term_id: term_id.replace(':', ':9', 1)[:-1] for term_id in replaceable[::2]}
+        mb = path.stat().st_size / (1024 * 1024)
+        
+        def run():
+            with open(Path(tmp) / 'synthetic.patch', 'w', encoding='utf-8') as diff:
+                return upgrade_document(path, replacements, terms_with_lines, Path(tmp) / 'upgraded.md', diff)
+        
+        result, seconds = _timed(run)
+        # Memory is measured on a second run, as tracemalloc slows the pass down
+        _, _, peak_mb = _peak_memory(run)
+        rows.append({
+            'size_mb': mb,
+            'lines': result.lines,
+            'replacements': result.replacements,
+            'changed_lines': result.changed_lines,
+            'seconds': seconds,
+            'replacements_per_s': int(result.replacements / seconds),
+            'lines_per_s': int(result.lines / seconds),
+            'mb_per_s': mb / seconds,
+            'peak_mb': peak_mb,
+        })
+    return rows
+
+
+def bench_slots(document: Path, copies: int) -> List[Dict[str, object]]:
+    """Slot validation throughput on a document's YAML blocks repeated many times"""
+    from slot_validation import SlotRuleEngine, yaml_blocks
+    
+    with open(document, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    blocks = [['```yaml\n', *block, '```\n'] for _, block in yaml_blocks(lines)]
+    synthetic = [line for _ in range(copies) for block in blocks for line in block]
+    
+    engine = SlotRuleEngine()
+    (values, _), parse_s = _timed(engine.parse_document, synthetic)
+    # Checking only needs some term lookups; use empty results to time the rule pass
+    findings, check_s = _timed(engine.check, values, {})
+    associations = len(blocks) * copies
+    return [{
+        'associations': associations,
+        'slots': len(values),
+        'findings': len(findings),
+        'parse_s': parse_s,
+        'check_s': check_s,
+        'assoc_per_s': int(associations / (parse_s + check_s)),
+    }]
+
+
+def bench_hierarchy(files: List[Path], queries: int = 100000) -> List[Dict[str, object]]:
+    """Closure build time and latency of subsumption and ancestor queries"""
+    import random
+    
+    rows = []
+    for file_path in files:
+        index = build_index(parse_ontology(str(file_path)))
+        graph, graph_s = _timed(lambda: index.graph)
+        if not graph.edge_count():
+            continue
+        _, closure_s = _timed(graph.closure)
+        rng = random.Random(0)
+        pairs = [(rng.choice(graph.ids), rng.choice(graph.ids)) for _ in range(queries)]
+        hits, subsumes_s = _timed(lambda: sum(graph.is_descendant(a, b) for a, b in pairs))
+        _, ancestors_s = _timed(lambda: [graph.ancestors(a) for a, _ in pairs])
+        closure = graph.closure()
+        rows.append({
+            'file': file_path.name,
+            'nodes': len(graph),
+            'edges': graph.edge_count(),
+            'closure_pairs': len(closure.ancestors),
+            'build_s': graph_s + closure_s,
+            'subsumes_us': subsumes_s / queries * 1e6,
+            'ancestors_us': ancestors_s / queries * 1e6,
+            'hits': hits,
+        })
+    return rows
+
+
+def bench_similarity(files: List[Path], queries: int = 200, matrix: int = 500) -> List[Dict[str, object]]:
+    """Setup, one-vs-all (cold and cached) and pairwise latency of Lin similarity"""
+    import random
+    from similarity import SimilarityEngine
+    
+    rows = []
+    for file_path in files:
+        index = build_index(parse_ontology(str(file_path)))
+        if not index.graph.edge_count():
+            continue
+        engine, setup_s = _timed(SimilarityEngine.for_index, index)
+        rng = random.Random(0)
+        sources = [rng.choice(engine.graph.ids) for _ in range(queries)]
+        _, cold_s = _timed(lambda: [engine.one_vs_all(term_id) for term_id in sources])
+        _, warm_s = _timed(lambda: [engine.one_vs_all(term_id) for term_id in sources])
+        sample = rng.sample(engine.graph.ids, min(matrix, len(engine.graph)))
+        _, pairwise_s = _timed(engine.pairwise, sample)
+        rows.append({
+            'file': file_path.name,
+            'terms': len(engine.graph),
+            'setup_s': setup_s,
+            'one_vs_all_ms': cold_s / queries * 1000,
+            'cached_ms': warm_s / queries * 1000,
+            'pairwise': f"{len(sample)}x{len(sample)}",
+            'pairwise_s': pairwise_s,
+            'pairs_per_s': int(len(sample) ** 2 / pairwise_s),
+        })
+    return rows
+
+
+def bench_bloom(files: List[Path], queries: int = 100000, misses: int = 5) -> List[Dict[str, object]]:
+    """Bloom filter size, probe latency, false-positive rate and lazy NOT FOUND cost"""
+    import io
+    import random
+    import contextlib
+    from bloom_filter import BloomFilter
+    from ontology_registry import OntologyRegistry, OntologySource
+    from verify_term import OntologyVerifier
+    
+    rows = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for file_path in files:
+            index = build_index(parse_ontology(str(file_path), use_cache=False))
+            if not index.terms:
+                continue
+            bloom, build_s = _timed(BloomFilter.for_index, index)
+            present = list(index.terms)
+            assert all(term_id in bloom for term_id in present), f"false negative in {file_path.name}"
+            
+            # IDs shaped like real ones that the ontology does not hold
+            prefix = present[0].split(':')[0]
+            rng = random.Random(0)
+            absent = [f"{prefix}:{rng.randrange(10 ** 9):09d}X" for _ in range(queries)]
+            passed, probe_s = _timed(lambda: sum(bloom.might_contain(term_id) for term_id in absent))
+            
+            # Cold cost of one NOT FOUND ID: a fresh lazy verifier either loads the
+            # snapshot, or only reads the stored filter
+            source = OntologySource(prefix, [file_path], cache_dir=Path(cache_dir))
+            registry = OntologyRegistry({prefix: source})
+            OntologyCache(Path(cache_dir)).load_index(file_path)
+            timings = {'unfiltered': 0.0, 'filtered': 0.0}
+            loads = {'unfiltered': 0, 'filtered': 0}
+            for term_id in absent[:misses]:
+                for label in timings:
+                    verifier = OntologyVerifier(lazy=True, registry=registry)
+                    if label == 'unfiltered':
+                        verifier.filters[prefix] = None
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        _, seconds = _timed(verifier.verify_term, term_id)
+                    timings[label] += seconds
+                    loads[label] += len(verifier.ontologies)
+            rows.append({
+                'file': file_path.name,
+                'ids': len(bloom),
+                'filter_kb': len(bloom.bits) / 1024,
+                'hashes': bloom.hashes,
+                'build_s': build_s,
+                'probe_us': probe_s / queries * 1e6,
+                'expected_fp': bloom.expected_fp_rate,
+                'observed_fp': passed / queries,
+                'miss_ms': timings['unfiltered'] / misses * 1000,
+                'filtered_miss_ms': timings['filtered'] / misses * 1000,
+                'loads_avoided': f"{loads['unfiltered'] - loads['filtered']}/{misses}",
+            })
+    return rows
+
+
+def _legacy_strip_comment(value: str) -> str:
+    value = value.split('!', 1)[0]
+    if '{' in value:
+        value = value.split('{', 1)[0]
+    return value.strip()
+
+
+class _LegacyOBOParser:
+    """The OBOParser before escapes, alt_id/replaced_by/consider and [Typedef] were read, for comparison"""
+    
+    def __init__(self, file_path: str):
+        self.file_path = Path(file_path)
+        self.terms: Dict[str, OntologyTerm] = {}
+    
+    def parse(self) -> Dict[str, OntologyTerm]:
+        """Parse OBO file and return dictionary of terms"""
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            return self.parse_lines(f)
+    
+    def parse_lines(self, lines: Iterable[str]) -> Dict[str, OntologyTerm]:
+        """Parse OBO content from any iterable of lines, such as a single stanza"""
+        current_term = None
+        in_term = False
+        
+        for line in lines:
+            line = line.strip()
+            
+            # Start of new term
+            if line == '[Term]':
+                in_term = True
+                current_term = None
+                continue
+            
+            # End of term section
+            if line.startswith('[') and in_term:
+                in_term = False
+                continue
+            
+            if not in_term:
+                continue
+            
+            # Parse term fields
+            if line.startswith('id:'):
+                term_id = line[3:].strip()
+                current_term = OntologyTerm(term_id)
+                self.terms[term_id] = current_term
+            
+            elif current_term and line.startswith('name:'):
+                current_term.name = line[5:].strip()
+            
+            elif current_term and line.startswith('def:'):
+                # Definition is quoted, extract it
+                match = re.match(r'def:\s*"([^"]*)"', line)
+                if match:
+                    current_term.definition = match.group(1)
+            
+            elif current_term and line.startswith('synonym:'):
+                # Synonym is quoted
+                match = re.match(r'synonym:\s*"([^"]*)"', line)
+                if match:
+                    current_term.synonyms += (match.group(1),)
+            
+            elif current_term and line.startswith('xref:'):
+                xref = line[5:].strip()
+                current_term.xrefs += (xref,)
+            
+            elif current_term and line.startswith('is_obsolete:'):
+                current_term.is_obsolete = line[12:].strip().lower() == 'true'
+            
+            elif current_term and line.startswith('namespace:'):
+                current_term.namespace = sys.intern(line[10:].strip())
+            
+            elif current_term and line.startswith('is_a:'):
+                # "is_a: GO:0008150 ! biological_process"
+                parent = _legacy_strip_comment(line[5:]).split()
+                if len(parent) == 1:
+                    current_term.parents += (parent[0],)
+            
+            elif current_term and line.startswith('relationship:'):
+                # "relationship: part_of GO:0005575 ! cellular_component"
+                fields = _legacy_strip_comment(line[13:]).split()
+                if len(fields) >= 2:
+                    current_term.relationships += ((sys.intern(fields[0]), fields[1]),)
+        
+        return self.terms
+
+
+# Fields the legacy parser fills in, compared term by term
+_LEGACY_OBO_FIELDS = ('id', 'name', 'definition', 'synonyms', 'xrefs', 'is_obsolete', 'namespace',
+                      'parents', 'relationships')
+
+
+def _escape_fix(legacy: str, current: str) -> bool:
+    """True if legacy is current cut short at an escaped quote"""
+    return legacy.endswith('\\') and current.startswith(legacy[:-1]) and len(current) > len(legacy) - 1
+
+
+def compare_obo_terms(legacy_terms: Dict[str, OntologyTerm],
+                      terms: Dict[str, OntologyTerm]) -> Tuple[int, int]:
+    """(mismatches, escape_fixes) between legacy and current OBOParser output
+    
+    escape_fixes counts terms whose only differences are definitions or
+    synonyms the legacy parser cut short at an escaped quote.
+    """
+    mismatches = escape_fixes = 0
+    for term_id in legacy_terms.keys() | terms.keys():
+        old, new = legacy_terms.get(term_id), terms.get(term_id)
+        if old is None or new is None:
+            mismatches += 1
+            continue
+        differing = [field for field in _LEGACY_OBO_FIELDS if getattr(old, field) != getattr(new, field)]
+        if not differing:
+            continue
+        # Escaped quotes truncated definitions and synonyms in the legacy parser
+        if set(differing) <= {'definition', 'synonyms'} and \
+                (old.definition == new.definition or _escape_fix(old.definition, new.definition)) and \
+                len(old.synonyms) == len(new.synonyms) and \
+                all(a == b or _escape_fix(a, b) for a, b in zip(old.synonyms, new.synonyms)):
+            escape_fixes += 1
+        else:
+            mismatches += 1
+    return mismatches, escape_fixes
+
+
+def bench_obo(files: List[Path]) -> List[Dict[str, object]]:
+    """Lines/sec of the legacy and current OBO parsers, plus a term-by-term comparison"""
+    rows = []
+    for file_path in files:
+        if file_path.suffix != '.obo':
+            continue
+        with open(file_path, 'r', encoding='utf-8') as f:
+            lines = sum(1 for _ in f)
+        legacy_terms, legacy_s = _timed(_LegacyOBOParser(file_path).parse)
+        parser = OBOParser(file_path)
+        terms, new_s = _timed(parser.parse)
+        mismatches, escape_fixes = compare_obo_terms(legacy_terms, terms)
+        rows.append({
+            'file': file_path.name,
+            'lines': lines,
+            'terms': len(terms),
+            'typedefs': len(parser.typedefs),
+            'legacy_lines_per_s': int(lines / legacy_s),
+            'new_lines_per_s': int(lines / new_s),
+            'speedup': legacy_s / new_s,
+            'escape_fixes': escape_fixes,
+            'mismatches': mismatches,
+        })
+    return rows
+
+
+def print_table(rows: List[Dict[str, object]]):
+    """Print benchmark rows as an aligned table"""
+    if not rows:
+        print("No results.")
+        return
+    columns = list(rows[0].keys())
+    cells = [[f"{row[c]:.3f}" if isinstance(row[c], float) else str(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    print("  ".join('-' * w for w in widths))
+    for r in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(r, widths)))
+
+
+def main():
+    """Run a benchmark"""
+    parser = argparse.ArgumentParser(description='Benchmark ontology tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    cache = subparsers.add_parser('cache', help='Cold parse vs warm cache load per ontology')
+    cache.add_argument('files', nargs='*', help='Ontology files (default: configured ontologies)')
+    
+    owl = subparsers.add_parser('owl', help='Streaming vs whole-tree OWL parsing (memory and differential check)')
+    owl.add_argument('files', nargs='*', help='OWL files (default: configured ontologies)')
+    
+    terms = subparsers.add_parser('terms', help='Memory per term, old vs compact OntologyTerm layout')
+    terms.add_argument('files', nargs='*', help='Ontology files (default: configured ontologies)')
+    
+    search = subparsers.add_parser('search', help='Keyword union vs BM25 top-k query latency')
+    search.add_argument('files', nargs='*', help='Ontology files (default: configured ontologies)')
+    search.add_argument('--query', '-q', action='append',
+                        help='Query to time (repeatable; default: a few phenotype queries)')
+    
+    index = subparsers.add_parser('index', help='Indexing throughput per tokenizer')
+    index.add_argument('files', nargs='*', help='Ontology files (default: configured ontologies)')
+    
+    lookup = subparsers.add_parser('lookup', help='Prefix and fuzzy name lookup latency')
+    lookup.add_argument('files', nargs='*', help='Ontology files (default: configured ontologies)')
+    lookup.add_argument('--query', '-q', action='append',
+                        help='Query to time (repeatable; default: partial and misspelled names)')
+    
+    server = subparsers.add_parser('server', help='Load-test a running ontology_server.py')
+    server.add_argument('--url', default=None, help='Server URL (default: $ONTOLOGY_SERVER_URL or localhost:8765)')
+    server.add_argument('--document', default=str(Path(__file__).parent.parent / 'ontology_annotation_examples_v6.md'),
+                        help='Document whose term IDs are used as the request mix')
+    server.add_argument('--requests', '-n', type=int, default=2000, help='Total requests')
+    server.add_argument('--concurrency', '-c', type=int, default=8, help='Concurrent client threads')
+    server.add_argument('--batch', '-b', type=int, default=1, help='Term IDs per request')
+    
+    extract = subparsers.add_parser('extract', help='CURIE extraction throughput on a synthetic document')
+    extract.add_argument('--size-mb', type=float, default=50, help='Size of the generated document')
+    
+    upgrade = subparsers.add_parser('upgrade', help='Streaming term upgrade (rewrite + diff) throughput')
+    upgrade.add_argument('--size-mb', type=float, default=50, help='Size of the generated document')
+    
+    slots = subparsers.add_parser('slots', help='YAML slot validation throughput')
+    slots.add_argument('--document', default=str(Path(__file__).parent.parent / 'ontology_annotation_examples_v6.md'),
+                       help='Document whose YAML blocks are repeated')
+    slots.add_argument('--copies', type=int, default=200, help='Times to repeat the blocks')
+    
+    hierarchy = subparsers.add_parser('hierarchy', help='is_a closure build time and query latency')
+    hierarchy.add_argument('files', nargs='*', help='Ontology files (default: configured ontologies)')
+    hierarchy.add_argument('--queries', type=int, default=100000, help='Random term pairs to query')
+    
+    similarity = subparsers.add_parser('similarity', help='Resnik/Lin similarity throughput')
+    similarity.add_argument('files', nargs='*', help='Ontology files (default: configured ontologies)')
+    similarity.add_argument('--queries', type=int, default=200, help='Random one-vs-all queries')
+    similarity.add_argument('--matrix', type=int, default=500, help='Terms in the pairwise matrix')
+    
+    obo = subparsers.add_parser('obo', help='OBO parse throughput, legacy vs current parser (differential check)')
+    obo.add_argument('files', nargs='*', help='OBO files (default: configured ontologies)')
+    
+    bloom = subparsers.add_parser('bloom', help='Bloom filter false-positive rate and NOT FOUND lookups avoided')
+    bloom.add_argument('files', nargs='*', help='Ontology files (default: configured ontologies)')
+    bloom.add_argument('--queries', type=int, default=100000, help='Absent IDs to probe')
+    bloom.add_argument('--misses', type=int, default=5, help='Cold NOT FOUND lookups to time, each with a fresh verifier')
+    
+    args = parser.parse_args()
+    
+    if args.command == 'cache':
+        print_table(bench_cache(_resolve_files(args.files)))
+    elif args.command == 'owl':
+        rows = bench_owl(_resolve_files(args.files))
+        print_table(rows)
+        if not all(row['identical'] for row in rows):
+            print("\nERROR: streaming parser output differs from whole-tree parser")
+            sys.exit(1)
+    elif args.command == 'obo':
+        rows = bench_obo(_resolve_files(args.files))
+        print_table(rows)
+        if any(row['mismatches'] for row in rows):
+            print("\nERROR: OBO parser output differs from the legacy parser")
+            sys.exit(1)
+    elif args.command == 'terms':
+        print_table(bench_terms(_resolve_files(args.files)))
+    elif args.command == 'search':
+        queries = args.query or ['carbon source utilization', 'acid', 'oxidative stress resistance']
+        print_table(bench_search(_resolve_files(args.files), queries))
+    elif args.command == 'index':
+        print_table(bench_index(_resolve_files(args.files)))
+    elif args.command == 'lookup':
+        queries = args.query or ['galactur', 'salicn', 'carbn sorce']
+        print_table(bench_lookup(_resolve_files(args.files), queries))
+    elif args.command == 'extract':
+        print_table(bench_extract(args.size_mb))
+    elif args.command == 'upgrade':
+        print_table(bench_upgrade(args.size_mb))
+    elif args.command == 'slots':
+        print_table(bench_slots(Path(args.document), args.copies))
+    elif args.command == 'hierarchy':
+        print_table(bench_hierarchy(_resolve_files(args.files), args.queries))
+    elif args.command == 'similarity':
+        print_table(bench_similarity(_resolve_files(args.files), args.queries, args.matrix))
+    elif args.command == 'bloom':
+        print_table(bench_bloom(_resolve_files(args.files), args.queries, args.misses))
+    elif args.command == 'server':
+        import os
+        from batch_verify import extract_terms_from_file
+        from ontology_client import DEFAULT_URL
+        url = args.url or os.environ.get('ONTOLOGY_SERVER_URL', DEFAULT_URL)
+        term_ids = sorted(extract_terms_from_file(args.document))
+        print_table([bench_server(url, term_ids, args.requests, args.concurrency, args.batch)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Bloom filters over the term IDs of each ontology.
+
+A filter answers "might this ID be in the ontology?" with no false
+negatives and a tunable false-positive rate, in about ten bits per ID.
+verify_term consults it before loading an ontology (lazy mode) or its
+offset index (quick mode), so an ID that does not exist is usually
+rejected without touching either.
+
+Filters cover every ID an OntologyIndex resolves, primary and secondary,
+and are stored next to the parse snapshot as cache kind 'bloom'. Bit
+positions come from double hashing one 128-bit BLAKE2b digest,
+
+    position_i = ((h1 + i * h2) mod 2**64) mod bits,
+
+so a FilterSet over several ontologies hashes an ID once and probes every
+filter with the same two numbers: one combined "exists anywhere?" check.
+"""
+
+import sys
+import math
+import hashlib
+import argparse
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+DEFAULT_FP_RATE = 0.01
+
+_MASK = (1 << 64) - 1
+
+
+def key_hashes(key: str) -> Tuple[int, int]:
+    """The two 64-bit hashes of a key; the second is odd so every probe differs"""
+    digest = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest(), 'little')
+    return digest & _MASK, (digest >> 64) | 1
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter with lookup counters
+    
+    queries and rejected count might_contain calls and the ones answered
+    "no"; callers that go on to a real lookup record a miss there in
+    false_positives.
+    """
+    
+    __slots__ = ('size', 'hashes', 'bits', 'count', 'queries', 'rejected', 'false_positives')
+    
+    def __init__(self, size: int, hashes: int, bits: Optional[bytes] = None, count: int = 0):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bytearray(bits) if bits is not None else bytearray((size + 7) // 8)
+        self.count = count
+        self.queries = 0
+        self.rejected = 0
+        self.false_positives = 0
+    
+    @classmethod
+    def for_capacity(cls, capacity: int, fp_rate: float = DEFAULT_FP_RATE) -> 'BloomFilter':
+        """Empty filter sized for capacity keys at the given false-positive rate"""
+        capacity = max(capacity, 1)
+        size = max(64, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        hashes = max(1, round(size / capacity * math.log(2)))
+        return cls(size, hashes)
+    
+    @classmethod
+    def from_keys(cls, keys: List[str], fp_rate: float = DEFAULT_FP_RATE) -> 'BloomFilter':
+        bloom = cls.for_capacity(len(keys), fp_rate)
+        bloom.update(keys)
+        return bloom
+    
+    @classmethod
+    def for_index(cls, index, fp_rate: float = DEFAULT_FP_RATE) -> 'BloomFilter':
+        """Filter over the primary and secondary IDs of an OntologyIndex"""
+        keys = list(index.terms)
+        keys.extend(alt_id for alt_id in index.alt_id_index if alt_id not in index.terms)
+        return cls.from_keys(keys, fp_rate)
+    
+    def add(self, key: str):
+        h1, h2 = key_hashes(key)
+        bits, size = self.bits, self.size
+        for i in range(self.hashes):
+            position = ((h1 + i * h2) & _MASK) % size
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def update(self, keys: Iterable[str]):
+        for key in keys:
+            self.add(key)
+    
+    def _probe(self, h1: int, h2: int) -> bool:
+        bits, size = self.bits, self.size
+        for i in range(self.hashes):
+            position = ((h1 + i * h2) & _MASK) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+    
+    def _check(self, h1: int, h2: int) -> bool:
+        """Probe and count the query"""
+        self.queries += 1
+        if self._probe(h1, h2):
+            return True
+        self.rejected += 1
+        return False
+    
+    def might_contain(self, key: str) -> bool:
+        """False if key was certainly never added"""
+        return self._check(*key_hashes(key))
+    
+    def __contains__(self, key: str) -> bool:
+        return self._probe(*key_hashes(key))
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    @property
+    def expected_fp_rate(self) -> float:
+        """False-positive rate predicted from size, hash count and keys added"""
+        return (1.0 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+    
+    @property
+    def observed_fp_rate(self) -> float:
+        """Share of absent IDs that got past the filter, among those looked up"""
+        absent = self.false_positives + self.rejected
+        return self.false_positives / absent if absent else 0.0
+    
+    def get_state(self) -> Dict[str, object]:
+        return {'size': self.size, 'hashes': self.hashes, 'count': self.count, 'bits': bytes(self.bits)}
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, object]) -> 'BloomFilter':
+        return cls(state['size'], state['hashes'], state['bits'], state['count'])
+
+
+class FilterSet:
+    """Filters of several ontologies, probed with a single hash per ID"""
+    
+    def __init__(self, filters: Dict[str, BloomFilter]):
+        self.filters = filters
+        self.queries = 0
+        self.rejected = 0
+    
+    def candidates(self, key: str) -> List[str]:
+        """Names of the ontologies that may hold key"""
+        h1, h2 = key_hashes(key)
+        names = [name for name, bloom in self.filters.items() if bloom._check(h1, h2)]
+        self.queries += 1
+        if not names:
+            self.rejected += 1
+        return names
+    
+    def __contains__(self, key: str) -> bool:
+        h1, h2 = key_hashes(key)
+        return any(bloom._probe(h1, h2) for bloom in self.filters.values())
+    
+    def __len__(self) -> int:
+        return len(self.filters)
+
+
+def main():
+    """Check term IDs against the stored filters of the registered ontologies"""
+    from ontology_cache import OntologyCache, get_default_cache
+    from ontology_registry import get_default_registry
+    
+    parser = argparse.ArgumentParser(
+        description='Ask the cached Bloom filters whether term IDs may exist',
+        epilog='Example: bloom_filter.py OMP:0005009 BFO:0000050')
+    parser.add_argument('term_ids', nargs='*', metavar='term_id', help='Term IDs to check')
+    args = parser.parse_args()
+    
+    filters = {}
+    for name, source in get_default_registry().sources.items():
+        cache = OntologyCache(source.cache_dir) if source.cache_dir else get_default_cache()
+        bloom = cache.load_filter(source.path) if source.exists() else None
+        if bloom is None:
+            print(f"{name:<10} no filter (load the ontology once, or run ontology_cache.py warm)")
+            continue
+        filters[name] = bloom
+        print(f"{name:<10} {len(bloom)} IDs, {bloom.size / max(len(bloom), 1):.1f} bits/ID, "
+              f"{bloom.hashes} hashes, expected FP rate {bloom.expected_fp_rate:.2%}")
+    if not filters:
+        sys.exit(1)
+    
+    combined = FilterSet(filters)
+    for term_id in args.term_ids:
+        names = combined.candidates(term_id)
+        print(f"{term_id}: {'maybe in ' + ', '.join(names) if names else 'in none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Extract CURIEs (PREFIX:local_id) from text in one compiled regex pass.
+
+Only prefixes in a PrefixRegistry are recognised, each with its own
+local-ID pattern, so "NCBITaxon:562" and "modelseed.compound:cpd00025"
+are found while timestamps, URLs and YAML keys like "mco:has_condition"
+are not. Input is consumed in blocks of lines, so arbitrarily large
+markdown, YAML or TSV files are streamed rather than read whole.
+"""
+
+import re
+import sys
+import time
+import argparse
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import accumulate, islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+
+# Local-ID pattern for configured ontologies without an override
+DEFAULT_LOCAL_PATTERN = r'[0-9]+'
+
+ONTOLOGY_LOCAL_PATTERNS = {
+    'MODELSEED': r'\w+',
+}
+
+# Identifiers used in the annotation documents that have no ontology file
+EXTRA_PREFIXES = {
+    'NCBITaxon': r'[0-9]+',
+    'EcoGene': r'EG[0-9]+',
+    'modelseed.compound': r'cpd[0-9]+',
+    'modelseed.reaction': r'rxn[0-9]+',
+    'modelseed': r'(?:cpd|rxn)[0-9]+',
+    'PMID': r'[0-9]+',
+    'UniProt': r'[OPQ][0-9][A-Z0-9]{3}[0-9]|[A-NR-Z][0-9](?:[A-Z][A-Z0-9]{2}[0-9]){1,2}',
+}
+
+# Lines joined per regex pass when streaming
+BLOCK_LINES = 4096
+
+
+class CurieMatch(NamedTuple):
+    """One CURIE occurrence; line and column are 1-based"""
+    curie: str
+    prefix: str
+    line: int
+    column: int
+
+
+class PrefixRegistry:
+    """Known CURIE prefixes and the local-ID pattern each one accepts"""
+    
+    def __init__(self, patterns: Optional[Dict[str, str]] = None,
+                 ontology_prefixes: Iterable[str] = ()):
+        self.patterns: Dict[str, str] = dict(patterns or {})
+        # Prefixes backed by a configured ontology file, i.e. verifiable
+        self.ontology_prefixes = set(ontology_prefixes)
+    
+    def add(self, prefix: str, local_pattern: str = DEFAULT_LOCAL_PATTERN, ontology: bool = False):
+        """Register a prefix (replacing its pattern if already known)"""
+        self.patterns[prefix] = local_pattern
+        if ontology:
+            self.ontology_prefixes.add(prefix)
+    
+    def compile(self) -> 're.Pattern[str]':
+        """One alternation over every prefix, grouped by first character
+        
+        Every alternative starts with a literal, so the regex engine can
+        skip ahead to candidate characters instead of trying each position.
+        The boundary check on the character before a CURIE therefore comes
+        after its first character rather than in front of the pattern.
+        """
+        by_first = defaultdict(list)
+        for prefix in sorted(self.patterns, key=lambda p: (-len(p), p)):
+            by_first[prefix[0]].append(f"{re.escape(prefix[1:])}:(?:{self.patterns[prefix]})")
+        branches = [re.escape(first) + r'(?<![\w.:-].)(?:' + '|'.join(rests) + ')'
+                    for first, rests in by_first.items()]
+        return re.compile('(?:' + '|'.join(branches) + r')(?!\w)')
+    
+    @classmethod
+    def from_ontology_paths(cls, ontology_paths: Iterable[str],
+                            extras: Optional[Dict[str, str]] = None) -> 'PrefixRegistry':
+        """Registry for the verifier's ontologies plus extra identifier prefixes"""
+        registry = cls()
+        for prefix in ontology_paths:
+            registry.add(prefix, ONTOLOGY_LOCAL_PATTERNS.get(prefix, DEFAULT_LOCAL_PATTERN), ontology=True)
+        for prefix, local_pattern in (EXTRA_PREFIXES if extras is None else extras).items():
+            registry.add(prefix, local_pattern)
+        return registry
+
+
+class CurieExtractor:
+    """Finds registered CURIEs with their line and column"""
+    
+    def __init__(self, registry: PrefixRegistry):
+        self.registry = registry
+        self.pattern = registry.compile()
+    
+    def _scan_block(self, block: List[str], first_line: int) -> Iterator[CurieMatch]:
+        """CURIEs in consecutive lines, scanned as one string"""
+        text = ''.join(block)
+        line_starts = [0, *accumulate(map(len, block))]
+        for match in self.pattern.finditer(text):
+            start = match.start()
+            index = bisect_right(line_starts, start) - 1
+            curie = match.group()
+            yield CurieMatch(curie, curie.partition(':')[0], first_line + index,
+                             start - line_starts[index] + 1)
+    
+    def extract(self, lines: Iterable[str]) -> Iterator[CurieMatch]:
+        """Stream CURIEs from an iterable of lines, such as an open file"""
+        lines = iter(lines)
+        line_number = 1
+        while True:
+            block = list(islice(lines, BLOCK_LINES))
+            if not block:
+                return
+            yield from self._scan_block(block, line_number)
+            line_number += len(block)
+    
+    def extract_lines(self, lines: List[str], line_numbers: Iterable[int]) -> Iterator[CurieMatch]:
+        """CURIEs on selected 1-based lines only"""
+        for line_number in line_numbers:
+            yield from self._scan_block([lines[line_number - 1]], line_number)
+    
+    def extract_file(self, file_path: Path) -> Iterator[CurieMatch]:
+        """Stream CURIEs from a text file"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            yield from self.extract(f)
+
+
+_default_extractor: Optional[CurieExtractor] = None
+
+
+def get_default_extractor() -> CurieExtractor:
+    """Shared extractor for the registered ontologies plus EXTRA_PREFIXES"""
+    global _default_extractor
+    if _default_extractor is None:
+        from ontology_registry import get_default_registry
+        registry = PrefixRegistry.from_ontology_paths(get_default_registry())
+        _default_extractor = CurieExtractor(registry)
+    return _default_extractor
+
+
+def main():
+    """Print every CURIE in the given files"""
+    parser = argparse.ArgumentParser(description='Extract CURIEs from markdown, YAML or TSV files')
+    parser.add_argument('files', nargs='*', help='Files to scan (default: stdin)')
+    parser.add_argument('--prefix', action='append', default=[], metavar='PREFIX=REGEX',
+                        help='Register an extra prefix and its local-ID pattern (repeatable)')
+    parser.add_argument('--unique', action='store_true', help='Print each CURIE once with its count')
+    args = parser.parse_args()
+    
+    extractor = get_default_extractor()
+    if args.prefix:
+        for spec in args.prefix:
+            prefix, _, local_pattern = spec.partition('=')
+            extractor.registry.add(prefix, local_pattern or DEFAULT_LOCAL_PATTERN)
+        extractor = CurieExtractor(extractor.registry)
+    
+    sources = [(name, extractor.extract_file(Path(name))) for name in args.files] or \
+              [('<stdin>', extractor.extract(sys.stdin))]
+    start = time.perf_counter()
+    counts: Dict[str, int] = {}
+    for name, matches in sources:
+        for match in matches:
+            if args.unique:
+                counts[match.curie] = counts.get(match.curie, 0) + 1
+            else:
+                print(f"{name}:{match.line}:{match.column}: {match.curie}")
+    for curie, count in sorted(counts.items()):
+        print(f"{count:6d}  {curie}")
+    print(f"Scanned in {time.perf_counter() - start:.3f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
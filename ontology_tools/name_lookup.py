@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Prefix and typo-tolerant lookup over a vocabulary of name words.
+
+PrefixVocabulary keeps words sorted so every word starting with a prefix
+is one bisect range. FuzzyVocabulary indexes words by padded character
+trigrams: a word within edit distance d of the query must share enough
+trigrams with it, so only a handful of candidates reach the bounded
+Levenshtein check.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> Optional[int]:
+    """Edit distance between a and b, or None if it exceeds max_distance"""
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if len(a) > len(b):
+        a, b = b, a
+    previous = list(range(len(a) + 1))
+    for i, char_b in enumerate(b, 1):
+        current = [i]
+        row_min = i
+        for j, char_a in enumerate(a, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            current.append(cost)
+            if cost < row_min:
+                row_min = cost
+        if row_min > max_distance:
+            return None
+        previous = current
+    distance = previous[-1]
+    return distance if distance <= max_distance else None
+
+
+def _trigrams(word: str) -> List[str]:
+    """Character trigrams of a word padded with two boundary markers"""
+    padded = f"$${word}$$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class PrefixVocabulary:
+    """Sorted word list answering 'all words starting with p'"""
+    
+    def __init__(self, words: Iterable[str]):
+        self.words = sorted(set(words))
+    
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """Words that start with prefix, in lexical order"""
+        start = bisect_left(self.words, prefix)
+        result = []
+        for word in self.words[start:]:
+            if not word.startswith(prefix):
+                break
+            result.append(word)
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+
+class FuzzyVocabulary:
+    """Trigram index for edit-distance-bounded word matching"""
+    
+    def __init__(self, words: Iterable[str]):
+        self.words: List[str] = sorted(set(words))
+        self.grams: Dict[str, List[int]] = defaultdict(list)
+        self.by_length: Dict[int, List[int]] = defaultdict(list)
+        for word_id, word in enumerate(self.words):
+            self.by_length[len(word)].append(word_id)
+            for gram in set(_trigrams(word)):
+                self.grams[gram].append(word_id)
+    
+    def match(self, query: str, max_distance: int = 2) -> List[Tuple[str, int]]:
+        """Vocabulary words within max_distance edits of query, closest first"""
+        query_grams = set(_trigrams(query))
+        # Each edit destroys at most three trigrams (q-gram lemma)
+        needed = len(query_grams) - 3 * max_distance
+        min_length, max_length = len(query) - max_distance, len(query) + max_distance
+        
+        if needed > 0:
+            shared: Dict[int, int] = defaultdict(int)
+            for gram in query_grams:
+                for word_id in self.grams.get(gram, ()):
+                    shared[word_id] += 1
+            candidates = [word_id for word_id, count in shared.items() if count >= needed]
+        else:
+            # Query too short for the filter: fall back to the length band
+            candidates = [word_id for length in range(max(min_length, 1), max_length + 1)
+                          for word_id in self.by_length.get(length, ())]
+        
+        matches = []
+        for word_id in candidates:
+            word = self.words[word_id]
+            if not min_length <= len(word) <= max_length:
+                continue
+            distance = bounded_levenshtein(query, word, max_distance)
+            if distance is not None:
+                matches.append((word, distance))
+        matches.sort(key=lambda item: (item[1], item[0]))
+        return matches
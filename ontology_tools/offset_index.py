@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Byte-offset index for single-term lookups without parsing an ontology.
+
+One pass over the file records where each term's owl:Class element or
+[Term] stanza starts and how long it is, and which secondary IDs (alt_id,
+hasAlternativeId) it lists. A lookup then memory-maps the file and
+decodes only that slice; a secondary ID decodes its primary term, as
+OntologyIndex.resolve does. The offsets are cached next to the parse
+snapshots and reused until the file changes.
+"""
+
+import io
+import re
+import mmap
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from ontology_parser import OBOParser, OWLParser, OntologyTerm, iri_to_term_id
+from ontology_cache import OntologyCache, get_default_cache
+
+
+_OWL_URI = b'http://www.w3.org/2002/07/owl#'
+_RDF_URI = b'http://www.w3.org/1999/02/22-rdf-syntax-ns#'
+
+_OBO_HEADER_RE = re.compile(rb'^\[(\w+)\][ \t]*\r?$', re.MULTILINE)
+_OBO_ID_RE = re.compile(rb'^id:[ \t]*(\S+)', re.MULTILINE)
+_OBO_ALT_ID_RE = re.compile(rb'^alt_id:[ \t]*(\S+)', re.MULTILINE)
+_OWL_ALT_ID_RE = re.compile(rb'<(?:[\w.-]+:)?hasAlternativeId\b([^>]*?)(/?)>(?:([^<]*)<)?')
+_RESOURCE_RE = re.compile(rb'\b[\w.-]+:resource="([^"]*)"')
+
+
+class OffsetIndex:
+    """Maps term IDs to (offset, length) byte spans of one ontology file"""
+    
+    def __init__(self, file_path: Path, spans: Dict[str, Tuple[int, int]],
+                 wrapper: Tuple[bytes, bytes] = (b'', b''),
+                 aliases: Optional[Dict[str, str]] = None, fmt: Optional[str] = None):
+        self.file_path = Path(file_path)
+        self.spans = spans
+        # OWL spans are decoded inside the document's own root element so
+        # that namespace prefixes resolve
+        self.wrapper = wrapper
+        # Secondary ID -> primary term ID
+        self.aliases = aliases or {}
+        self.format = fmt or self.file_path.suffix.lstrip('.').lower()
+    
+    def __contains__(self, term_id: str) -> bool:
+        return term_id in self.spans or term_id in self.aliases
+    
+    def __len__(self) -> int:
+        return len(self.spans)
+    
+    @classmethod
+    def build(cls, file_path: Path, fmt: Optional[str] = None) -> 'OffsetIndex':
+        """Scan an OBO or OWL file once and record every term's byte span
+        
+        fmt ('obo' or 'owl') defaults to the file suffix.
+        """
+        file_path = Path(file_path)
+        fmt = fmt or file_path.suffix.lstrip('.').lower()
+        if fmt not in ('obo', 'owl'):
+            raise ValueError(f"Unsupported file format: {fmt}")
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if fmt == 'obo':
+                spans, aliases = _scan_obo(data)
+                return cls(file_path, spans, aliases=aliases, fmt=fmt)
+            spans, wrapper, aliases = _scan_owl(data)
+            return cls(file_path, spans, wrapper, aliases, fmt)
+    
+    @classmethod
+    def load(cls, file_path: Path, cache: Optional[OntologyCache] = None,
+             fmt: Optional[str] = None) -> 'OffsetIndex':
+        """Load cached offsets for a file, building and caching them on a miss"""
+        cache = cache or get_default_cache()
+        payload = cache.load(file_path, kind='offsets')
+        if payload is not None:
+            return cls(file_path, payload['spans'], payload['wrapper'], payload['aliases'], fmt)
+        
+        index = cls.build(file_path, fmt)
+        try:
+            cache.store(file_path, {'spans': index.spans, 'wrapper': index.wrapper,
+                                    'aliases': index.aliases}, kind='offsets')
+        except OSError as e:
+            print(f"Warning: could not write offset cache for {file_path}: {e}")
+        return index
+    
+    def read_span(self, term_id: str) -> Optional[bytes]:
+        """Raw bytes of a term's stanza (its primary term's for a secondary ID), or None"""
+        span = self.spans.get(self.aliases.get(term_id, term_id))
+        if span is None:
+            return None
+        offset, length = span
+        with open(self.file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return data[offset:offset + length]
+    
+    def get_term(self, term_id: str) -> Optional[OntologyTerm]:
+        """Decode a single term straight from the file, resolving secondary IDs"""
+        raw = self.read_span(term_id)
+        if raw is None:
+            return None
+        term_id = self.aliases.get(term_id, term_id)
+        if self.format == 'obo':
+            parser = OBOParser(self.file_path)
+            terms = parser.parse_lines(io.StringIO(raw.decode('utf-8')))
+        else:
+            prefix, suffix = self.wrapper
+            terms = OWLParser(self.file_path).parse_fragment(prefix + raw + suffix)
+        return terms.get(term_id)
+
+
+def _scan_obo(data: mmap.mmap) -> Tuple[Dict[str, Tuple[int, int]], Dict[str, str]]:
+    """Spans of [Term] stanzas keyed by their id: tag, and alt_id -> id"""
+    spans = {}
+    aliases = {}
+    headers = list(_OBO_HEADER_RE.finditer(data))
+    for i, header in enumerate(headers):
+        if header.group(1) != b'Term':
+            continue
+        start = header.start()
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(data)
+        id_match = _OBO_ID_RE.search(data, start, end)
+        if id_match:
+            term_id = id_match.group(1).decode('utf-8')
+            spans[term_id] = (start, end - start)
+            for alt_match in _OBO_ALT_ID_RE.finditer(data, start, end):
+                aliases[alt_match.group(1).decode('utf-8')] = term_id
+    return spans, aliases
+
+
+def _owl_alt_ids(data: mmap.mmap, start: int, end: int) -> List[str]:
+    """hasAlternativeId values inside one owl:Class element, literal or resource"""
+    alt_ids = []
+    for match in _OWL_ALT_ID_RE.finditer(data, start, end):
+        resource = _RESOURCE_RE.search(match.group(1))
+        if resource:
+            alt_ids.append(iri_to_term_id(resource.group(1).decode('utf-8')))
+        elif not match.group(2) and match.group(3) and match.group(3).strip():
+            alt_ids.append(match.group(3).strip().decode('utf-8'))
+    return alt_ids
+
+
+def _scan_owl(data: mmap.mmap) -> Tuple[Dict[str, Tuple[int, int]], Tuple[bytes, bytes], Dict[str, str]]:
+    """Spans of top-level owl:Class elements keyed by the ID of their rdf:about IRI,
+    the root element wrapper, and hasAlternativeId -> ID"""
+    root = re.search(rb'<((?:[\w.-]+:)?RDF)\b[^>]*>', data)
+    if root is None:
+        return {}, (b'', b''), {}
+    root_tag = root.group(0)
+    wrapper = (root_tag, b'</' + root.group(1) + b'>')
+    
+    owl_prefix = re.search(rb'xmlns:([\w.-]+)="' + re.escape(_OWL_URI) + rb'"', root_tag)
+    rdf_prefix = re.search(rb'xmlns:([\w.-]+)="' + re.escape(_RDF_URI) + rb'"', root_tag)
+    owl = owl_prefix.group(1) if owl_prefix else b'owl'
+    rdf = rdf_prefix.group(1) if rdf_prefix else b'rdf'
+    
+    tag_re = re.compile(rb'<(/?)' + re.escape(owl) + rb':Class\b([^>]*?)(/?)>')
+    about_re = re.compile(rb'\b' + re.escape(rdf) + rb':about="([^"]*)"')
+    
+    spans = {}
+    aliases = {}
+    depth = 0
+    start = 0
+    about = None
+    for match in tag_re.finditer(data, root.end()):
+        closing, attributes, self_closing = match.group(1), match.group(2), match.group(3)
+        if closing:
+            depth -= 1
+            if depth == 0 and about is not None:
+                spans[about] = (start, match.end() - start)
+                for alt_id in _owl_alt_ids(data, start, match.end()):
+                    aliases[alt_id] = about
+            continue
+        if depth == 0:
+            start = match.start()
+            about_match = about_re.search(attributes)
+            about = iri_to_term_id(about_match.group(1).decode('utf-8')) if about_match else None
+            if self_closing and about is not None:
+                spans[about] = (start, match.end() - start)
+        if not self_closing:
+            depth += 1
+    return spans, wrapper, aliases
+
+
+def main():
+    """Build offset indexes and look up terms without parsing"""
+    parser = argparse.ArgumentParser(description='Look up ontology terms via a byte-offset index')
+    parser.add_argument('file', help='OBO or OWL ontology file')
+    parser.add_argument('term_ids', nargs='*', help='Term IDs to decode')
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    index = OffsetIndex.load(Path(args.file))
+    print(f"Offset index for {args.file}: {len(index)} terms ({time.perf_counter() - start:.3f}s)")
+    for term_id in args.term_ids:
+        start = time.perf_counter()
+        term = index.get_term(term_id)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if term is None:
+            print(f"❌ {term_id}: NOT FOUND ({elapsed_ms:.2f} ms)")
+        else:
+            print(f"✅ {term_id}: {term.name} ({elapsed_ms:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk cache of parsed ontologies.
+
+Each ontology file gets two snapshots: its packed term columns (kind
+'terms') and the index postings over them (kind 'index'), so callers
+that only need the terms never read or rebuild the postings. Snapshots
+are validated against the source file's path, size, modification time
+and content hash, so an edited ontology is re-parsed automatically.
+Next to each parse snapshot the cache keeps a Bloom filter of the
+ontology's term IDs (kind 'bloom', see bloom_filter.py).
+"""
+
+import os
+import time
+import pickle
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from ontology_parser import (OntologyIndex, OntologyTerm, build_index, pack_terms,
+                             parse_ontology, unpack_terms)
+from ontology_registry import get_default_registry
+from bloom_filter import BloomFilter
+
+
+# Bump whenever the layout of the stored payload changes
+CACHE_FORMAT = 9
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / '.ontology_cache'
+
+
+def file_digest(file_path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OntologyCache:
+    """Directory of validated ontology snapshots"""
+    
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+    
+    def entry_path(self, source: Path, kind: str = 'index') -> Path:
+        """Snapshot path for a source file and payload kind"""
+        source = Path(source).resolve()
+        key = hashlib.sha1(str(source).encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f"{source.stem}-{key}.{kind}.pickle"
+    
+    def _read_header(self, entry: Path) -> Optional[Dict[str, object]]:
+        """Read only the header of a snapshot file"""
+        try:
+            with open(entry, 'rb') as f:
+                header = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if not isinstance(header, dict) or header.get('format') != CACHE_FORMAT:
+            return None
+        return header
+    
+    def _is_current(self, header: Dict[str, object], source: Path) -> bool:
+        """Check a snapshot header against the source file on disk"""
+        try:
+            stat = source.stat()
+        except OSError:
+            return False
+        if header['size'] != stat.st_size:
+            return False
+        if header['mtime_ns'] == stat.st_mtime_ns:
+            return True
+        # Same size but touched: only the content hash can tell
+        return header['sha256'] == file_digest(source)
+    
+    def is_cached(self, source: Path, kind: str = 'index') -> bool:
+        """True if a current snapshot exists for source"""
+        source = Path(source).resolve()
+        header = self._read_header(self.entry_path(source, kind))
+        return header is not None and self._is_current(header, source)
+    
+    def source_digest(self, source: Path, kind: str = 'index') -> str:
+        """Content hash of source, taken from a current snapshot header when possible"""
+        source = Path(source).resolve()
+        header = self._read_header(self.entry_path(source, kind))
+        if header is not None and self._is_current(header, source):
+            return header['sha256']
+        return file_digest(source)
+    
+    def load(self, source: Path, kind: str = 'index') -> Optional[object]:
+        """Return the cached payload for source, or None if missing or stale"""
+        source = Path(source).resolve()
+        entry = self.entry_path(source, kind)
+        header = self._read_header(entry)
+        if header is None or not self._is_current(header, source):
+            return None
+        try:
+            with open(entry, 'rb') as f:
+                pickle.load(f)
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+    
+    def store(self, source: Path, payload: object, kind: str = 'index') -> Path:
+        """Write a payload for source, replacing any previous snapshot atomically"""
+        source = Path(source).resolve()
+        stat = source.stat()
+        header = {
+            'format': CACHE_FORMAT,
+            'kind': kind,
+            'source': str(source),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_digest(source),
+            'created': time.time(),
+        }
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = self.entry_path(source, kind)
+        tmp_path = entry.with_suffix(entry.suffix + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry)
+        return entry
+    
+    def load_terms(self, source: Path, fmt: Optional[str] = None) -> Dict[str, OntologyTerm]:
+        """Load the terms of an ontology from cache, parsing and storing only them on a miss"""
+        columns = self.load(source, kind='terms')
+        if columns is not None:
+            return unpack_terms(columns)
+        
+        terms = parse_ontology(str(source), use_cache=False, fmt=fmt)
+        self._store_terms(source, pack_terms(terms))
+        return terms
+    
+    def load_index(self, source: Path, fmt: Optional[str] = None) -> OntologyIndex:
+        """Load an OntologyIndex from cache, parsing and storing on a miss
+        
+        Cached terms without postings are indexed without re-parsing.
+        """
+        state = self.load(source)
+        columns = self.load(source, kind='terms') if state is not None else None
+        if columns is not None:
+            index = OntologyIndex.from_state(dict(state, terms=columns))
+            if not self.is_cached(source, 'bloom'):
+                self._store_filter(source, index)
+            return index
+        
+        index = build_index(self.load_terms(source, fmt))
+        self.store_index(source, index)
+        return index
+    
+    def store_index(self, source: Path, index: OntologyIndex):
+        """Snapshot a freshly built index of source, with its terms and Bloom filter"""
+        state = index.get_state()
+        self._store_terms(source, state.pop('terms'))
+        try:
+            self.store(source, state)
+        except OSError as e:
+            print(f"Warning: could not write ontology cache for {source}: {e}")
+        self._store_filter(source, index)
+    
+    def _store_terms(self, source: Path, columns: Dict[str, list]):
+        try:
+            self.store(source, columns, kind='terms')
+        except OSError as e:
+            print(f"Warning: could not write ontology cache for {source}: {e}")
+    
+    def _store_filter(self, source: Path, index: OntologyIndex):
+        try:
+            self.store(source, BloomFilter.for_index(index).get_state(), kind='bloom')
+        except OSError as e:
+            print(f"Warning: could not write Bloom filter for {source}: {e}")
+    
+    def load_filter(self, source: Path) -> Optional[BloomFilter]:
+        """Stored Bloom filter of a source's term IDs, or None if missing or stale"""
+        state = self.load(source, kind='bloom')
+        return BloomFilter.from_state(state) if state is not None else None
+    
+    def entries(self) -> List[Tuple[Path, Dict[str, object]]]:
+        """List snapshot files together with their headers"""
+        if not self.cache_dir.exists():
+            return []
+        result = []
+        for entry in sorted(self.cache_dir.glob('*.pickle')):
+            header = self._read_header(entry)
+            if header is not None:
+                result.append((entry, header))
+        return result
+    
+    def purge(self, source: Optional[Path] = None) -> int:
+        """Delete snapshots for one source file, or all of them"""
+        if not self.cache_dir.exists():
+            return 0
+        if source is not None:
+            candidates = self.cache_dir.glob(self.entry_path(source, '*').name)
+        else:
+            candidates = self.cache_dir.glob('*.pickle*')
+        removed = 0
+        for entry in candidates:
+            entry.unlink()
+            removed += 1
+        return removed
+
+
+_default_cache: Optional[OntologyCache] = None
+
+
+def get_default_cache() -> OntologyCache:
+    """Shared cache instance, honouring ONTOLOGY_CACHE_DIR and the registry's cache_dir"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = OntologyCache(os.environ.get('ONTOLOGY_CACHE_DIR') or get_default_registry().cache_dir)
+    return _default_cache
+
+
+def _configured_paths() -> Dict[str, Path]:
+    """Ontology files in the registry"""
+    return get_default_registry().paths()
+
+
+def main():
+    """Warm, inspect or purge the ontology cache"""
+    parser = argparse.ArgumentParser(description='Manage the parsed ontology cache')
+    parser.add_argument('--cache-dir', help='Cache directory (default: $ONTOLOGY_CACHE_DIR or .ontology_cache)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    warm = subparsers.add_parser('warm', help='Parse ontologies and store snapshots')
+    warm.add_argument('files', nargs='*', help='Ontology files (default: all configured ontologies)')
+    subparsers.add_parser('info', help='List cached snapshots')
+    purge = subparsers.add_parser('purge', help='Delete cached snapshots')
+    purge.add_argument('files', nargs='*', help='Ontology files (default: everything)')
+    
+    args = parser.parse_args()
+    cache = OntologyCache(args.cache_dir) if args.cache_dir else get_default_cache()
+    
+    if args.command == 'warm':
+        files = [Path(f) for f in args.files] or list(_configured_paths().values())
+        for file_path in files:
+            if not file_path.exists():
+                print(f"Skipping missing file: {file_path}")
+                continue
+            start = time.perf_counter()
+            if cache.is_cached(file_path) and cache.is_cached(file_path, 'bloom'):
+                print(f"Up to date: {file_path}")
+                continue
+            index = cache.load_index(file_path)
+            elapsed = time.perf_counter() - start
+            print(f"Cached {len(index.terms)} terms from {file_path} in {elapsed:.2f}s")
+    
+    elif args.command == 'info':
+        entries = cache.entries()
+        if not entries:
+            print(f"No cached ontologies in {cache.cache_dir}")
+            return
+        print(f"Cache directory: {cache.cache_dir}")
+        for entry, header in entries:
+            source = Path(header['source'])
+            status = 'current' if cache._is_current(header, source) else 'stale'
+            size_mb = entry.stat().st_size / (1024 * 1024)
+            created = time.strftime('%Y-%m-%d %H:%M', time.localtime(header['created']))
+            print(f"- {source.name} [{header['kind']}] {size_mb:.1f} MB, {status}, created {created}")
+            print(f"    source: {source}")
+    
+    elif args.command == 'purge':
+        if args.files:
+            removed = sum(cache.purge(Path(f)) for f in args.files)
+        else:
+            removed = cache.purge()
+        print(f"Removed {removed} cache files from {cache.cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Client for ontology_server.py.
+
+get_client() returns a connected client when a server is reachable and
+None otherwise, so the CLIs can fall back to loading ontologies locally.
+Set ONTOLOGY_SERVER_URL to point at a non-default server, or to "off" to
+never use one.
+"""
+
+import os
+import json
+import http.client
+from urllib.parse import urlsplit
+from typing import Dict, Iterable, List, Optional
+from ontology_parser import OntologyTerm, term_from_dict
+
+
+DEFAULT_URL = 'http://127.0.0.1:8765'
+
+
+class OntologyClient:
+    """JSON-over-HTTP client mirroring the OntologyVerifier lookup methods
+    
+    Each client holds one keep-alive connection and is not thread-safe.
+    """
+    
+    def __init__(self, url: str = DEFAULT_URL, timeout: float = 30.0):
+        parts = urlsplit(url)
+        self.url = url
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._connection: Optional[http.client.HTTPConnection] = None
+    
+    def _request(self, method: str, path: str,
+                 payload: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+        """Send one request, reconnecting once if the kept-alive socket was closed"""
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            if self._connection is None:
+                self._connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._connection.request(method, path, body=body, headers=headers)
+                response = self._connection.getresponse()
+                data = json.loads(response.read() or b'{}')
+            except (http.client.HTTPException, ConnectionError):
+                self.close()
+                if attempt:
+                    raise
+                continue
+            if response.status != 200:
+                raise RuntimeError(f"Ontology server error ({response.status}): {data.get('error')}")
+            return data
+    
+    def close(self):
+        """Drop the connection"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+    
+    def available(self) -> bool:
+        """True if the server answers a health check within half a second"""
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=0.5)
+        try:
+            connection.request('GET', '/health')
+            response = connection.getresponse()
+            return response.status == 200 and json.loads(response.read()).get('status') == 'ok'
+        except (OSError, http.client.HTTPException, ValueError):
+            return False
+        finally:
+            connection.close()
+    
+    def verify_terms(self, term_ids: Iterable[str]) -> Dict[str, Optional[OntologyTerm]]:
+        """Verify several terms in one request"""
+        data = self._request('POST', '/verify', {'ids': list(term_ids)})
+        return {term_id: term_from_dict(term) if term else None
+                for term_id, term in data['terms'].items()}
+    
+    def verify_term(self, term_id: str) -> Optional[OntologyTerm]:
+        """Verify a single term"""
+        return self.verify_terms([term_id])[term_id]
+    
+    def get_xref_mappings(self, term_ids: Iterable[str], target: str,
+                          source_prefix: Optional[str] = None) -> Dict[str, List[str]]:
+        """Map several term IDs to a target ontology in one request"""
+        data = self._request('POST', '/xref', {'ids': list(term_ids), 'target': target,
+                                               'source_prefix': source_prefix})
+        return data['mappings']
+    
+    def get_chebi_modelseed_mapping(self, chebi_id: str) -> List[str]:
+        """Get ModelSEED IDs that map to a CHEBI ID"""
+        return self.get_xref_mappings([chebi_id], 'MODELSEED', 'CHEBI')[chebi_id]
+    
+    def hierarchy(self, term_id: str, relations: Iterable[str] = ('is_a',),
+                  ancestor_id: Optional[str] = None) -> Dict[str, object]:
+        """Ancestors and descendants of a term, and optionally whether ancestor_id subsumes it"""
+        return self._request('POST', '/hierarchy', {'id': term_id, 'relations': list(relations),
+                                                    'ancestor': ancestor_id})
+    
+    def get_ancestors(self, term_id: str, relations: Iterable[str] = ('is_a',)) -> List[str]:
+        """Every ancestor of a term"""
+        return self.hierarchy(term_id, relations)['ancestors']
+    
+    def get_descendants(self, term_id: str, relations: Iterable[str] = ('is_a',)) -> List[str]:
+        """Every descendant of a term"""
+        return self.hierarchy(term_id, relations)['descendants']
+    
+    def is_descendant(self, term_id: str, ancestor_id: str, relations: Iterable[str] = ('is_a',)) -> bool:
+        """True if ancestor_id subsumes term_id"""
+        return self.hierarchy(term_id, relations, ancestor_id)['is_descendant']
+    
+    def search(self, ontology: str, query: str, search_type: str = 'all',
+               max_results: int = 20, max_distance: int = 2) -> List[OntologyTerm]:
+        """Search an ontology loaded by the server"""
+        data = self._request('POST', '/search', {
+            'ontology': ontology, 'query': query, 'type': search_type,
+            'max_results': max_results, 'max_distance': max_distance,
+        })
+        return [term_from_dict(term) for term in data['results']]
+    
+    def stats(self) -> Dict[str, object]:
+        """Server counters and loaded ontologies"""
+        return self._request('GET', '/stats')
+
+
+def get_client() -> Optional[OntologyClient]:
+    """Client for a running server, or None if there is none"""
+    url = os.environ.get('ONTOLOGY_SERVER_URL', DEFAULT_URL)
+    if url.lower() in ('', 'off', 'none', '0'):
+        return None
+    client = OntologyClient(url)
+    return client if client.available() else None
@@ -5,96 +5,375 @@ Extracts terms with IDs, labels, definitions, and cross-references.
 """
 
 import re
+import sys
+import math
+import heapq
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
 import xml.etree.ElementTree as ET
+from itertools import chain
 from collections import defaultdict
+from text_tokenizer import DEFAULT_TOKENIZER, Tokenizer
+from name_lookup import FuzzyVocabulary, PrefixVocabulary
+from term_graph import DEFAULT_RELATIONS, RELATION_NAMES, TermGraph
 
 
 class OntologyTerm:
-    """Represents a single ontology term"""
-    def __init__(self, term_id: str):
+    """Represents a single ontology term
+    
+    Terms are slotted and keep synonyms/xrefs as tuples, and namespaces are
+    interned, since CHEBI and GO hold hundreds of thousands of them.
+    
+    parents holds the is_a superclasses; relationships holds the other
+    class-level edges as (relation, target) pairs, e.g. ('part_of', 'GO:1').
+    alt_ids are secondary IDs merged into this term; an obsolete term names
+    its successor in replaced_by and possible substitutes in consider.
+    """
+    __slots__ = ('id', 'name', 'definition', 'synonyms', 'xrefs', 'is_obsolete', 'namespace',
+                 'parents', 'relationships', 'alt_ids', 'replaced_by', 'consider')
+    
+    def __init__(self, term_id: str, name: str = "", definition: str = "",
+                 synonyms: Iterable[str] = (), xrefs: Iterable[str] = (),
+                 is_obsolete: bool = False, namespace: str = "",
+                 parents: Iterable[str] = (), relationships: Iterable[Tuple[str, str]] = (),
+                 alt_ids: Iterable[str] = (), replaced_by: Iterable[str] = (),
+                 consider: Iterable[str] = ()):
         self.id = term_id
-        self.name = ""
-        self.definition = ""
-        self.synonyms: List[str] = []
-        self.xrefs: List[str] = []
-        self.is_obsolete = False
-        self.namespace = ""
-        
+        self.name = name
+        self.definition = definition
+        self.synonyms: Tuple[str, ...] = tuple(synonyms)
+        self.xrefs: Tuple[str, ...] = tuple(xrefs)
+        self.is_obsolete = is_obsolete
+        self.namespace = sys.intern(namespace)
+        self.parents: Tuple[str, ...] = tuple(parents)
+        self.relationships: Tuple[Tuple[str, str], ...] = tuple(
+            (sys.intern(relation), target) for relation, target in relationships)
+        self.alt_ids: Tuple[str, ...] = tuple(alt_ids)
+        self.replaced_by: Tuple[str, ...] = tuple(replaced_by)
+        self.consider: Tuple[str, ...] = tuple(consider)
+    
     def __repr__(self):
         return f"Term({self.id}: {self.name})"
 
 
+# Attributes persisted for each term, in column order (matches the constructor)
+TERM_FIELDS = OntologyTerm.__slots__
+
+
+# Redirect kinds: a secondary ID merged into another term, an obsolete term
+# with a successor, an obsolete term with candidate substitutes, and an
+# obsolete term that names neither
+ALT_ID = 'alt_id'
+REPLACED_BY = 'replaced_by'
+CONSIDER = 'consider'
+OBSOLETE = 'obsolete'
+
+# Longest replaced_by/alt_id chain followed before giving up
+MAX_REDIRECT_HOPS = 8
+
+
+class Redirect(NamedTuple):
+    """Where a secondary or obsolete ID should point instead"""
+    kind: str
+    targets: Tuple[str, ...]
+
+
+def term_redirect(term_id: str, term: OntologyTerm) -> Optional[Redirect]:
+    """One redirection step for term_id, given the term it resolved to (None if current)"""
+    if term.id != term_id:
+        return Redirect(ALT_ID, (term.id,))
+    if not term.is_obsolete:
+        return None
+    if term.replaced_by:
+        return Redirect(REPLACED_BY, term.replaced_by)
+    if term.consider:
+        return Redirect(CONSIDER, term.consider)
+    return Redirect(OBSOLETE, ())
+
+
+def follow_redirects(term_id: str, lookup: Callable[[str], Optional[OntologyTerm]]) -> Optional[Redirect]:
+    """Current replacement of a secondary or obsolete ID
+    
+    lookup resolves an ID, primary or secondary, to its term. A single
+    replaced_by or alt_id target is followed while it is itself merged or
+    replaced, so the result names terms that are current (or the end of a
+    chain that ran out). The kind is alt_id only if every step was a merge;
+    otherwise it is that of the last replaced_by or consider step. A chain
+    that ends at an obsolete term without successors is obsolete, with no
+    targets. Returns None for current and unknown IDs.
+    """
+    term = lookup(term_id)
+    redirect = term_redirect(term_id, term) if term is not None else None
+    if redirect is None or redirect.kind in (CONSIDER, OBSOLETE):
+        return redirect
+    kind = redirect.kind
+    seen = {term_id}
+    while redirect.kind != CONSIDER and len(redirect.targets) == 1 and len(seen) < MAX_REDIRECT_HOPS:
+        target = redirect.targets[0]
+        term = lookup(target)
+        if target in seen or term is None:
+            break
+        seen.add(target)
+        following = term_redirect(target, term)
+        if following is None:
+            break
+        if following.kind == OBSOLETE:
+            return following
+        redirect = following
+        if redirect.kind != ALT_ID:
+            kind = redirect.kind
+    return Redirect(kind, redirect.targets)
+
+
+def pack_terms(terms: Dict[str, OntologyTerm]) -> Dict[str, list]:
+    """Convert a term dictionary into parallel columns of plain values"""
+    columns = {field: [] for field in TERM_FIELDS}
+    for term in terms.values():
+        for field in TERM_FIELDS:
+            columns[field].append(getattr(term, field))
+    return columns
+
+
+def unpack_terms(columns: Dict[str, list]) -> Dict[str, OntologyTerm]:
+    """Rebuild a term dictionary from columns produced by pack_terms"""
+    terms = {}
+    for row in zip(*(columns[field] for field in TERM_FIELDS)):
+        terms[row[0]] = OntologyTerm(*row)
+    return terms
+
+
+def term_to_dict(term: OntologyTerm) -> Dict[str, object]:
+    """JSON-friendly dictionary of a term's fields"""
+    data = {}
+    for field in TERM_FIELDS:
+        value = getattr(term, field)
+        data[field] = [list(item) if isinstance(item, tuple) else item for item in value] \
+            if isinstance(value, tuple) else value
+    return data
+
+
+def term_from_dict(data: Dict[str, object]) -> OntologyTerm:
+    """Rebuild a term from term_to_dict output"""
+    return OntologyTerm(*(data[field] for field in TERM_FIELDS))
+
+
+def normalize_curie(curie: str, default_prefix: Optional[str] = None) -> str:
+    """Normalise a CURIE or OBO IRI for cross-reference matching
+    
+    'chebi:123', 'CHEBI_123', 'CHEBI:CHEBI:123' and the PURL form all become
+    'CHEBI:123'. A bare local ID ('123') takes default_prefix if given.
+    """
+    curie = curie.strip()
+    if curie.startswith(('http://', 'https://')):
+        curie = curie.rstrip('/').rsplit('/', 1)[-1].rsplit('#', 1)[-1]
+    if ':' not in curie and '_' in curie:
+        head, tail = curie.split('_', 1)
+        if head.isalpha():
+            curie = f"{head}:{tail}"
+    
+    if ':' not in curie:
+        if default_prefix is None:
+            return curie
+        return f"{default_prefix.upper()}:{curie}"
+    
+    prefix, local = curie.split(':', 1)
+    prefix = prefix.upper()
+    # Some sources repeat the prefix inside the local part
+    if local.upper().startswith(prefix + ':'):
+        local = local[len(prefix) + 1:]
+    return f"{prefix}:{local.strip()}"
+
+
+def _strip_obo_comment(value: str) -> str:
+    """Drop a trailing '! comment' and '{qualifiers}' from an OBO tag value"""
+    if '!' in value:
+        value = value.split('!', 1)[0]
+    if '{' in value:
+        value = value.split('{', 1)[0]
+    return value.strip()
+
+
+# Backslash escapes inside quoted OBO strings, such as \"
+_OBO_ESCAPE_RE = re.compile(r'\\(.)')
+_OBO_ESCAPES = {'n': '\n', 't': '\t', 'W': ' '}
+
+
+def _obo_unquote(value: str) -> Optional[str]:
+    """Text of the quoted string at the start of a def/synonym value"""
+    value = value.lstrip()
+    if value[:1] != '"':
+        return None
+    if '\\' not in value:
+        end = value.find('"', 1)
+        return value[1:end] if end > 0 else None
+    # Park escaped backslashes and quotes so the closing quote is a plain find
+    value = value.replace('\\\\', '\0').replace('\\"', '\1')
+    end = value.find('"', 1)
+    if end < 0:
+        return None
+    text = value[1:end]
+    if '\\' in text:
+        text = _OBO_ESCAPE_RE.sub(lambda m: _OBO_ESCAPES.get(m.group(1), m.group(1)), text)
+    return text.replace('\1', '"').replace('\0', '\\')
+
+
+def _obo_parent(value: str) -> Optional[str]:
+    # "is_a: GO:0008150 ! biological_process"
+    parent = _strip_obo_comment(value).split()
+    return parent[0] if len(parent) == 1 else None
+
+
+def _obo_relationship(value: str) -> Optional[Tuple[str, str]]:
+    # "relationship: part_of GO:0005575 ! cellular_component"
+    fields = _strip_obo_comment(value).split()
+    return (sys.intern(fields[0]), fields[1]) if len(fields) >= 2 else None
+
+
+# How each stanza tag is decoded; a handler returning None drops the line
+_OBO_TAG_HANDLERS: Dict[str, Callable[[str], object]] = {
+    'name': str.strip,
+    'def': _obo_unquote,
+    'synonym': _obo_unquote,
+    'xref': str.strip,
+    'is_obsolete': lambda value: value.strip().lower() == 'true',
+    'namespace': lambda value: sys.intern(value.strip()),
+    'is_a': _obo_parent,
+    'relationship': _obo_relationship,
+    'alt_id': _strip_obo_comment,
+    'replaced_by': _strip_obo_comment,
+    'consider': _strip_obo_comment,
+}
+
+
+def _obo_term(term_id: str, values: Dict[str, list]) -> OntologyTerm:
+    """Build a term from the decoded values of its stanza, tag by tag
+    
+    Single-valued tags keep their last value, as a line-by-line reader
+    overwriting the field would.
+    """
+    get = values.get
+    return OntologyTerm(
+        term_id,
+        name=get('name', ('',))[-1],
+        definition=get('def', ('',))[-1],
+        synonyms=get('synonym', ()),
+        xrefs=get('xref', ()),
+        is_obsolete=get('is_obsolete', (False,))[-1],
+        namespace=get('namespace', ('',))[-1],
+        parents=get('is_a', ()),
+        relationships=get('relationship', ()),
+        alt_ids=get('alt_id', ()),
+        replaced_by=get('replaced_by', ()),
+        consider=get('consider', ()),
+    )
+
+
 class OBOParser:
-    """Parser for OBO format ontology files"""
+    """Parser for OBO format ontology files
+    
+    The file is read in chunks of lines. Each line is split once on its
+    first colon and its tag looked up in a table of handlers; the decoded
+    values of a stanza are collected in per-tag lists and the term is built
+    once, when the stanza ends. Quoted strings honour OBO escapes, so
+    definitions containing \\" are kept whole.
+    
+    [Term] stanzas become terms. [Typedef] stanzas (relation definitions)
+    are collected in typedefs and header tags in header; other stanzas
+    such as [Instance] are skipped.
+    """
+    
+    # Characters of lines handed to the tag loop per read
+    CHUNK_SIZE = 1 << 20
     
     def __init__(self, file_path: str):
         self.file_path = Path(file_path)
         self.terms: Dict[str, OntologyTerm] = {}
-        
+        self.typedefs: Dict[str, OntologyTerm] = {}
+        self.header: Dict[str, str] = {}
+    
     def parse(self) -> Dict[str, OntologyTerm]:
         """Parse OBO file and return dictionary of terms"""
         with open(self.file_path, 'r', encoding='utf-8') as f:
-            current_term = None
-            in_term = False
+            chunks = iter(lambda: f.readlines(self.CHUNK_SIZE), [])
+            return self.parse_lines(chain.from_iterable(chunks))
+    
+    def parse_lines(self, lines: Iterable[str]) -> Dict[str, OntologyTerm]:
+        """Parse OBO content from any iterable of lines, such as a single stanza"""
+        handlers = _OBO_TAG_HANDLERS
+        header = self.header
+        # Stanza being read: where its term goes, its ID and its values by tag
+        target = None
+        term_id = None
+        values: Dict[str, list] = defaultdict(list)
+        in_header = True
+        
+        for line in lines:
+            # Handlers strip the value themselves, so the common case is one split
+            tag, colon, value = line.partition(':')
+            handler = handlers.get(tag)
+            if handler is not None and term_id is not None and colon:
+                item = handler(value)
+                if item is not None:
+                    values[tag].append(item)
+                continue
             
-            for line in f:
-                line = line.strip()
-                
-                # Start of new term
-                if line == '[Term]':
-                    in_term = True
-                    current_term = None
-                    continue
-                
-                # End of term section
-                if line.startswith('[') and in_term:
-                    in_term = False
-                    continue
-                
-                if not in_term:
-                    continue
-                
-                # Parse term fields
-                if line.startswith('id:'):
-                    term_id = line[3:].strip()
-                    current_term = OntologyTerm(term_id)
-                    self.terms[term_id] = current_term
-                    
-                elif current_term and line.startswith('name:'):
-                    current_term.name = line[5:].strip()
-                    
-                elif current_term and line.startswith('def:'):
-                    # Definition is quoted, extract it
-                    match = re.match(r'def:\s*"([^"]*)"', line)
-                    if match:
-                        current_term.definition = match.group(1)
-                        
-                elif current_term and line.startswith('synonym:'):
-                    # Synonym is quoted
-                    match = re.match(r'synonym:\s*"([^"]*)"', line)
-                    if match:
-                        current_term.synonyms.append(match.group(1))
-                        
-                elif current_term and line.startswith('xref:'):
-                    xref = line[5:].strip()
-                    current_term.xrefs.append(xref)
-                    
-                elif current_term and line.startswith('is_obsolete:'):
-                    current_term.is_obsolete = line[12:].strip().lower() == 'true'
-                    
-                elif current_term and line.startswith('namespace:'):
-                    current_term.namespace = line[10:].strip()
+            # Stanza openings, ids, header tags and indented lines
+            line = line.strip()
+            if line[:1] == '[':
+                if term_id is not None:
+                    target[term_id] = _obo_term(term_id, values)
+                    term_id = None
+                in_header = False
+                target = self.terms if line == '[Term]' else self.typedefs if line == '[Typedef]' else None
+                continue
+            
+            tag, colon, value = line.partition(':')
+            if not colon:
+                continue
+            if in_header:
+                if tag not in header:
+                    header[tag] = value.strip()
+                continue
+            if target is None:
+                continue
+            
+            if tag == 'id':
+                if term_id is not None:
+                    target[term_id] = _obo_term(term_id, values)
+                term_id = value.strip()
+                values = defaultdict(list)
+                continue
+            handler = handlers.get(tag)
+            if handler is not None and term_id is not None:
+                item = handler(value)
+                if item is not None:
+                    values[tag].append(item)
         
+        if term_id is not None:
+            target[term_id] = _obo_term(term_id, values)
         return self.terms
 
 
+# Clark-notation namespace prefixes used when matching OWL/RDF elements
+OWL_NS = '{http://www.w3.org/2002/07/owl#}'
+RDF_NS = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}'
+RDFS_NS = '{http://www.w3.org/2000/01/rdf-schema#}'
+OBO_NS = '{http://purl.obolibrary.org/obo/}'
+OBOINOWL_NS = '{http://www.geneontology.org/formats/oboInOwl#}'
+
+
 class OWLParser:
-    """Parser for OWL format ontology files"""
+    """Parser for OWL format ontology files
     
-    def __init__(self, file_path: str):
+    By default the file is read incrementally: each top-level element is
+    turned into terms as soon as it closes and is then discarded, so memory
+    stays bounded by the largest single element rather than the whole
+    document. Pass streaming=False to build the full ElementTree instead.
+    """
+    
+    def __init__(self, file_path: str, streaming: bool = True):
         self.file_path = Path(file_path)
+        self.streaming = streaming
         self.terms: Dict[str, OntologyTerm] = {}
         # Define namespaces commonly used in OWL ontologies
         self.namespaces = {
@@ -104,117 +383,335 @@ class OWLParser:
             'obo': 'http://purl.obolibrary.org/obo/',
             'oboInOwl': 'http://www.geneontology.org/formats/oboInOwl#'
         }
-        
+    
     def parse(self) -> Dict[str, OntologyTerm]:
         """Parse OWL file and return dictionary of terms"""
+        if not self.streaming:
+            return self._parse_tree()
+        
+        root = None
+        depth = 0
         try:
-            tree = ET.parse(self.file_path)
-            root = tree.getroot()
-            
-            # Update namespaces from the document
-            for prefix, uri in root.attrib.items():
-                if prefix.startswith('{'):
-                    continue
-                self.namespaces[prefix] = uri
-            
-            # Find all class declarations
-            for class_elem in root.findall('.//{http://www.w3.org/2002/07/owl#}Class'):
-                about = class_elem.get('{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about')
-                if not about:
+            for event, elem in ET.iterparse(str(self.file_path), events=('start', 'end')):
+                if event == 'start':
+                    if root is None:
+                        root = elem
+                        self._update_namespaces(root)
+                    depth += 1
                     continue
                 
-                # Extract term ID from IRI
-                term_id = self._extract_term_id(about)
-                if not term_id:
+                depth -= 1
+                if depth != 1:
                     continue
                 
-                term = OntologyTerm(term_id)
-                
-                # Get label (name)
-                label_elem = class_elem.find('.//{http://www.w3.org/2000/01/rdf-schema#}label')
-                if label_elem is not None and label_elem.text:
-                    term.name = label_elem.text
-                
-                # Get definition
-                def_elem = class_elem.find('.//{http://purl.obolibrary.org/obo/}IAO_0000115')
-                if def_elem is not None and def_elem.text:
-                    term.definition = def_elem.text
-                
-                # Check if obsolete
-                deprecated_elem = class_elem.find('.//{http://www.w3.org/2002/07/owl#}deprecated')
-                if deprecated_elem is not None and deprecated_elem.text == 'true':
-                    term.is_obsolete = True
-                
-                # Get xrefs
-                for xref_elem in class_elem.findall('.//{http://www.geneontology.org/formats/oboInOwl#}hasDbXref'):
-                    if xref_elem.text:
-                        term.xrefs.append(xref_elem.text)
-                
-                self.terms[term_id] = term
-                
+                # A direct child of the document root has closed: harvest
+                # every class inside it (in document order) and drop it
+                for class_elem in elem.iter(OWL_NS + 'Class'):
+                    self._add_class(class_elem)
+                del root[:]
+        
         except ET.ParseError as e:
             print(f"Error parsing OWL file: {e}")
+        
+        return self.terms
+    
+    def _parse_tree(self) -> Dict[str, OntologyTerm]:
+        """Parse the whole document into an ElementTree before extracting terms"""
+        try:
+            tree = ET.parse(self.file_path)
+            root = tree.getroot()
+            self._update_namespaces(root)
             
+            # Find all class declarations
+            for class_elem in root.findall('.//' + OWL_NS + 'Class'):
+                self._add_class(class_elem)
+        
+        except ET.ParseError as e:
+            print(f"Error parsing OWL file: {e}")
+        
+        return self.terms
+    
+    def _update_namespaces(self, root: ET.Element):
+        """Update namespaces from the document"""
+        for prefix, uri in root.attrib.items():
+            if prefix.startswith('{'):
+                continue
+            self.namespaces[prefix] = uri
+    
+    def _add_class(self, class_elem: ET.Element):
+        """Convert an owl:Class element into a term and store it"""
+        about = class_elem.get(RDF_NS + 'about')
+        if not about:
+            return
+        
+        # Extract term ID from IRI
+        term_id = self._extract_term_id(about)
+        if not term_id:
+            return
+        
+        term = OntologyTerm(term_id)
+        
+        # Get label (name)
+        label_elem = class_elem.find('.//' + RDFS_NS + 'label')
+        if label_elem is not None and label_elem.text:
+            term.name = label_elem.text
+        
+        # Get definition
+        def_elem = class_elem.find('.//' + OBO_NS + 'IAO_0000115')
+        if def_elem is not None and def_elem.text:
+            term.definition = def_elem.text
+        
+        # Check if obsolete
+        deprecated_elem = class_elem.find('.//' + OWL_NS + 'deprecated')
+        if deprecated_elem is not None and deprecated_elem.text == 'true':
+            term.is_obsolete = True
+        
+        # Get xrefs
+        term.xrefs = tuple(xref_elem.text for xref_elem in class_elem.findall('.//' + OBOINOWL_NS + 'hasDbXref')
+                           if xref_elem.text)
+        
+        # Superclasses: named classes are is_a parents, existential
+        # restrictions (e.g. part_of some X) are relationships
+        parents = []
+        relationships = []
+        for super_elem in class_elem.findall(RDFS_NS + 'subClassOf'):
+            resource = super_elem.get(RDF_NS + 'resource')
+            if resource:
+                parent = iri_to_term_id(resource)
+                if parent and not resource.startswith(self.namespaces['owl']):
+                    parents.append(parent)
+                continue
+            for restriction in super_elem.findall(OWL_NS + 'Restriction'):
+                relation = _restriction_target(restriction, OWL_NS + 'onProperty')
+                target = _restriction_target(restriction, OWL_NS + 'someValuesFrom')
+                if relation and target:
+                    relationships.append((RELATION_NAMES.get(relation, relation), target))
+        term.parents = tuple(parents)
+        term.relationships = tuple(relationships)
+        
+        # Secondary IDs, and the successor (IAO:0100001 "term replaced by")
+        # or candidate substitutes of an obsolete class
+        term.alt_ids = _annotation_ids(class_elem, OBOINOWL_NS + 'hasAlternativeId')
+        term.replaced_by = _annotation_ids(class_elem, OBO_NS + 'IAO_0100001')
+        term.consider = _annotation_ids(class_elem, OBOINOWL_NS + 'consider')
+        
+        self.terms[term_id] = term
+    
+    def parse_fragment(self, data: bytes) -> Dict[str, OntologyTerm]:
+        """Parse a standalone XML fragment (e.g. one owl:Class wrapped in rdf:RDF)"""
+        root = ET.fromstring(data)
+        for class_elem in root.iter(OWL_NS + 'Class'):
+            self._add_class(class_elem)
         return self.terms
     
     def _extract_term_id(self, iri: str) -> Optional[str]:
         """Extract term ID from IRI"""
-        # Handle different IRI formats
-        if '#' in iri:
-            return iri.split('#')[-1]
-        elif '/' in iri:
-            term_part = iri.split('/')[-1]
-            # Convert underscore to colon for standard format
-            if '_' in term_part:
-                parts = term_part.split('_', 1)
-                if len(parts) == 2:
-                    return f"{parts[0]}:{parts[1]}"
-            return term_part
+        return iri_to_term_id(iri)
+
+
+def _restriction_target(restriction: ET.Element, tag: str) -> Optional[str]:
+    """Term ID referenced by one child of an owl:Restriction"""
+    elem = restriction.find(tag)
+    if elem is None or not elem.get(RDF_NS + 'resource'):
         return None
+    return iri_to_term_id(elem.get(RDF_NS + 'resource'))
+
+
+def _annotation_ids(class_elem: ET.Element, tag: str) -> Tuple[str, ...]:
+    """Term IDs given by an annotation, either as a literal CURIE or an IRI resource"""
+    ids = []
+    for elem in class_elem.findall(tag):
+        resource = elem.get(RDF_NS + 'resource')
+        value = iri_to_term_id(resource) if resource else (elem.text or '').strip()
+        if value:
+            ids.append(value)
+    return tuple(ids)
+
+
+def iri_to_term_id(iri: str) -> Optional[str]:
+    """Extract term ID from IRI"""
+    # Handle different IRI formats
+    if '#' in iri:
+        return iri.split('#')[-1]
+    elif '/' in iri:
+        term_part = iri.split('/')[-1]
+        # Convert underscore to colon for standard format
+        if '_' in term_part:
+            parts = term_part.split('_', 1)
+            if len(parts) == 2:
+                return f"{parts[0]}:{parts[1]}"
+        return term_part
+    return None
 
 
 class OntologyIndex:
-    """Searchable index of ontology terms"""
+    """Searchable index of ontology terms
+    
+    Besides the plain word sets used by search_by_name/search_by_keyword, the
+    index keeps BM25 postings: for every word, the field-weighted frequency
+    in each term, where a hit in the name counts more than one in a synonym,
+    which counts more than one in the definition.
+    
+    The same tokenizer is applied to indexed text and to queries.
+    """
     
-    def __init__(self):
+    FIELD_WEIGHTS = {'name': 3.0, 'synonym': 2.0, 'definition': 1.0}
+    BM25_K1 = 1.2
+    BM25_B = 0.75
+    
+    def __init__(self, tokenizer: Optional[Tokenizer] = None):
+        self.tokenizer = tokenizer or DEFAULT_TOKENIZER
         self.terms: Dict[str, OntologyTerm] = {}
         self.name_index: Dict[str, Set[str]] = defaultdict(set)
+        self.synonym_index: Dict[str, Set[str]] = defaultdict(set)
         self.keyword_index: Dict[str, Set[str]] = defaultdict(set)
-        
+        # Normalised xref CURIE -> IDs of terms carrying that xref
+        self.xref_index: Dict[str, Set[str]] = defaultdict(set)
+        # BM25 postings: word -> {term ID: weighted frequency}, plus weighted term lengths
+        self.postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.doc_lengths: Dict[str, float] = {}
+        self.total_length = 0.0
+        self._length_norms: Optional[Dict[str, float]] = None
+        # Name-word structures for prefix/fuzzy search, built on first use
+        self._prefix_vocabulary: Optional[PrefixVocabulary] = None
+        self._fuzzy_vocabulary: Optional[FuzzyVocabulary] = None
+        # Class hierarchy, built on first use
+        self._graph: Optional[TermGraph] = None
+        # Secondary ID (alt_id / hasAlternativeId) -> primary term ID
+        self.alt_id_index: Dict[str, str] = {}
+        # Secondary and obsolete ID -> current replacement, built on first use
+        self._redirects: Optional[Dict[str, Redirect]] = None
+    
     def add_terms(self, terms: Dict[str, OntologyTerm]):
         """Add terms to the index"""
         self.terms.update(terms)
+        self._length_norms = None
+        self._prefix_vocabulary = None
+        self._fuzzy_vocabulary = None
+        self._graph = None
+        self._redirects = None
         
         # Build indices
+        tokenize = self.tokenizer.tokenize
         for term_id, term in terms.items():
+            for alt_id in term.alt_ids:
+                self.alt_id_index[alt_id] = term_id
+            
+            # Cross-references are indexed even for obsolete terms
+            for xref in term.xrefs:
+                self.xref_index[normalize_curie(xref)].add(term_id)
+            
             if term.is_obsolete:
                 continue
-                
+            
+            name_words = tokenize(term.name)
+            synonym_words = [word for synonym in term.synonyms for word in tokenize(synonym)]
+            definition_words = tokenize(term.definition)
+            
             # Index by name words
-            if term.name:
-                words = term.name.lower().split()
-                for word in words:
-                    self.name_index[word].add(term_id)
-                    
+            for word in name_words:
+                self.name_index[word].add(term_id)
+            
+            # Index by synonym words
+            for word in synonym_words:
+                self.synonym_index[word].add(term_id)
+            
             # Index by definition words
-            if term.definition:
-                words = term.definition.lower().split()
-                for word in words:
-                    # Skip common words
-                    if len(word) > 2:
-                        self.keyword_index[word].add(term_id)
+            for word in definition_words:
+                self.keyword_index[word].add(term_id)
+            
+            self._add_postings(term_id, name_words, synonym_words, definition_words)
+    
+    def _add_postings(self, term_id: str, name_words: List[str],
+                      synonym_words: List[str], definition_words: List[str]):
+        """Record field-weighted word frequencies of a term for ranking"""
+        weights = self.FIELD_WEIGHTS
+        counts: Dict[str, float] = defaultdict(float)
+        for words, weight in ((name_words, weights['name']),
+                              (synonym_words, weights['synonym']),
+                              (definition_words, weights['definition'])):
+            for word in words:
+                counts[word] += weight
+        if not counts:
+            return
+        
+        length = sum(counts.values())
+        previous = self.doc_lengths.get(term_id)
+        if previous is not None:
+            self.total_length -= previous
+        self.doc_lengths[term_id] = length
+        self.total_length += length
+        for word, frequency in counts.items():
+            self.postings[word][term_id] = frequency
     
     def get_term(self, term_id: str) -> Optional[OntologyTerm]:
         """Get term by ID"""
         return self.terms.get(term_id)
     
+    def resolve(self, term_id: str) -> Optional[OntologyTerm]:
+        """Get a term by its primary ID or by one of its secondary IDs"""
+        term = self.terms.get(term_id)
+        if term is None and term_id in self.alt_id_index:
+            term = self.terms.get(self.alt_id_index[term_id])
+        return term
+    
+    @property
+    def redirects(self) -> Dict[str, Redirect]:
+        """Current replacement of every secondary ID and obsolete term"""
+        if self._redirects is None:
+            redirects = {}
+            for term_id in self.alt_id_index:
+                if term_id not in self.terms:
+                    redirects[term_id] = follow_redirects(term_id, self.resolve)
+            for term_id, term in self.terms.items():
+                if term.is_obsolete:
+                    redirects[term_id] = follow_redirects(term_id, self.resolve)
+            self._redirects = redirects
+        return self._redirects
+    
+    def redirect(self, term_id: str) -> Optional[Redirect]:
+        """Replacement for a secondary or obsolete ID, None for current or unknown IDs"""
+        return self.redirects.get(term_id)
+    
+    def find_by_xref(self, curie: str, default_prefix: Optional[str] = None) -> List[str]:
+        """IDs of terms in this index that cross-reference the given CURIE"""
+        return sorted(self.xref_index.get(normalize_curie(curie, default_prefix), ()))
+    
+    @property
+    def graph(self) -> TermGraph:
+        """is_a / part_of hierarchy of the indexed terms"""
+        if self._graph is None:
+            self._graph = TermGraph.from_terms(self.terms)
+        return self._graph
+    
+    def _primary_id(self, term_id: str) -> str:
+        """Primary ID for a secondary ID; any other ID unchanged"""
+        term = self.resolve(term_id)
+        return term.id if term is not None else term_id
+    
+    def ancestors(self, term_id: str, relations: Iterable[str] = DEFAULT_RELATIONS) -> List[str]:
+        """IDs of every ancestor of a term, following is_a unless relations are given"""
+        return self.graph.ancestors(self._primary_id(term_id), relations)
+    
+    def descendants(self, term_id: str, relations: Iterable[str] = DEFAULT_RELATIONS) -> List[str]:
+        """IDs of every descendant of a term, following is_a unless relations are given"""
+        return self.graph.descendants(self._primary_id(term_id), relations)
+    
+    def is_descendant(self, term_id: str, ancestor_id: str,
+                      relations: Iterable[str] = DEFAULT_RELATIONS) -> bool:
+        """True if term_id is subsumed by ancestor_id (and is not the same term)
+        
+        Either ID may be a secondary ID; both are resolved to primary IDs first.
+        """
+        return self.graph.is_descendant(self._primary_id(term_id), self._primary_id(ancestor_id), relations)
+    
     def search_by_name(self, query: str) -> List[OntologyTerm]:
-        """Search terms by name"""
-        query_words = query.lower().split()
+        """Search terms whose name or synonyms contain every query word"""
+        query_words = set(self.tokenizer.tokenize(query))
         matches = None
         
         for word in query_words:
-            word_matches = self.name_index.get(word, set())
+            word_matches = self._name_word_ids(word)
             if matches is None:
                 matches = word_matches.copy()
             else:
@@ -222,41 +719,189 @@ class OntologyIndex:
         
         if not matches:
             return []
-            
+        
         return [self.terms[term_id] for term_id in matches if term_id in self.terms]
     
     def search_by_keyword(self, query: str) -> List[OntologyTerm]:
-        """Search terms by keywords in name or definition"""
-        query_words = query.lower().split()
+        """Search terms by keywords in name, synonyms or definition"""
+        query_words = set(self.tokenizer.tokenize(query))
         all_matches = set()
         
         for word in query_words:
-            # Search in names
+            # Search in names and synonyms
             all_matches.update(self.name_index.get(word, set()))
+            all_matches.update(self.synonym_index.get(word, set()))
             # Search in definitions
             all_matches.update(self.keyword_index.get(word, set()))
         
         return [self.terms[term_id] for term_id in all_matches if term_id in self.terms]
+    
+    def _name_word_ids(self, word: str) -> Set[str]:
+        """IDs of terms whose name or synonyms contain word"""
+        return self.name_index.get(word, set()) | self.synonym_index.get(word, set())
+    
+    def _name_vocabulary(self) -> List[str]:
+        """Every word occurring in a name or synonym"""
+        return list(self.name_index.keys() | self.synonym_index.keys())
+    
+    def _rank_by_name(self, term_ids: Set[str], limit: int) -> List[OntologyTerm]:
+        """Shortest names first, which suits autocomplete-style lists"""
+        return heapq.nsmallest(limit, (self.terms[term_id] for term_id in term_ids),
+                               key=lambda term: (len(term.name), term.id))
+    
+    def search_prefix(self, query: str, limit: int = 20) -> List[OntologyTerm]:
+        """Autocomplete: terms whose name words match the query, the last word as a prefix
+        
+        'galactur' finds 'D-galacturonic acid'; 'carbon sou' finds names with
+        'carbon' and a word starting with 'sou'. The last word is completed
+        even if it is a stopword, so 'for' finds 'formate'.
+        """
+        words, prefix = self.tokenizer.split_prefix(query)
+        if not prefix:
+            return []
+        if self._prefix_vocabulary is None:
+            self._prefix_vocabulary = PrefixVocabulary(self._name_vocabulary())
+        
+        matches: Optional[Set[str]] = None
+        for word in words:
+            word_matches = self._name_word_ids(word)
+            matches = word_matches if matches is None else matches & word_matches
+        
+        completed: Set[str] = set()
+        for word in self._prefix_vocabulary.complete(prefix):
+            completed |= self._name_word_ids(word)
+        matches = completed if matches is None else matches & completed
+        
+        return self._rank_by_name(matches, limit)
+    
+    def search_fuzzy(self, query: str, max_distance: int = 2,
+                     limit: int = 20) -> List[Tuple[OntologyTerm, int]]:
+        """Typo-tolerant name search returning (term, total edit distance) pairs
+        
+        Every query word must match some name or synonym word within
+        max_distance edits, so 'salicn' finds 'salicin'.
+        """
+        words = self.tokenizer.tokenize(query)
+        if not words:
+            return []
+        if self._fuzzy_vocabulary is None:
+            self._fuzzy_vocabulary = FuzzyVocabulary(self._name_vocabulary())
+        
+        distances: Optional[Dict[str, int]] = None
+        for word in words:
+            word_distances: Dict[str, int] = {}
+            for candidate, distance in self._fuzzy_vocabulary.match(word, max_distance):
+                for term_id in self._name_word_ids(candidate):
+                    if distance < word_distances.get(term_id, max_distance + 1):
+                        word_distances[term_id] = distance
+            if distances is None:
+                distances = word_distances
+            else:
+                distances = {term_id: distances[term_id] + distance
+                             for term_id, distance in word_distances.items() if term_id in distances}
+        
+        best = heapq.nsmallest(limit, distances.items(),
+                               key=lambda item: (item[1], len(self.terms[item[0]].name), item[0]))
+        return [(self.terms[term_id], distance) for term_id, distance in best]
+    
+    def search_ranked(self, query: str, k: int = 20) -> List[Tuple[OntologyTerm, float]]:
+        """Return the k best (term, score) pairs for a query, ranked by BM25"""
+        if not self.doc_lengths:
+            return []
+        
+        doc_count = len(self.doc_lengths)
+        k1, b = self.BM25_K1, self.BM25_B
+        if self._length_norms is None:
+            # Per-term length normalisation only changes when terms are added
+            avg_length = self.total_length / doc_count
+            self._length_norms = {term_id: k1 * (1.0 - b + b * length / avg_length)
+                                  for term_id, length in self.doc_lengths.items()}
+        norms = self._length_norms
+        scores: Dict[str, float] = defaultdict(float)
+        
+        for word in set(self.tokenizer.tokenize(query)):
+            posting = self.postings.get(word)
+            if not posting:
+                continue
+            idf = math.log(1.0 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            weight = idf * (k1 + 1.0)
+            for term_id, frequency in posting.items():
+                scores[term_id] += weight * frequency / (frequency + norms[term_id])
+        
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.terms[term_id], score) for term_id, score in best]
+    
+    def get_state(self) -> Dict[str, object]:
+        """Export terms and postings as plain containers for persistence"""
+        return {
+            'tokenizer': self.tokenizer.config(),
+            'terms': pack_terms(self.terms),
+            'name_index': {word: list(ids) for word, ids in self.name_index.items()},
+            'synonym_index': {word: list(ids) for word, ids in self.synonym_index.items()},
+            'keyword_index': {word: list(ids) for word, ids in self.keyword_index.items()},
+            'xref_index': {xref: list(ids) for xref, ids in self.xref_index.items()},
+            'postings': {word: (list(posting), list(posting.values()))
+                         for word, posting in self.postings.items()},
+            'doc_lengths': self.doc_lengths,
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, object]) -> 'OntologyIndex':
+        """Rebuild an index from get_state output without re-tokenising"""
+        index = cls(Tokenizer.from_config(state['tokenizer']))
+        index.terms = unpack_terms(state['terms'])
+        for word, ids in state['name_index'].items():
+            index.name_index[word] = set(ids)
+        for word, ids in state['synonym_index'].items():
+            index.synonym_index[word] = set(ids)
+        for word, ids in state['keyword_index'].items():
+            index.keyword_index[word] = set(ids)
+        for xref, ids in state['xref_index'].items():
+            index.xref_index[xref] = set(ids)
+        for word, (ids, frequencies) in state['postings'].items():
+            index.postings[word] = dict(zip(ids, frequencies))
+        index.doc_lengths = state['doc_lengths']
+        index.total_length = sum(index.doc_lengths.values())
+        for term_id, term in index.terms.items():
+            for alt_id in term.alt_ids:
+                index.alt_id_index[alt_id] = term_id
+        return index
 
 
-def parse_ontology(file_path: str) -> Dict[str, OntologyTerm]:
-    """Parse an ontology file (OBO or OWL format)"""
+def build_index(terms: Dict[str, OntologyTerm], tokenizer: Optional[Tokenizer] = None) -> OntologyIndex:
+    """Create an OntologyIndex over a term dictionary"""
+    index = OntologyIndex(tokenizer)
+    index.add_terms(terms)
+    return index
+
+
+def parse_ontology(file_path: str, use_cache: bool = True, fmt: Optional[str] = None) -> Dict[str, OntologyTerm]:
+    """Parse an ontology file (OBO or OWL format)
+    
+    The format is taken from the file suffix unless fmt ('obo' or 'owl')
+    is given. When use_cache is set, the term snapshot stored by
+    ontology_cache is reused if the file is unchanged, and a fresh parse is
+    written back to the cache; no search index is built or loaded.
+    """
+    if use_cache:
+        from ontology_cache import get_default_cache
+        return get_default_cache().load_terms(file_path, fmt)
+    
     file_path = Path(file_path)
+    fmt = fmt or file_path.suffix.lstrip('.')
     
-    if file_path.suffix == '.obo':
+    if fmt == 'obo':
         parser = OBOParser(file_path)
-    elif file_path.suffix == '.owl':
+    elif fmt == 'owl':
         parser = OWLParser(file_path)
     else:
-        raise ValueError(f"Unsupported file format: {file_path.suffix}")
+        raise ValueError(f"Unsupported file format: {fmt or file_path.suffix}")
     
     return parser.parse()
 
 
 if __name__ == "__main__":
     # Test parsing
-    import sys
-    
     if len(sys.argv) > 1:
         file_path = sys.argv[1]
         terms = parse_ontology(file_path)
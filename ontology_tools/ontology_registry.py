@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Registry of ontology files by CURIE prefix.
+
+Every tool finds its ontologies through one registry, read from
+ontology_registry.json (or the file named by $ONTOLOGY_REGISTRY):
+
+    {"ontology_dir": "../ontologies", "cache_dir": null,
+     "ontologies": {"OMP": {"files": ["omp.obo", "omp.owl"]},
+                    "MODELSEED": {"files": ["modelseed.owl"], "format": "owl"}}}
+
+files are alternatives tried in order, resolved against ontology_dir,
+which is itself relative to the registry file. format defaults to the
+file suffix. cache_dir, globally or per ontology, says where parsed
+snapshots are kept (default: $ONTOLOGY_CACHE_DIR or .ontology_cache).
+
+Environment overrides, for machines that keep the files elsewhere:
+
+    ONTOLOGY_REGISTRY        another registry file
+    ONTOLOGY_DIR             another directory for relative file names
+    ONTOLOGY_PATH_<PREFIX>   the file for one prefix, e.g. ONTOLOGY_PATH_MODELSEED
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional
+
+
+FORMATS = ('obo', 'owl')
+
+DEFAULT_REGISTRY_PATH = Path(__file__).parent / 'ontology_registry.json'
+
+
+class OntologySource:
+    """Location, format and cache directory of one ontology"""
+    
+    __slots__ = ('prefix', 'files', 'fmt', 'cache_dir')
+    
+    def __init__(self, prefix: str, files: List[Path], fmt: Optional[str] = None,
+                 cache_dir: Optional[Path] = None):
+        self.prefix = prefix
+        self.files = files
+        self.fmt = fmt
+        self.cache_dir = cache_dir
+    
+    @property
+    def path(self) -> Path:
+        """First listed file that exists, or the first one if none does"""
+        for file_path in self.files:
+            if file_path.exists():
+                return file_path
+        return self.files[0]
+    
+    @property
+    def format(self) -> str:
+        """'obo' or 'owl'"""
+        return self.fmt or self.path.suffix.lstrip('.').lower()
+    
+    def exists(self) -> bool:
+        return any(file_path.exists() for file_path in self.files)
+    
+    def __repr__(self):
+        return f"OntologySource({self.prefix}: {self.path})"
+
+
+class OntologyRegistry:
+    """Ontology sources by prefix, with case-insensitive CURIE routing"""
+    
+    def __init__(self, sources: Dict[str, OntologySource], cache_dir: Optional[Path] = None):
+        self.sources = sources
+        self.cache_dir = cache_dir
+        self._by_upper = {prefix.upper(): prefix for prefix in sources}
+    
+    @classmethod
+    def load(cls, path: Optional[Path] = None, ontology_dir: Optional[Path] = None,
+             environ: Optional[Mapping[str, str]] = None) -> 'OntologyRegistry':
+        """Read a registry file and apply the environment overrides
+        
+        An explicit ontology_dir takes precedence over $ONTOLOGY_DIR and the
+        file's own ontology_dir.
+        """
+        environ = os.environ if environ is None else environ
+        path = Path(path or environ.get('ONTOLOGY_REGISTRY') or DEFAULT_REGISTRY_PATH)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        base = path.parent
+        ontology_dir = Path(ontology_dir or environ.get('ONTOLOGY_DIR') or base / data.get('ontology_dir', '.'))
+        cache_dir = base / data['cache_dir'] if data.get('cache_dir') else None
+        
+        sources = {}
+        for prefix, entry in data.get('ontologies', {}).items():
+            files = [ontology_dir / name for name in entry.get('files', [])]
+            override = environ.get(f"ONTOLOGY_PATH_{prefix.upper()}")
+            if override:
+                files = [Path(override)]
+            if not files:
+                raise ValueError(f"{path}: no files listed for {prefix}")
+            fmt = entry.get('format')
+            if fmt is not None and fmt not in FORMATS:
+                raise ValueError(f"{path}: unknown format {fmt} for {prefix}")
+            source_cache = base / entry['cache_dir'] if entry.get('cache_dir') else None
+            sources[prefix] = OntologySource(prefix, files, fmt, source_cache)
+        return cls(sources, cache_dir)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.sources
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sources)
+    
+    def __len__(self) -> int:
+        return len(self.sources)
+    
+    def name_for_prefix(self, prefix: str) -> Optional[str]:
+        """Registered name for a CURIE prefix, matching case-insensitively"""
+        if prefix in self.sources:
+            return prefix
+        return self._by_upper.get(prefix.upper())
+    
+    def source(self, name: str) -> Optional[OntologySource]:
+        """Source registered under a name or prefix"""
+        name = self.name_for_prefix(name)
+        return self.sources[name] if name else None
+    
+    def resolve(self, curie: str) -> Optional[OntologySource]:
+        """Source of the ontology that owns a CURIE, or None for unregistered prefixes"""
+        prefix, colon, _ = curie.partition(':')
+        return self.source(prefix) if colon else None
+    
+    def paths(self) -> Dict[str, Path]:
+        """Current file of every registered ontology"""
+        return {name: source.path for name, source in self.sources.items()}
+
+
+_default_registry: Optional[OntologyRegistry] = None
+
+
+def get_default_registry() -> OntologyRegistry:
+    """Shared registry from ontology_registry.json and the environment"""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = OntologyRegistry.load()
+    return _default_registry
+
+
+def main():
+    """List the registered ontologies and where they are found"""
+    parser = argparse.ArgumentParser(description='Show the ontology registry')
+    parser.add_argument('registry', nargs='?', type=Path,
+                        help='Registry file (default: $ONTOLOGY_REGISTRY or ontology_registry.json)')
+    parser.add_argument('--check', action='store_true', help='Exit with status 1 if a file is missing')
+    args = parser.parse_args()
+    
+    try:
+        registry = OntologyRegistry.load(args.registry)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Invalid registry: {e}")
+        sys.exit(1)
+    
+    missing = 0
+    for name, source in registry.sources.items():
+        status = 'ok' if source.exists() else 'missing'
+        missing += status == 'missing'
+        cache = f"  cache: {source.cache_dir}" if source.cache_dir else ''
+        print(f"{name:<10} {source.format:<4} {status:<8} {source.path}{cache}")
+    if registry.cache_dir:
+        print(f"\nCache directory: {registry.cache_dir}")
+    if args.check and missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Long-running ontology lookup server.
+
+Loads an OntologyVerifier once and answers JSON requests over localhost
+HTTP, so repeated verify/search calls skip the parse cost entirely:
+
+    POST /verify   {"ids": ["OMP:0005009", ...]}
+    POST /xref     {"ids": ["CHEBI:17814", ...], "target": "MODELSEED"}
+    POST /search   {"ontology": "OMP", "query": "...", "type": "all", "max_results": 20}
+    POST /hierarchy {"id": "OMP:0006023", "relations": ["is_a"], "ancestor": "OMP:0000173"}
+    GET  /health
+    GET  /stats
+
+The CLIs use the server automatically when it is reachable (see
+ontology_client.py).
+"""
+
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from ontology_parser import term_to_dict
+from verify_term import OntologyVerifier
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+
+class OntologyService:
+    """Request handlers backed by one shared, lazily loading verifier"""
+    
+    def __init__(self, verifier: OntologyVerifier):
+        self.verifier = verifier
+        self.started = time.time()
+        self.request_count = 0
+        # Lookups are read-only; the lock only serialises on-demand loading
+        self._load_lock = threading.Lock()
+    
+    def _ensure_prefixes(self, term_ids: List[str]):
+        """Load ontologies for any prefixes not seen before"""
+        names = {self.verifier.ontology_for_prefix(term_id.split(':')[0])
+                 for term_id in term_ids if ':' in term_id}
+        names = {name for name in names if name and name not in self.verifier.ontologies}
+        if names:
+            with self._load_lock:
+                self.verifier.preload(sorted(names))
+    
+    def verify(self, request: Dict[str, object]) -> Dict[str, object]:
+        """Look up term IDs; unknown IDs map to null
+        
+        IDs without a registered prefix may load any ontology whose Bloom
+        filter admits them, so they are looked up under the load lock.
+        """
+        term_ids = list(request['ids'])
+        self._ensure_prefixes(term_ids)
+        unregistered = [term_id for term_id in term_ids
+                        if self.verifier.ontology_for_prefix(term_id.partition(':')[0]) is None]
+        found = {}
+        if unregistered:
+            with self._load_lock:
+                found = self.verifier.verify_terms(unregistered)
+        found.update(self.verifier.verify_terms(term_id for term_id in term_ids if term_id not in found))
+        return {'terms': {term_id: term_to_dict(found[term_id]) if found[term_id] else None
+                          for term_id in term_ids}}
+    
+    def xref(self, request: Dict[str, object]) -> Dict[str, object]:
+        """Map term IDs to IDs in a target ontology via the reverse xref index"""
+        target = request.get('target', 'MODELSEED')
+        with self._load_lock:
+            self.verifier.ensure_loaded(target)
+        return {'mappings': {term_id: self.verifier.get_xref_mapping(
+                    term_id, target, request.get('source_prefix'))
+                             for term_id in request['ids']}}
+    
+    def hierarchy(self, request: Dict[str, object]) -> Dict[str, object]:
+        """Ancestors and descendants of a term, plus an optional subsumption check"""
+        term_id = request['id']
+        relations = request.get('relations') or ['is_a']
+        self._ensure_prefixes([term_id])
+        ancestor = request.get('ancestor')
+        return {
+            'ancestors': self.verifier.get_ancestors(term_id, relations),
+            'descendants': self.verifier.get_descendants(term_id, relations),
+            'is_descendant': self.verifier.is_descendant(term_id, ancestor, relations) if ancestor else None,
+        }
+    
+    def search(self, request: Dict[str, object]) -> Dict[str, object]:
+        """Search one loaded ontology with any OntologyIndex search mode"""
+        name = request['ontology'].upper()
+        with self._load_lock:
+            index = self.verifier.ensure_loaded(name)
+        if index is None:
+            raise KeyError(f"Ontology not available: {name}")
+        
+        query = request['query']
+        search_type = request.get('type', 'all')
+        max_results = int(request.get('max_results', 20))
+        if search_type == 'name':
+            results = index.search_by_name(query)
+        elif search_type == 'prefix':
+            results = index.search_prefix(query, max_results)
+        elif search_type == 'fuzzy':
+            results = [term for term, _ in index.search_fuzzy(
+                query, int(request.get('max_distance', 2)), max_results)]
+        else:
+            results = [term for term, _ in index.search_ranked(query, max_results)]
+        return {'results': [term_to_dict(term) for term in results]}
+    
+    def stats(self) -> Dict[str, object]:
+        """Loaded ontologies and request counters"""
+        return {
+            'uptime_s': time.time() - self.started,
+            'requests': self.request_count,
+            'loaded': {name: len(index.terms) for name, index in self.verifier.ontologies.items()},
+            'load_times': self.verifier.load_times,
+        }
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Routes JSON requests to the OntologyService on the server"""
+    
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+    
+    def _send_json(self, status: int, payload: Dict[str, object]):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        service = self.server.service
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            self._send_json(200, service.stats())
+        else:
+            self._send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+    
+    def do_POST(self):
+        service = self.server.service
+        routes = {'/verify': service.verify, '/xref': service.xref, '/search': service.search,
+                  '/hierarchy': service.hierarchy}
+        handler = routes.get(self.path)
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if handler is None:
+            self._send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+            return
+        
+        service.request_count += 1
+        try:
+            response = handler(json.loads(body or b'{}'))
+        except (KeyError, TypeError, ValueError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        self._send_json(200, response)
+    
+    def log_message(self, format, *args):
+        # Per-request logging would dominate latency under load
+        pass
+
+
+def serve(service: OntologyService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    """Serve requests until interrupted"""
+    server = ThreadingHTTPServer((host, port), _RequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    print(f"Ontology server listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+
+
+def main():
+    """Start the ontology server"""
+    parser = argparse.ArgumentParser(description='Serve ontology lookups from a warm in-memory index')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Interface to bind (default: localhost only)')
+    parser.add_argument('--port', '-p', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('--eager', action='store_true',
+                       help='Load every configured ontology before serving')
+    parser.add_argument('--preload', default='',
+                       help='Comma-separated ontologies to load before serving')
+    parser.add_argument('--workers', '-j', type=int, default=1,
+                       help='Worker processes for the initial load')
+    
+    args = parser.parse_args()
+    
+    verifier = OntologyVerifier(lazy=True)
+    if args.eager:
+        verifier.load_all(workers=args.workers)
+    else:
+        verifier.preload((name.strip().upper() for name in args.preload.split(',') if name.strip()),
+                         workers=args.workers)
+    if verifier.load_times:
+        print(verifier.format_load_report())
+    
+    serve(OntologyService(verifier), args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
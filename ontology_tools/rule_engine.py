@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Declarative checks on how a document uses verified ontology terms.
+
+Rules live in a JSON file (verification_rules.json by default), so each
+lesson learned from a reviewed document can be added without editing
+Python. A rule selects terms by exact ID, by prefix or by a regex on the
+term name ("prefix": "*" selects every term), optionally narrows them by
+verification status, slot label or the text of the lines the term
+appears on, and states the semantic category the term really belongs to
+and the message to report:
+
+    {"id": "omp-acidophile", "term": "OMP:0005009",
+     "context": "(?i)utiliz", "category": "pH growth phenotype",
+     "expected": "carbon utilization phenotype", "severity": "error",
+     "message": "`{term_id}` is '{name}' ({category}), not a {expected}",
+     "advice": "carbon-postcomposition"}
+
+Rules are compiled into dictionaries keyed by term ID and by prefix plus
+one combined regex over all name patterns. Each pattern sits in its own
+named lookahead group, so a single match against a term name tells which
+name rules apply; that answer is kept per distinct name. Each usage is
+thus tested only against the rules that can apply to it, and only the
+most specific matching rule of each severity is reported: term rules
+before prefix rules before name rules before "*" rules.
+"""
+
+import re
+import sys
+import json
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from slot_validation import Finding
+
+
+DEFAULT_RULES_PATH = Path(__file__).parent / 'verification_rules.json'
+
+SEVERITIES = ('error', 'warning', 'recommendation')
+
+# not_found: no such term; unverified: no ontology configured for the prefix
+STATUSES = ('verified', 'obsolete', 'not_found', 'unverified')
+
+_GLOBAL_FLAGS_RE = re.compile(r'\(\?([aiLmsux]+)\)')
+# Numbered or named back-references would point at the wrong group once combined
+_BACKREF_RE = re.compile(r'\\[1-9]|\(\?P=')
+
+
+def _scoped_pattern(pattern: str) -> str:
+    """A pattern as a non-capturing group, its leading inline flags made local: (?i)x -> (?i:x)"""
+    flags = ''
+    match = _GLOBAL_FLAGS_RE.match(pattern)
+    while match:
+        flags += match.group(1)
+        pattern = pattern[match.end():]
+        match = _GLOBAL_FLAGS_RE.match(pattern)
+    # In verbose mode a trailing comment would swallow the closing parenthesis
+    return f"(?{flags}:{pattern}\n)" if 'x' in flags else f"(?{flags}:{pattern})"
+
+
+class TermUsage:
+    """Everything the rules may look at for one term in one document"""
+    
+    __slots__ = ('term_id', 'prefix', 'status', 'name', 'labels', 'lines', 'line_numbers')
+    
+    def __init__(self, term_id: str, status: str, name: str = '',
+                 labels: Iterable[str] = (), lines: Iterable[str] = (),
+                 line_numbers: Iterable[int] = ()):
+        self.term_id = term_id
+        self.prefix = term_id.partition(':')[0]
+        self.status = status
+        self.name = name
+        self.labels = list(labels)
+        self.lines = list(lines)
+        self.line_numbers = list(line_numbers)
+
+
+class Rule:
+    """One compiled entry of a rules file"""
+    
+    def __init__(self, spec: Dict[str, object]):
+        self.id = str(spec['id'])
+        self.term = spec.get('term')
+        self.prefix = spec.get('prefix')
+        self.name = spec.get('name')
+        if not (self.term or self.prefix or self.name):
+            raise ValueError(f"Rule {self.id} needs a term, prefix or name selector")
+        self.name_re = re.compile(self.name) if self.name else None
+        self.label_re = re.compile(spec['label']) if spec.get('label') else None
+        self.context_re = re.compile(spec['context']) if spec.get('context') else None
+        self.context_absent_re = re.compile(spec['context_absent']) if spec.get('context_absent') else None
+        status = spec.get('status', ['verified'])
+        self.status = frozenset([status] if isinstance(status, str) else status)
+        unknown = self.status - set(STATUSES)
+        if unknown:
+            raise ValueError(f"Rule {self.id}: unknown status {', '.join(sorted(unknown))}")
+        self.severity = spec.get('severity', 'error')
+        if self.severity not in SEVERITIES:
+            raise ValueError(f"Rule {self.id}: unknown severity {self.severity}")
+        self.category = spec.get('category', '')
+        self.expected = spec.get('expected', '')
+        self.message = spec['message']
+        self.advice = spec.get('advice')
+    
+    def match_line(self, usage: TermUsage) -> Optional[int]:
+        """Line number the rule fires on for a usage, or None if it does not apply"""
+        if usage.status not in self.status:
+            return None
+        if self.name_re is not None and not self.name_re.search(usage.name):
+            return None
+        if self.label_re is not None and not any(self.label_re.search(label) for label in usage.labels):
+            return None
+        if self.context_absent_re is not None and \
+                any(self.context_absent_re.search(line) for line in usage.lines):
+            return None
+        if self.context_re is None:
+            return usage.line_numbers[0] if usage.line_numbers else 0
+        for line_number, line in zip(usage.line_numbers, usage.lines):
+            if self.context_re.search(line):
+                return line_number
+        return None
+    
+    def format(self, usage: TermUsage) -> str:
+        return self.message.format(term_id=usage.term_id, prefix=usage.prefix, name=usage.name,
+                                   category=self.category, expected=self.expected,
+                                   label=usage.labels[0] if usage.labels else '')
+
+
+class RuleFinding(Finding):
+    """A Finding raised by a declarative rule, with an optional advice key"""
+    
+    __slots__ = ('rule', 'advice')
+    
+    def __init__(self, rule: Rule, line: int, curie: str, message: str):
+        super().__init__(rule.severity, line, f"rule {rule.id}", curie, message)
+        self.rule = rule
+        self.advice = rule.advice
+
+
+class RuleEngine:
+    """Rules indexed by term ID, prefix and name pattern"""
+    
+    def __init__(self, rules: Iterable[Rule] = (),
+                 advice: Optional[Dict[str, Dict[str, object]]] = None):
+        self.rules = list(rules)
+        # advice key -> {'title': ..., 'lines': [...]}
+        self.advice = advice or {}
+        self.by_term: Dict[str, List[Rule]] = defaultdict(list)
+        self.by_prefix: Dict[str, List[Rule]] = defaultdict(list)
+        self.by_name: List[Rule] = []
+        for rule in self.rules:
+            if rule.advice and rule.advice not in self.advice:
+                raise ValueError(f"Rule {rule.id}: unknown advice {rule.advice}")
+            if rule.term:
+                self.by_term[rule.term].append(rule)
+            elif rule.prefix:
+                self.by_prefix[rule.prefix].append(rule)
+            else:
+                self.by_name.append(rule)
+        self.name_index, self._name_groups = self._combine_names()
+        # Patterns that cannot be combined are always tested on their own
+        indexed = set(self._name_groups.values())
+        self._unindexed_names = {rule for rule in self.by_name if rule not in indexed}
+        self._name_matches: Dict[str, List[Rule]] = {}
+    
+    def _combine_names(self):
+        """One regex over the name patterns, with a named group per rule
+        
+        Every pattern is an optional lookahead anchored at the start of the
+        name, '(?:(?=(?P<r0>.*?pattern)))?', so one match() sets the group
+        of each rule whose pattern occurs anywhere in the name.
+        """
+        groups = {f"r{i}": rule for i, rule in enumerate(self.by_name)
+                  if not rule.name_re.groupindex and not _BACKREF_RE.search(rule.name)}
+        if not groups:
+            return None, {}
+        try:
+            pattern = re.compile(''.join(f"(?:(?=(?P<{group}>(?s:.*?){_scoped_pattern(rule.name)})))?"
+                                         for group, rule in groups.items()))
+        except re.error:
+            return None, {}
+        return pattern, groups
+    
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> 'RuleEngine':
+        """Compile a rules file (default: verification_rules.json)"""
+        with open(path or DEFAULT_RULES_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls([Rule(spec) for spec in data.get('rules', [])], data.get('advice'))
+    
+    def name_rules(self, name: str) -> List[Rule]:
+        """Name rules whose pattern matches a term name, in rules-file order
+        
+        The matching rules are read off the groups set by the combined
+        regex; only patterns that could not be combined are searched one by
+        one. The result is kept per name, since the same terms recur across
+        documents.
+        """
+        rules = self._name_matches.get(name)
+        if rules is None:
+            matched = set()
+            if self.name_index is not None:
+                groups = self.name_index.match(name).groupdict()
+                matched = {self._name_groups[group] for group, text in groups.items() if text is not None}
+            rules = [rule for rule in self.by_name if rule in matched or
+                     (rule in self._unindexed_names and rule.name_re.search(name))]
+            self._name_matches[name] = rules
+        return rules
+    
+    def candidates(self, usage: TermUsage) -> List[Rule]:
+        """Rules whose selector can match a usage"""
+        rules = self.by_term.get(usage.term_id, []) + self.by_prefix.get(usage.prefix, [])
+        if self.by_name and usage.name:
+            rules.extend(self.name_rules(usage.name))
+        return rules + self.by_prefix.get('*', [])
+    
+    def check(self, usages: Iterable[TermUsage]) -> List[RuleFinding]:
+        """Evaluate the applicable rules against each usage"""
+        findings = []
+        for usage in usages:
+            reported = set()
+            for rule in self.candidates(usage):
+                if rule.severity in reported:
+                    continue
+                line = rule.match_line(usage)
+                if line is not None:
+                    reported.add(rule.severity)
+                    findings.append(RuleFinding(rule, line, usage.term_id, rule.format(usage)))
+        return findings
+
+
+def build_usages(lines: List[str], terms_with_lines: Dict[str, List[int]],
+                 terms: Dict[str, object], labels: Dict[str, List[str]]) -> List[TermUsage]:
+    """TermUsage for each CURIE of a document from its lookups and slot labels"""
+    usages = []
+    for term_id, line_numbers in terms_with_lines.items():
+        term = terms.get(term_id)
+        if term_id not in terms:
+            status = 'unverified'
+        elif term is None:
+            status = 'not_found'
+        else:
+            status = 'obsolete' if term.is_obsolete else 'verified'
+        usages.append(TermUsage(term_id, status, term.name if term else '',
+                                labels.get(term_id, ()),
+                                [lines[n - 1] for n in line_numbers], line_numbers))
+    return usages
+
+
+_default_engine: Optional[RuleEngine] = None
+
+
+def get_default_engine() -> RuleEngine:
+    """Shared engine for verification_rules.json"""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = RuleEngine.load()
+    return _default_engine
+
+
+def main():
+    """Check a rules file and list its rules"""
+    parser = argparse.ArgumentParser(description='Validate and list declarative verification rules')
+    parser.add_argument('rules', nargs='?', type=Path, default=DEFAULT_RULES_PATH,
+                        help='Rules file (default: verification_rules.json)')
+    args = parser.parse_args()
+    
+    try:
+        engine = RuleEngine.load(args.rules)
+    except (OSError, ValueError, KeyError, re.error) as e:
+        print(f"Invalid rules file {args.rules}: {e}")
+        sys.exit(1)
+    
+    print(f"{args.rules}: {len(engine.rules)} rules "
+          f"({len(engine.by_term)} terms, {len(engine.by_prefix)} prefixes, "
+          f"{len(engine.by_name)} name patterns), {len(engine.advice)} advice blocks")
+    for rule in engine.rules:
+        selector = rule.term or (f"{rule.prefix}:*" if rule.prefix else f"name /{rule.name}/")
+        selector = '*' if rule.prefix == '*' else selector
+        print(f"- [{rule.severity}] {rule.id}: {selector}")
+
+
+if __name__ == "__main__":
+    main()
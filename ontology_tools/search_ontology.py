@@ -4,39 +4,71 @@ Search ontology terms by keyword.
 """
 
 import sys
+import time
 import argparse
-from pathlib import Path
-from typing import List
-from ontology_parser import parse_ontology, OntologyTerm, OntologyIndex
+from typing import List, Optional
+from ontology_parser import OntologyTerm, build_index
+from ontology_cache import get_default_cache
+from text_tokenizer import Tokenizer
+from ontology_client import get_client
+from ontology_registry import get_default_registry
 
 
-def search_ontology(ontology_path: str, query: str, search_type: str = 'all') -> List[OntologyTerm]:
-    """Search an ontology for terms matching the query"""
-    print(f"Loading ontology from {ontology_path}...")
-    terms = parse_ontology(ontology_path)
+def search_ontology(ontology_path: str, query: str, search_type: str = 'all',
+                    max_results: int = 20, stem: bool = False,
+                    max_distance: int = 2, fmt: Optional[str] = None) -> List[OntologyTerm]:
+    """Search an ontology for terms matching the query
     
-    index = OntologyIndex()
-    index.add_terms(terms)
+    'all' returns the max_results best terms in BM25 rank order; 'name'
+    returns every term whose name or synonyms contain all query words,
+    unordered. 'prefix' autocompletes the last query word and 'fuzzy'
+    tolerates up to max_distance typos per word; both return the best
+    max_results matches. With stem, plural endings are ignored on both sides, which
+    needs a fresh index over the cached terms.
+    """
+    print(f"Loading ontology from {ontology_path}...")
+    index = get_default_cache().load_index(ontology_path, fmt)
+    if stem:
+        index = build_index(index.terms, Tokenizer(stem=True))
     
-    print(f"Searching {len(terms)} terms for '{query}'...")
+    print(f"Searching {len(index.terms)} terms for '{query}'...")
     
+    start = time.perf_counter()
     if search_type == 'name':
         results = index.search_by_name(query)
-    else:  # 'all' or 'keyword'
-        results = index.search_by_keyword(query)
+    elif search_type == 'prefix':
+        results = index.search_prefix(query, max_results)
+    elif search_type == 'fuzzy':
+        results = [term for term, _ in index.search_fuzzy(query, max_distance, max_results)]
+    else:  # 'all'
+        results = [term for term, _ in index.search_ranked(query, max_results)]
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"Query latency: {elapsed_ms:.2f} ms")
     
     return results
 
 
-def format_search_results(results: List[OntologyTerm], max_results: int = 20) -> str:
-    """Format search results for display"""
+def format_search_results(results: List[OntologyTerm], max_results: int = 20,
+                          search_type: str = 'name') -> str:
+    """Format search results for display
+    
+    Prefix, fuzzy and ranked results keep their order; name matches are
+    sorted by term ID.
+    """
     if not results:
         return "No matching terms found."
     
-    output = [f"Found {len(results)} matching terms:"]
-    
-    # Sort by term ID for consistent display
-    results.sort(key=lambda t: t.id)
+    shown = min(len(results), max_results)
+    if search_type == 'all':
+        output = [f"Top {shown} ranked matches (BM25):"]
+    elif search_type == 'prefix':
+        output = [f"First {shown} prefix matches:"]
+    elif search_type == 'fuzzy':
+        output = [f"Top {shown} fuzzy matches (by edit distance):"]
+    else:
+        output = [f"Found {len(results)} matching terms:"]
+        # Sort by term ID for consistent display
+        results.sort(key=lambda t: t.id)
     
     # Display up to max_results
     for i, term in enumerate(results[:max_results]):
@@ -60,35 +92,50 @@ def main():
     """Main search function"""
     parser = argparse.ArgumentParser(description='Search ontology terms')
     parser.add_argument('--ontology', '-o', required=True, 
-                       choices=['OMP', 'MCO', 'MODELSEED'],
+                       choices=sorted(get_default_registry()),
                        help='Ontology to search')
     parser.add_argument('--search', '-s', required=True,
                        help='Search query')
     parser.add_argument('--type', '-t', default='all',
-                       choices=['name', 'all'],
-                       help='Search type: name only or all fields')
+                       choices=['name', 'all', 'prefix', 'fuzzy'],
+                       help='Search type: name only, all fields ranked by BM25, '
+                            'name prefix (autocomplete) or fuzzy name match')
+    parser.add_argument('--max-distance', '-d', type=int, default=2,
+                       help='Maximum edits per word for fuzzy search')
+    parser.add_argument('--stem', action='store_true',
+                       help='Ignore plural endings when matching words')
     parser.add_argument('--max-results', '-m', type=int, default=20,
                        help='Maximum number of results to display')
+    parser.add_argument('--no-server', action='store_true',
+                       help='Search locally even if an ontology server is running')
     
     args = parser.parse_args()
     
-    # Determine ontology path
-    ontology_paths = {
-        'OMP': Path(__file__).parent.parent / 'ontologies' / 'omp.obo',
-        'MCO': Path(__file__).parent.parent / 'ontologies' / 'mco.obo',
-        'MODELSEED': Path('/Users/jplfaria/repos/KBaseCDMOntologies_back_up/KBase_CDM_Ontologies/ontology_data_owl/modelseed.owl')
-    }
+    # Stemming needs its own index, which the server does not keep
+    client = None if args.no_server or args.stem else get_client()
+    if client:
+        print(f"Searching {args.ontology} on ontology server at {client.url}...")
+        start = time.perf_counter()
+        results = client.search(args.ontology, args.search, args.type,
+                                args.max_results, args.max_distance)
+        print(f"Query latency: {(time.perf_counter() - start) * 1000:.2f} ms")
+        print("\n" + format_search_results(results, args.max_results, args.type))
+        return
     
-    ontology_path = ontology_paths.get(args.ontology)
-    if not ontology_path or not ontology_path.exists():
-        print(f"Error: Ontology file not found for {args.ontology}")
+    # Determine ontology path
+    source = get_default_registry().source(args.ontology)
+    if not source.exists():
+        print(f"Error: Ontology file not found for {args.ontology}: {source.path} "
+              f"(set ONTOLOGY_PATH_{args.ontology} to use another file)")
         sys.exit(1)
+    ontology_path = source.path
     
     # Perform search
-    results = search_ontology(str(ontology_path), args.search, args.type)
+    results = search_ontology(str(ontology_path), args.search, args.type,
+                              args.max_results, args.stem, args.max_distance, source.format)
     
     # Display results
-    print("\n" + format_search_results(results, args.max_results))
+    print("\n" + format_search_results(results, args.max_results, args.type))
 
 
 if __name__ == "__main__":
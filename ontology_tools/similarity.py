@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Information-content similarity between terms of one ontology.
+
+Information content is intrinsic to the is_a graph: a term with many
+descendants is general and carries little information,
+
+    IC(t) = -log((descendants(t) + 1) / N)
+
+Resnik similarity is the IC of the most informative common ancestor of two
+terms (each term counting as its own ancestor), and Lin similarity
+normalises it by the terms' own IC: 2 * resnik / (IC(a) + IC(b)).
+
+Everything is computed with NumPy over the CSR closure of term_graph.py.
+For a query term, the IC of its ancestors is scattered into a dense
+vector; the shared ancestors of any number of other terms are then
+gathered from the concatenated ancestor lists in one call, and
+np.maximum.reduceat takes the best per term. One-vs-many results are
+cached per query term.
+"""
+
+import sys
+import argparse
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from term_graph import DEFAULT_RELATIONS, TermGraph
+
+
+METHODS = ('resnik', 'lin')
+
+
+class SimilarityEngine:
+    """Resnik/Lin similarity over the closure of one TermGraph"""
+    
+    def __init__(self, graph: TermGraph, relations: Iterable[str] = DEFAULT_RELATIONS,
+                 cache_size: int = 1024):
+        self.graph = graph
+        closure = graph.closure(relations)
+        count = len(graph)
+        offsets = np.frombuffer(closure.ancestor_offsets, dtype=np.dtype(closure.ancestor_offsets.typecode))
+        ancestors = np.frombuffer(closure.ancestors, dtype=np.dtype(closure.ancestors.typecode))
+        descendant_offsets = np.frombuffer(closure.descendant_offsets,
+                                           dtype=np.dtype(closure.descendant_offsets.typecode))
+        
+        # Intrinsic information content from descendant counts
+        descendants = np.diff(descendant_offsets)
+        self.ic = -np.log((descendants + 1.0) / max(count, 1))
+        
+        # Ancestor lists that include the term itself, self first
+        sizes = np.diff(offsets) + 1
+        self.offsets = np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+        self.ancestors = np.empty(int(self.offsets[-1]), dtype=np.int64)
+        own = self.offsets[:-1]
+        others = np.ones(len(self.ancestors), dtype=bool)
+        others[own] = False
+        self.ancestors[own] = np.arange(count)
+        self.ancestors[others] = ancestors
+        
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[Tuple[int, str], np.ndarray]' = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    @classmethod
+    def for_index(cls, index, relations: Iterable[str] = DEFAULT_RELATIONS) -> 'SimilarityEngine':
+        """Engine for the hierarchy of an OntologyIndex"""
+        return cls(index.graph, relations)
+    
+    def positions(self, term_ids: Sequence[str]) -> np.ndarray:
+        """Graph positions of term IDs; unknown IDs raise KeyError"""
+        return np.fromiter((self.graph.positions[term_id] for term_id in term_ids),
+                           dtype=np.int64, count=len(term_ids))
+    
+    def information_content(self, term_id: str) -> float:
+        """IC of one term"""
+        return float(self.ic[self.graph.positions[term_id]])
+    
+    def _gather(self, targets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Concatenated ancestor lists of targets and the start of each list"""
+        starts = self.offsets[targets]
+        sizes = self.offsets[targets + 1] - starts
+        segment_starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        # Position of every gathered entry within self.ancestors
+        index = np.arange(int(sizes.sum())) - np.repeat(segment_starts - starts, sizes)
+        return self.ancestors[index], segment_starts
+    
+    def _one_vs_many(self, source: int, targets: np.ndarray, method: str) -> np.ndarray:
+        if method not in METHODS:
+            raise ValueError(f"Unknown similarity method: {method}")
+        if not len(targets):
+            return np.zeros(0)
+        shared_ic = np.zeros(len(self.ic))
+        source_ancestors = self.ancestors[self.offsets[source]:self.offsets[source + 1]]
+        shared_ic[source_ancestors] = self.ic[source_ancestors]
+        gathered, segment_starts = self._gather(targets)
+        resnik = np.maximum.reduceat(shared_ic[gathered], segment_starts)
+        if method == 'resnik':
+            return resnik
+        total = self.ic[source] + self.ic[targets]
+        return np.divide(2.0 * resnik, total, out=np.ones_like(resnik), where=total > 0)
+    
+    def one_vs_all(self, term_id: str, method: str = 'lin') -> np.ndarray:
+        """Similarity of a term to every term in the graph, in graph order (cached)"""
+        source = self.graph.positions[term_id]
+        key = (source, method)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            self._cache.move_to_end(key)
+            return cached
+        self.cache_misses += 1
+        scores = self._one_vs_many(source, np.arange(len(self.ic)), method)
+        scores.flags.writeable = False
+        self._cache[key] = scores
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return scores
+    
+    def one_vs_many(self, term_id: str, term_ids: Sequence[str], method: str = 'lin') -> np.ndarray:
+        """Similarity of one term to each of several others"""
+        targets = self.positions(term_ids)
+        key = (self.graph.positions[term_id], method)
+        if key in self._cache:
+            return self.one_vs_all(term_id, method)[targets]
+        return self._one_vs_many(key[0], targets, method)
+    
+    def similarity(self, term_a: str, term_b: str, method: str = 'lin') -> float:
+        """Similarity of two terms"""
+        return float(self.one_vs_many(term_a, [term_b], method)[0])
+    
+    def pairwise(self, term_ids_a: Sequence[str], term_ids_b: Optional[Sequence[str]] = None,
+                 method: str = 'lin') -> np.ndarray:
+        """Matrix of similarities between two lists of terms (or one list and itself)"""
+        if method not in METHODS:
+            raise ValueError(f"Unknown similarity method: {method}")
+        term_ids_b = term_ids_a if term_ids_b is None else term_ids_b
+        targets = self.positions(term_ids_b)
+        matrix = np.empty((len(term_ids_a), len(term_ids_b)))
+        if not len(targets):
+            return matrix
+        gathered, segment_starts = self._gather(targets)
+        shared_ic = np.zeros(len(self.ic))
+        for row, source in enumerate(self.positions(term_ids_a)):
+            source_ancestors = self.ancestors[self.offsets[source]:self.offsets[source + 1]]
+            shared_ic[source_ancestors] = self.ic[source_ancestors]
+            resnik = np.maximum.reduceat(shared_ic[gathered], segment_starts)
+            shared_ic[source_ancestors] = 0.0
+            if method == 'resnik':
+                matrix[row] = resnik
+            else:
+                total = self.ic[source] + self.ic[targets]
+                matrix[row] = np.divide(2.0 * resnik, total, out=np.ones_like(resnik), where=total > 0)
+        return matrix
+    
+    def most_similar(self, term_id: str, k: int = 10, method: str = 'lin',
+                     candidates: Optional[Sequence[str]] = None) -> List[Tuple[str, float]]:
+        """The k terms most similar to term_id, among candidates or the whole ontology"""
+        if candidates is None:
+            scores = self.one_vs_all(term_id, method).copy()
+            scores[self.graph.positions[term_id]] = -np.inf
+            ids = self.graph.ids
+        else:
+            ids = [candidate for candidate in candidates if candidate != term_id]
+            scores = self.one_vs_many(term_id, ids, method)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(ids[i], float(scores[i])) for i in best if np.isfinite(scores[i])]
+    
+    def rank_candidates(self, candidates: Sequence[str], context: Sequence[str],
+                        method: str = 'lin') -> List[Tuple[str, float]]:
+        """Order candidate terms by mean similarity to context terms
+        
+        Used to pick a replacement for a term that was not found: the
+        candidates (e.g. from a name search on its label) are ranked by how
+        close they are to the verified terms around it.
+        """
+        known = [term_id for term_id in context if term_id in self.graph.positions]
+        candidates = [term_id for term_id in candidates if term_id in self.graph.positions]
+        if not candidates:
+            return []
+        if not known:
+            return [(term_id, 0.0) for term_id in candidates]
+        scores = self.pairwise(candidates, known, method).mean(axis=1)
+        order = np.argsort(-scores, kind='stable')
+        return [(candidates[i], float(scores[i])) for i in order]
+
+
+def main():
+    """Print similarities between ontology terms"""
+    from verify_term import OntologyVerifier
+    
+    parser = argparse.ArgumentParser(
+        description='Resnik/Lin similarity between terms of one ontology',
+        epilog='Example: similarity.py OMP:0006023 OMP:0000173 OMP:0005009')
+    parser.add_argument('term_ids', nargs='+', metavar='term_id',
+                        help='Terms to compare pairwise (all from the same ontology)')
+    parser.add_argument('--method', choices=METHODS, default='lin', help='Similarity measure')
+    parser.add_argument('--similar', type=int, metavar='K',
+                        help='Instead, list the K most similar terms to each term')
+    parser.add_argument('--relations', default=','.join(DEFAULT_RELATIONS),
+                        help='Comma-separated relations of the hierarchy (default: is_a)')
+    args = parser.parse_args()
+    
+    verifier = OntologyVerifier(lazy=True)
+    index = verifier.index_for_term(args.term_ids[0])
+    if index is None:
+        print(f"Error: no ontology configured for {args.term_ids[0]}")
+        sys.exit(1)
+    relations = [relation.strip() for relation in args.relations.split(',') if relation.strip()]
+    engine = SimilarityEngine.for_index(index, relations)
+    missing = [term_id for term_id in args.term_ids if term_id not in engine.graph.positions]
+    if missing:
+        print(f"Error: not in the {args.term_ids[0].split(':')[0]} hierarchy: {', '.join(missing)}")
+        sys.exit(1)
+    
+    def label(term_id: str) -> str:
+        term = index.get_term(term_id)
+        return f"{term_id} ({term.name})" if term and term.name else term_id
+    
+    if args.similar:
+        for term_id in args.term_ids:
+            print(f"\n{label(term_id)}  IC={engine.information_content(term_id):.3f}")
+            for other, score in engine.most_similar(term_id, args.similar, args.method):
+                print(f"  {score:6.3f}  {label(other)}")
+        return
+    
+    matrix = engine.pairwise(args.term_ids, method=args.method)
+    width = max(len(term_id) for term_id in args.term_ids)
+    print(' ' * width + '  ' + '  '.join(term_id.rjust(width) for term_id in args.term_ids))
+    for term_id, row in zip(args.term_ids, matrix):
+        print(term_id.ljust(width) + '  ' + '  '.join(f"{score:{width}.3f}" for score in row))
+
+
+if __name__ == "__main__":
+    main()
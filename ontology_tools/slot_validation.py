@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Slot-aware validation of the YAML annotation blocks in a document.
+
+Each fenced ```yaml block is parsed once into a node tree, keeping line
+numbers. Every scalar holding a CURIE is checked against the rule for its
+slot (the chain of mapping keys leading to it): an evidence type must be
+an ECO term, a quality a PATO term, and so on. When a slot carries a
+label (a sibling "label" key or an inline comment), the label is also
+compared with the verified term's name, which catches IDs that point at
+the wrong term.
+
+Parsing needs PyYAML (pip install pyyaml). It is imported on first use,
+so the other tools work without it; batch_verify then reports that the
+YAML slots were not checked.
+"""
+
+import sys
+import argparse
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from curie_extractor import CurieExtractor, get_default_extractor
+from ontology_parser import OntologyTerm
+from text_tokenizer import Tokenizer
+
+
+class SlotRule:
+    """Ontology prefixes allowed in slots whose key path ends with slot"""
+    
+    def __init__(self, slot: str, prefixes: Iterable[str]):
+        self.slot = slot
+        self.path = tuple(slot.split('/'))
+        self.prefixes = frozenset(prefixes)
+
+
+_COMPOUNDS = ('CHEBI', 'modelseed.compound', 'modelseed')
+_MEDIA = ('ENVO', 'OBI', 'MCO')
+
+SLOT_RULES = [
+    SlotRule('association/type', ['biolink']),
+    SlotRule('predicate', ['RO', 'biolink']),
+    SlotRule('qualified_predicate', ['RO', 'biolink']),
+    SlotRule('evidence/type', ['ECO']),
+    SlotRule('documented_by', ['ECO']),
+    SlotRule('quality', ['PATO']),
+    SlotRule('phenotype_state', ['PATO']),
+    SlotRule('phenotype_severity', ['PATO']),
+    SlotRule('phenotype_direction', ['PATO']),
+    SlotRule('magnitude_qualifier', ['PATO']),
+    SlotRule('severity', ['PATO']),
+    SlotRule('unit', ['UO']),
+    SlotRule('taxon', ['NCBITaxon']),
+    SlotRule('phenotype', ['OMP']),
+    SlotRule('condition_qualifier/id', ['MCO']),
+    SlotRule('object/extension', ['RO', *_COMPOUNDS]),
+    SlotRule('object/entity', ['GO']),
+    SlotRule('object/qualifier', ['GO']),
+    SlotRule('process', ['GO']),
+    SlotRule('biological_process', ['GO']),
+    SlotRule('metabolic_process', ['GO']),
+    SlotRule('pathway', ['GO']),
+    SlotRule('compound', _COMPOUNDS),
+    SlotRule('carbon_source', _COMPOUNDS),
+    SlotRule('substance', _COMPOUNDS),
+    SlotRule('stressor', _COMPOUNDS),
+    SlotRule('substrate', _COMPOUNDS),
+    SlotRule('test_substrate', _COMPOUNDS),
+    SlotRule('substrate_qualifier', _COMPOUNDS),
+    SlotRule('substrate_specification', _COMPOUNDS),
+    SlotRule('substrate_extension', _COMPOUNDS),
+    SlotRule('medium', _MEDIA),
+    SlotRule('medium_base', _MEDIA),
+    SlotRule('base_medium', _MEDIA),
+    SlotRule('growth_medium/type', _MEDIA),
+    SlotRule('assay', ['OBI']),
+    SlotRule('plate_system', ['OBI']),
+    SlotRule('publication', ['PMID']),
+]
+
+YAML_MISSING = "PyYAML is not installed, so YAML slots were not checked (pip install pyyaml)"
+
+# A label must share at least this fraction of its words with the term
+LABEL_OVERLAP = 0.5
+
+
+class SlotValue:
+    """A scalar in a YAML block that contains at least one CURIE"""
+    
+    # association: id of the outermost mapping with an id key that holds the value
+    __slots__ = ('path', 'curies', 'line', 'label', 'association')
+    
+    def __init__(self, path: Tuple[str, ...], curies: List[str], line: int,
+                 label: Optional[str] = None, association: Optional[str] = None):
+        self.path = path
+        self.curies = curies
+        self.line = line
+        self.label = label
+        self.association = association
+    
+    @property
+    def slot(self) -> str:
+        return '/'.join(self.path)
+
+
+class Finding:
+    """One slot validation problem"""
+    
+    __slots__ = ('severity', 'line', 'slot', 'curie', 'message')
+    
+    def __init__(self, severity: str, line: int, slot: str, curie: Optional[str], message: str):
+        self.severity = severity
+        self.line = line
+        self.slot = slot
+        self.curie = curie
+        self.message = message
+    
+    def __str__(self) -> str:
+        return f"line {self.line} [{self.slot}]: {self.message}"
+
+
+def yaml_blocks(lines: List[str]) -> Iterator[Tuple[int, List[str]]]:
+    """Fenced ```yaml blocks as (line number of first content line, lines)"""
+    block = None
+    for line_num, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if block is None:
+            if stripped in ('```yaml', '```yml'):
+                block = (line_num + 1, [])
+        elif stripped.startswith('```'):
+            yield block
+            block = None
+        else:
+            block[1].append(line)
+
+
+def _load_yaml():
+    """The yaml module and its fastest safe loader; raises ImportError with install advice"""
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError(YAML_MISSING) from None
+    # libyaml's loader is an optional build of PyYAML; it keeps line marks and
+    # composes an order of magnitude faster
+    return yaml, getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def _inline_comment(block_lines: List[str], mark) -> Optional[str]:
+    """Text of a '# comment' following a scalar on the same line"""
+    rest = block_lines[mark.line][mark.column:].strip()
+    if rest.startswith('#'):
+        return rest[1:].strip() or None
+    return None
+
+
+class SlotRuleEngine:
+    """Applies SLOT_RULES and label checks to annotation blocks"""
+    
+    def __init__(self, rules: Optional[List[SlotRule]] = None,
+                 extractor: Optional[CurieExtractor] = None,
+                 tokenizer: Optional[Tokenizer] = None):
+        self.rules = SLOT_RULES if rules is None else rules
+        self.extractor = extractor or get_default_extractor()
+        self.tokenizer = tokenizer or Tokenizer(stem=True)
+        self._by_key: Dict[str, List[SlotRule]] = {}
+        for rule in sorted(self.rules, key=lambda rule: -len(rule.path)):
+            self._by_key.setdefault(rule.path[-1], []).append(rule)
+        self._resolved: Dict[Tuple[str, ...], Optional[SlotRule]] = {}
+    
+    def rule_for(self, path: Tuple[str, ...]) -> Optional[SlotRule]:
+        """Most specific rule whose slot is a suffix of path"""
+        if path not in self._resolved:
+            rule = None
+            for candidate in self._by_key.get(path[-1], ()) if path else ():
+                if path[-len(candidate.path):] == candidate.path:
+                    rule = candidate
+                    break
+            self._resolved[path] = rule
+        return self._resolved[path]
+    
+    def _add_scalar(self, values: List[SlotValue], node, path: Tuple[str, ...],
+                    label: Optional[str], association: Optional[str],
+                    block_lines: List[str], first_line: int):
+        """Record a scalar node under path if it holds a CURIE"""
+        curies = [match.curie for match in self.extractor.extract_lines([node.value], [1])]
+        if not curies or not path:
+            return
+        label = label or _inline_comment(block_lines, node.end_mark)
+        values.append(SlotValue(path, curies, first_line + node.start_mark.line, label, association))
+    
+    def parse_block(self, block_lines: List[str], first_line: int) -> List[SlotValue]:
+        """Slot values of one YAML block; raises yaml.YAMLError on invalid YAML"""
+        yaml, loader = _load_yaml()
+        root = yaml.compose(''.join(block_lines), Loader=loader)
+        values = []
+        if root is None:
+            return values
+        
+        stack = [(root, (), None)]
+        while stack:
+            node, path, association = stack.pop()
+            if isinstance(node, yaml.MappingNode):
+                sibling_label = None
+                for key, value in node.value:
+                    if key.value == 'label' and isinstance(value, yaml.ScalarNode):
+                        sibling_label = value.value
+                    elif key.value == 'id' and isinstance(value, yaml.ScalarNode) and association is None:
+                        # A block may hold several associations, e.g. a list of them
+                        association = value.value
+                for key, value in node.value:
+                    if isinstance(value, yaml.ScalarNode):
+                        label = sibling_label if key.value == 'id' else None
+                        self._add_scalar(values, value, path + (str(key.value),), label,
+                                         association, block_lines, first_line)
+                    else:
+                        stack.append((value, path + (str(key.value),), association))
+            elif isinstance(node, yaml.SequenceNode):
+                # List items belong to the slot that holds the list
+                for item in node.value:
+                    if isinstance(item, yaml.ScalarNode):
+                        self._add_scalar(values, item, path, None, association, block_lines, first_line)
+                    else:
+                        stack.append((item, path, association))
+        values.sort(key=lambda value: value.line)
+        return values
+    
+    def parse_document(self, lines: List[str]) -> Tuple[List[SlotValue], List[Finding]]:
+        """Slot values from every YAML block, plus findings for blocks that do not parse
+        
+        Without PyYAML the blocks are skipped with a single warning.
+        """
+        values = []
+        findings = []
+        blocks = list(yaml_blocks(lines))
+        if not blocks:
+            return values, findings
+        try:
+            yaml, _ = _load_yaml()
+        except ImportError as e:
+            return values, [Finding('warning', blocks[0][0], 'yaml', None, str(e))]
+        for first_line, block_lines in blocks:
+            try:
+                values.extend(self.parse_block(block_lines, first_line))
+            except yaml.YAMLError as e:
+                mark = getattr(e, 'problem_mark', None)
+                line = first_line + mark.line if mark else first_line
+                problem = getattr(e, 'problem', None) or str(e).splitlines()[0]
+                findings.append(Finding('error', line, 'yaml', None, f"Invalid YAML: {problem}"))
+        return values, findings
+    
+    def _label_matches(self, label: str, term: OntologyTerm) -> bool:
+        """True if most words of label occur in the term's name or synonyms"""
+        label_words = set(self.tokenizer.tokenize(label))
+        if not label_words:
+            return True
+        term_words = set(self.tokenizer.tokenize(term.name))
+        for synonym in term.synonyms:
+            term_words.update(self.tokenizer.tokenize(synonym))
+        return len(label_words & term_words) >= LABEL_OVERLAP * len(label_words)
+    
+    def check(self, values: Iterable[SlotValue],
+              terms: Dict[str, Optional[OntologyTerm]]) -> List[Finding]:
+        """Validate slot values against the rules and the verified terms"""
+        findings = []
+        for value in values:
+            rule = self.rule_for(value.path)
+            for curie in value.curies:
+                prefix = curie.partition(':')[0]
+                if rule is not None and prefix not in rule.prefixes:
+                    allowed = ', '.join(sorted(rule.prefixes))
+                    findings.append(Finding('error', value.line, value.slot, curie,
+                                            f"`{curie}` is not allowed here (expected {allowed})"))
+            term = terms.get(value.curies[0])
+            if len(value.curies) == 1 and term is not None and value.label \
+                    and not self._label_matches(value.label, term):
+                findings.append(Finding('error', value.line, value.slot, value.curies[0],
+                                        f"`{value.curies[0]}` is '{term.name}' but is labelled "
+                                        f"'{value.label}'"))
+        return findings
+
+
+def main():
+    """Validate the YAML annotation blocks of one or more documents"""
+    from batch_verify import _lookup_terms, verifiable_terms
+    from verify_term import OntologyVerifier
+    
+    parser = argparse.ArgumentParser(description='Check ontology prefixes and labels per YAML slot')
+    parser.add_argument('documents', nargs='+', help='Markdown documents with ```yaml blocks')
+    parser.add_argument('--no-server', action='store_true',
+                        help='Load ontologies locally even if an ontology server is running')
+    args = parser.parse_args()
+    
+    try:
+        _load_yaml()
+    except ImportError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    engine = SlotRuleEngine()
+    parsed = {}
+    for document in args.documents:
+        with open(document, 'r', encoding='utf-8') as f:
+            parsed[document] = engine.parse_document(f.readlines())
+    
+    # One lookup for every CURIE in every document
+    term_ids = verifiable_terms({curie for values, _ in parsed.values()
+                                 for value in values for curie in value.curies})
+    terms = _lookup_terms(term_ids, OntologyVerifier(lazy=True), use_server=not args.no_server)
+    
+    errors = 0
+    for document, (values, findings) in parsed.items():
+        findings = findings + engine.check(values, terms)
+        findings.sort(key=lambda finding: finding.line)
+        associations = len({value.association for value in values if value.association is not None})
+        print(f"\n{document}: {len(values)} slots in {associations} associations, "
+              f"{len(findings)} problems")
+        for finding in findings:
+            print(f"  {finding}")
+        errors += sum(1 for finding in findings if finding.severity == 'error')
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Class hierarchy of one ontology as compact integer arrays.
+
+Terms are numbered 0..n-1 and the direct edges of each relation (is_a,
+part_of, ...) are stored in CSR form: the parents of term i are
+targets[offsets[i]:offsets[i + 1]]. For a set of relations the transitive
+closure is computed once, in topological order, into two more CSR pairs
+holding every term's sorted ancestors and sorted descendants. A
+subsumption test is then a bisect in one short slice, and an ancestor or
+descendant listing is a slice copy.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+IS_A = 'is_a'
+PART_OF = 'part_of'
+
+# Relation IRIs (as CURIEs) used in OWL restrictions, by OBO relation name
+RELATION_NAMES = {
+    'BFO:0000050': PART_OF,
+    'BFO:0000051': 'has_part',
+    'RO:0002211': 'regulates',
+}
+
+# Relations followed by default: plain subsumption
+DEFAULT_RELATIONS = (IS_A,)
+
+
+def _csr(count: int, pairs: Iterable[Tuple[int, int]]) -> Tuple[array, array]:
+    """CSR offsets/targets for (source, target) pairs, targets sorted per source"""
+    buckets: List[List[int]] = [[] for _ in range(count)]
+    for source, target in pairs:
+        buckets[source].append(target)
+    offsets = array('l', [0])
+    targets = array('l')
+    for bucket in buckets:
+        targets.extend(sorted(set(bucket)))
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+class Closure:
+    """Transitive ancestors and descendants of every term over some relations"""
+    
+    __slots__ = ('ancestor_offsets', 'ancestors', 'descendant_offsets', 'descendants')
+    
+    def __init__(self, ancestor_offsets: array, ancestors: array,
+                 descendant_offsets: array, descendants: array):
+        self.ancestor_offsets = ancestor_offsets
+        self.ancestors = ancestors
+        self.descendant_offsets = descendant_offsets
+        self.descendants = descendants
+    
+    def ancestors_of(self, node: int) -> array:
+        return self.ancestors[self.ancestor_offsets[node]:self.ancestor_offsets[node + 1]]
+    
+    def descendants_of(self, node: int) -> array:
+        return self.descendants[self.descendant_offsets[node]:self.descendant_offsets[node + 1]]
+    
+    def has_ancestor(self, node: int, ancestor: int) -> bool:
+        start, end = self.ancestor_offsets[node], self.ancestor_offsets[node + 1]
+        position = bisect_left(self.ancestors, ancestor, start, end)
+        return position < end and self.ancestors[position] == ancestor
+
+
+class TermGraph:
+    """Direct edges per relation plus cached closures over relation sets"""
+    
+    def __init__(self, ids: List[str], edges: Dict[str, List[Tuple[int, int]]]):
+        self.ids = ids
+        self.positions: Dict[str, int] = {term_id: i for i, term_id in enumerate(ids)}
+        # relation -> (offsets, parent positions)
+        self.parents: Dict[str, Tuple[array, array]] = {
+            relation: _csr(len(ids), pairs) for relation, pairs in edges.items()}
+        self._closures: Dict[FrozenSet[str], Closure] = {}
+    
+    @classmethod
+    def from_terms(cls, terms: Dict[str, object]) -> 'TermGraph':
+        """Build the graph from the parents and relationships of parsed terms
+        
+        Parents that are not terms of this ontology (imported classes) get
+        a node of their own, so they still show up as ancestors.
+        """
+        ids = list(terms)
+        positions = {term_id: i for i, term_id in enumerate(ids)}
+        
+        def position(term_id: str) -> int:
+            if term_id not in positions:
+                positions[term_id] = len(ids)
+                ids.append(term_id)
+            return positions[term_id]
+        
+        edges: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for term_id, term in terms.items():
+            child = positions[term_id]
+            for parent in term.parents:
+                edges[IS_A].append((child, position(parent)))
+            for relation, target in term.relationships:
+                edges[relation].append((child, position(target)))
+        return cls(ids, edges)
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    @property
+    def relations(self) -> List[str]:
+        return sorted(self.parents)
+    
+    def edge_count(self, relation: Optional[str] = None) -> int:
+        """Number of direct edges of one relation, or of all of them"""
+        relations = [relation] if relation else list(self.parents)
+        return sum(len(self.parents[r][1]) for r in relations if r in self.parents)
+    
+    def closure(self, relations: Iterable[str] = DEFAULT_RELATIONS) -> Closure:
+        """Transitive closure over the given relations, computed on first use"""
+        key = frozenset(relations)
+        closure = self._closures.get(key)
+        if closure is None:
+            closure = self._closures[key] = self._build_closure(key)
+        return closure
+    
+    def _build_closure(self, relations: FrozenSet[str]) -> Closure:
+        """Ancestor sets in topological order, then inverted into descendant lists"""
+        count = len(self.ids)
+        direct: List[List[int]] = [[] for _ in range(count)]
+        for relation in relations:
+            if relation not in self.parents:
+                continue
+            offsets, targets = self.parents[relation]
+            for node in range(count):
+                direct[node].extend(targets[offsets[node]:offsets[node + 1]])
+        
+        # Kahn's algorithm from the roots down: a term is processed once all
+        # of its parents are
+        children: List[List[int]] = [[] for _ in range(count)]
+        pending = [0] * count
+        for node, parents in enumerate(direct):
+            for parent in set(parents):
+                children[parent].append(node)
+                pending[node] += 1
+        order = [node for node in range(count) if not pending[node]]
+        for node in order:
+            for child in children[node]:
+                pending[child] -= 1
+                if not pending[child]:
+                    order.append(child)
+        
+        ancestor_sets: List[Optional[frozenset]] = [None] * count
+        for node in order:
+            found = set(direct[node])
+            for parent in direct[node]:
+                found.update(ancestor_sets[parent])
+            ancestor_sets[node] = frozenset(found)
+        # Terms on a cycle (malformed input) are resolved by plain traversal
+        for node in range(count):
+            if ancestor_sets[node] is None:
+                ancestor_sets[node] = frozenset(self._reachable(node, direct))
+        
+        ancestor_offsets = array('l', [0])
+        ancestors = array('l')
+        descendant_lists: List[List[int]] = [[] for _ in range(count)]
+        for node, found in enumerate(ancestor_sets):
+            ancestors.extend(sorted(found))
+            ancestor_offsets.append(len(ancestors))
+            for ancestor in found:
+                descendant_lists[ancestor].append(node)
+        del ancestor_sets
+        
+        descendant_offsets = array('l', [0])
+        descendants = array('l')
+        for found in descendant_lists:
+            descendants.extend(sorted(found))
+            descendant_offsets.append(len(descendants))
+        return Closure(ancestor_offsets, ancestors, descendant_offsets, descendants)
+    
+    @staticmethod
+    def _reachable(node: int, direct: List[List[int]]) -> set:
+        found = set()
+        stack = list(direct[node])
+        while stack:
+            current = stack.pop()
+            if current not in found:
+                found.add(current)
+                stack.extend(direct[current])
+        found.discard(node)
+        return found
+    
+    def parents_of(self, term_id: str, relation: str = IS_A) -> List[str]:
+        """Direct parents of a term over one relation"""
+        node = self.positions.get(term_id)
+        if node is None or relation not in self.parents:
+            return []
+        offsets, targets = self.parents[relation]
+        return [self.ids[parent] for parent in targets[offsets[node]:offsets[node + 1]]]
+    
+    def ancestors(self, term_id: str, relations: Iterable[str] = DEFAULT_RELATIONS) -> List[str]:
+        """Every ancestor of a term over the given relations"""
+        node = self.positions.get(term_id)
+        if node is None:
+            return []
+        return [self.ids[i] for i in self.closure(relations).ancestors_of(node)]
+    
+    def descendants(self, term_id: str, relations: Iterable[str] = DEFAULT_RELATIONS) -> List[str]:
+        """Every descendant of a term over the given relations"""
+        node = self.positions.get(term_id)
+        if node is None:
+            return []
+        return [self.ids[i] for i in self.closure(relations).descendants_of(node)]
+    
+    def is_descendant(self, term_id: str, ancestor_id: str,
+                      relations: Iterable[str] = DEFAULT_RELATIONS) -> bool:
+        """True if ancestor_id is a strict ancestor of term_id"""
+        node = self.positions.get(term_id)
+        ancestor = self.positions.get(ancestor_id)
+        if node is None or ancestor is None:
+            return False
+        return self.closure(relations).has_ancestor(node, ancestor)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Rewrite annotation documents to use current term IDs.
+
+After verification, a secondary ID (alt_id) or an obsolete term with a
+single replaced_by successor has exactly one current term to use instead
+(see the Suggested Replacements section of a batch_verify report). This
+tool substitutes those CURIEs, replacing the hand edits recorded in
+v4_corrections_needed.md:
+
+    term_upgrade.py ../ontology_annotation_examples_v6.md --in-place --diff v6.patch
+    patch -R -p1 -d .. < v6.patch    # undo, as printed by the tool
+
+The diff names files a/<path> and b/<path>, relative to the directory
+that holds all the documents, since patch refuses names with .. or an
+absolute path.
+
+Each document is streamed once. Only the lines that extract_terms_from_file
+reported for a replaceable term are re-scanned for CURIE positions; the
+text goes to a temporary file next to the document, which replaces it
+with os.replace once the pass is complete. The unified diff is written
+hunk by hunk from a window of context lines, so neither side of the
+rewrite is held in memory. Obsolete terms that only name consider
+candidates are listed for review and never rewritten.
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import contextlib
+from collections import deque
+from pathlib import Path
+from typing import Dict, IO, List, Optional, Tuple
+from curie_extractor import CurieExtractor, get_default_extractor
+from ontology_parser import ALT_ID, REPLACED_BY
+
+
+# Unchanged lines shown around each change in the diff
+CONTEXT_LINES = 3
+
+
+def plan_replacements(term_definitions: Dict[str, Dict[str, object]]
+                      ) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+    """Split redirected terms into automatic replacements and ones needing review
+    
+    term_definitions is the per-document info from batch_verify, whose
+    secondary and obsolete IDs carry a 'redirect' entry. Returns
+    ({old ID: new ID}, {old ID: candidate IDs}).
+    """
+    automatic = {}
+    review = {}
+    for term_id, info in term_definitions.items():
+        redirect = info.get('redirect')
+        if not redirect:
+            continue
+        targets = [replacement['term'] for replacement in redirect['replacements']]
+        if redirect['kind'] in (ALT_ID, REPLACED_BY) and len(targets) == 1:
+            automatic[term_id] = targets[0]
+        else:
+            review[term_id] = targets
+    return automatic, review
+
+
+def rewrite_line(line: str, replacements: Dict[str, str],
+                 extractor: Optional[CurieExtractor] = None) -> Tuple[str, List[str]]:
+    """Substitute replaceable CURIEs in one line; returns the new line and the IDs replaced
+    
+    Positions come from the CURIE extractor, so IDs inside longer tokens
+    (e.g. OMP:00010001 when replacing OMP:0001000) are left alone.
+    """
+    extractor = extractor or get_default_extractor()
+    parts = []
+    replaced = []
+    end = 0
+    for match in extractor.extract_lines([line], [1]):
+        if match.curie in replacements:
+            start = match.column - 1
+            parts.append(line[end:start])
+            parts.append(replacements[match.curie])
+            replaced.append(match.curie)
+            end = start + len(match.curie)
+    if not replaced:
+        return line, replaced
+    parts.append(line[end:])
+    return ''.join(parts), replaced
+
+
+class DiffWriter:
+    """Streams a unified diff of a rewrite that keeps the number of lines
+    
+    Unchanged lines before a change are kept in a window of `context`
+    lines; a hunk is written out as soon as 2 * context unchanged lines
+    follow its last change, so only the current hunk is ever buffered.
+    """
+    
+    def __init__(self, stream: IO[str], old_name: str, new_name: str, context: int = CONTEXT_LINES):
+        self.stream = stream
+        self.names = (old_name, new_name)
+        self.context = context
+        self.hunks = 0
+        self._before: deque = deque(maxlen=context)
+        self._hunk: Optional[List[str]] = None
+        self._start = 0
+        self._trailing = 0
+    
+    def line(self, number: int, old: str, new: str):
+        """Feed line `number` (1-based) of the old and new text"""
+        if old == new:
+            if self._hunk is None:
+                self._before.append(old)
+                return
+            self._hunk.append(' ' + old)
+            self._trailing += 1
+            if self._trailing == 2 * self.context:
+                self._flush()
+            return
+        if self._hunk is None:
+            self._start = number - len(self._before)
+            self._hunk = [' ' + line for line in self._before]
+            self._before.clear()
+        self._hunk.append('-' + old)
+        self._hunk.append('+' + new)
+        self._trailing = 0
+    
+    def _flush(self):
+        """Write the current hunk, keeping its surplus trailing lines as the next window"""
+        surplus = max(0, self._trailing - self.context)
+        body = self._hunk[:len(self._hunk) - surplus]
+        self._before.extend(line[1:] for line in self._hunk[len(body):])
+        if not self.hunks:
+            self.stream.write(f"--- {self.names[0]}\n+++ {self.names[1]}\n")
+        # Lines are replaced one for one, so both sides have the same length
+        length = sum(1 for line in body if line[0] != '+')
+        self.stream.write(f"@@ -{self._start},{length} +{self._start},{length} @@\n")
+        for line in body:
+            self.stream.write(line if line.endswith('\n') else line + '\n\\ No newline at end of file\n')
+        self.hunks += 1
+        self._hunk = None
+        self._trailing = 0
+    
+    def close(self):
+        """Write the last hunk"""
+        if self._hunk is not None:
+            self._flush()
+
+
+class UpgradeResult:
+    """Outcome of rewriting one document"""
+    
+    __slots__ = ('path', 'lines', 'replacements', 'changed_lines', 'counts', 'seconds')
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.lines = 0
+        self.replacements = 0
+        self.changed_lines = 0
+        # (old ID, new ID) -> occurrences replaced
+        self.counts: Dict[Tuple[str, str], int] = {}
+        self.seconds = 0.0
+
+
+def diff_base(paths: List[Path]) -> Path:
+    """Directory holding all the documents, which diff file names are relative to"""
+    return Path(os.path.commonpath([str(path.resolve().parent) for path in paths]))
+
+
+def upgrade_document(path: Path, replacements: Dict[str, str],
+                     terms_with_lines: Dict[str, List[int]],
+                     output: Optional[Path] = None,
+                     diff: Optional[IO[str]] = None,
+                     base: Optional[Path] = None) -> UpgradeResult:
+    """Rewrite one document in a single streaming pass
+    
+    terms_with_lines is the line data from extract_terms_from_file for the
+    same revision. The new text is written atomically to output (the
+    document itself for an in-place upgrade) with the document's file mode,
+    or nowhere when output is None; the unified diff goes to diff, naming
+    the file relative to base (default: the document's directory). A
+    document without replacements is left untouched.
+    """
+    result = UpgradeResult(path)
+    start = time.perf_counter()
+    targets = {line for term_id in replacements for line in terms_with_lines.get(term_id, ())}
+    extractor = get_default_extractor()
+    writer = None
+    if diff is not None:
+        name = Path(os.path.relpath(path.resolve(), base or path.resolve().parent)).as_posix()
+        writer = DiffWriter(diff, f"a/{name}", f"b/{name}")
+    tmp_path = output.with_name(output.name + '.tmp') if output else None
+    
+    # newline='' keeps the document's own line endings
+    with contextlib.ExitStack() as stack:
+        source = stack.enter_context(open(path, 'r', encoding='utf-8', newline=''))
+        target = stack.enter_context(open(tmp_path, 'w', encoding='utf-8', newline='')) if tmp_path else None
+        number = 0
+        for number, line in enumerate(source, 1):
+            new = line
+            if number in targets:
+                new, replaced = rewrite_line(line, replacements, extractor)
+                if replaced:
+                    result.replacements += len(replaced)
+                    result.changed_lines += 1
+                    for term_id in replaced:
+                        key = (term_id, replacements[term_id])
+                        result.counts[key] = result.counts.get(key, 0) + 1
+            if target is not None:
+                target.write(new)
+            if writer is not None:
+                writer.line(number, line, new)
+        result.lines = number
+    
+    if writer is not None:
+        writer.close()
+    if tmp_path:
+        if result.replacements:
+            shutil.copymode(path, tmp_path)
+            os.replace(tmp_path, output)
+        else:
+            os.remove(tmp_path)
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def main():
+    """Verify documents and rewrite their secondary and obsolete term IDs"""
+    parser = argparse.ArgumentParser(
+        description='Replace secondary and obsolete ontology term IDs with their current terms',
+        epilog='Example: term_upgrade.py ../ontology_annotation_examples_v6.md --in-place --diff v6.patch')
+    parser.add_argument('documents', nargs='+', metavar='document',
+                        help='Document files, directories (all *.md inside) or glob patterns')
+    parser.add_argument('--in-place', action='store_true',
+                        help='Rewrite the documents (default: only show the diff)')
+    parser.add_argument('--diff', default='-', metavar='PATH',
+                        help='Where to write the unified diff (default: - for stdout)')
+    parser.add_argument('--no-server', action='store_true',
+                        help='Load ontologies locally even if an ontology server is running')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-verify every term instead of reusing cached results')
+    args = parser.parse_args()
+    
+    from batch_verify import expand_document_paths, verify_documents
+    from verification_cache import VerificationCache
+    
+    paths = expand_document_paths(args.documents)
+    missing = [path for path in paths if not path.exists()]
+    if missing or not paths:
+        for path in missing:
+            print(f"Error: File not found: {path}")
+        if not paths:
+            print("Error: No documents matched")
+        sys.exit(1)
+    
+    with contextlib.ExitStack() as stack:
+        if args.diff == '-':
+            diff = sys.stdout
+            # Keep stdout for the diff
+            stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+        else:
+            diff = stack.enter_context(open(args.diff, 'w', encoding='utf-8'))
+        
+        result_cache = None if args.no_cache else VerificationCache()
+        results = verify_documents(paths, use_server=not args.no_server, result_cache=result_cache)
+        if result_cache:
+            result_cache.save()
+        
+        print()
+        base = diff_base(paths)
+        upgraded = []
+        for path, (_, term_definitions, terms_with_lines, _) in results.items():
+            replacements, review = plan_replacements(term_definitions)
+            if replacements:
+                upgraded.append(upgrade_document(path, replacements, terms_with_lines,
+                                                 path if args.in_place else None, diff, base))
+                result = upgraded[-1]
+                action = 'rewrote' if args.in_place else 'would rewrite'
+                print(f"{path}: {action} {result.replacements} occurrences on {result.changed_lines} lines")
+                for (old, new), count in sorted(result.counts.items()):
+                    print(f"  {old} -> {new} ({count}x)")
+            else:
+                print(f"{path}: nothing to replace")
+            for term_id, candidates in sorted(review.items()):
+                suggestion = f"consider {', '.join(candidates)}" if candidates else "no replacement given"
+                print(f"  needs review: {term_id} ({suggestion}; lines "
+                      f"{', '.join(map(str, terms_with_lines.get(term_id, [])))})")
+        
+        if upgraded:
+            total = sum(result.replacements for result in upgraded)
+            lines = sum(result.lines for result in upgraded)
+            seconds = sum(result.seconds for result in upgraded) or 1e-9
+            print(f"\n{total} replacements in {lines} lines, {seconds:.3f}s "
+                  f"({total / seconds:.0f} replacements/sec, {lines / seconds:.0f} lines/sec)")
+            if not args.in_place:
+                print("Dry run: pass --in-place to rewrite the documents")
+            elif args.diff != '-':
+                directory = os.path.relpath(base)
+                option = '' if directory == '.' else f" -d {directory}"
+                print(f"Undo with: patch -R -p1{option} < {args.diff}")
+
+
+if __name__ == "__main__":
+    main()
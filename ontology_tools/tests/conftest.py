@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The tools are flat modules that import each other by name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+
+
+@pytest.fixture
+def data_dir() -> Path:
+    return DATA_DIR
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep parse snapshots out of the user's cache and never ask a server"""
+    monkeypatch.setenv('ONTOLOGY_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setenv('ONTOLOGY_SERVER_URL', 'off')
+
+
+@pytest.fixture
+def reference_obo():
+    """The line-by-line OBO reader OBOParser is checked against"""
+    from obo_reference import ReferenceOBOParser
+    return ReferenceOBOParser
@@ -0,0 +1,115 @@
+"""
+Reference OBO reader for parser tests.
+
+This is the straightforward line loop OBOParser replaced: every line is
+tested against a chain of tag prefixes and repeated tags are appended to
+the term as they are read. It is slow but easy to check by eye, so the
+tests compare OBOParser with it field by field.
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, Iterable
+
+from ontology_parser import OntologyTerm, _obo_unquote, _strip_obo_comment
+
+
+class ReferenceOBOParser:
+    """Line-by-line OBO reader the stanza-dispatch OBOParser must agree with
+    
+    [Term] stanzas become terms. [Typedef] stanzas (relation definitions)
+    are collected in typedefs and header tags in header; other stanzas
+    such as [Instance] are skipped. Quoted strings honour OBO escapes, so
+    definitions containing \\" are kept whole.
+    """
+    
+    def __init__(self, file_path: str):
+        self.file_path = Path(file_path)
+        self.terms: Dict[str, OntologyTerm] = {}
+        self.typedefs: Dict[str, OntologyTerm] = {}
+        self.header: Dict[str, str] = {}
+    
+    def parse(self) -> Dict[str, OntologyTerm]:
+        """Parse OBO file and return dictionary of terms"""
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            return self.parse_lines(f)
+    
+    def parse_lines(self, lines: Iterable[str]) -> Dict[str, OntologyTerm]:
+        """Parse OBO content from any iterable of lines, such as a single stanza"""
+        current_term = None
+        stanza = 'header'
+        
+        for line in lines:
+            line = line.strip()
+            
+            # Start of a new stanza
+            if line.startswith('['):
+                stanza = line
+                current_term = None
+                continue
+            
+            if stanza == 'header':
+                tag, colon, value = line.partition(':')
+                if colon and tag not in self.header:
+                    self.header[tag] = value.strip()
+                continue
+            
+            if stanza != '[Term]' and stanza != '[Typedef]':
+                continue
+            
+            # Parse term fields
+            if line.startswith('id:'):
+                term_id = line[3:].strip()
+                current_term = OntologyTerm(term_id)
+                if stanza == '[Term]':
+                    self.terms[term_id] = current_term
+                else:
+                    self.typedefs[term_id] = current_term
+            
+            elif current_term and line.startswith('name:'):
+                current_term.name = line[5:].strip()
+            
+            elif current_term and line.startswith('def:'):
+                # Definition is quoted, extract it
+                definition = _obo_unquote(line[4:].lstrip())
+                if definition is not None:
+                    current_term.definition = definition
+            
+            elif current_term and line.startswith('synonym:'):
+                # Synonym is quoted
+                synonym = _obo_unquote(line[8:].lstrip())
+                if synonym is not None:
+                    current_term.synonyms += (synonym,)
+            
+            elif current_term and line.startswith('xref:'):
+                xref = line[5:].strip()
+                current_term.xrefs += (xref,)
+            
+            elif current_term and line.startswith('is_obsolete:'):
+                current_term.is_obsolete = line[12:].strip().lower() == 'true'
+            
+            elif current_term and line.startswith('namespace:'):
+                current_term.namespace = sys.intern(line[10:].strip())
+            
+            elif current_term and line.startswith('is_a:'):
+                # "is_a: GO:0008150 ! biological_process"
+                parent = _strip_obo_comment(line[5:]).split()
+                if len(parent) == 1:
+                    current_term.parents += (parent[0],)
+            
+            elif current_term and line.startswith('relationship:'):
+                # "relationship: part_of GO:0005575 ! cellular_component"
+                fields = _strip_obo_comment(line[13:]).split()
+                if len(fields) >= 2:
+                    current_term.relationships += ((sys.intern(fields[0]), fields[1]),)
+            
+            elif current_term and line.startswith('alt_id:'):
+                current_term.alt_ids += (_strip_obo_comment(line[7:]),)
+            
+            elif current_term and line.startswith('replaced_by:'):
+                current_term.replaced_by += (_strip_obo_comment(line[12:]),)
+            
+            elif current_term and line.startswith('consider:'):
+                current_term.consider += (_strip_obo_comment(line[9:]),)
+        
+        return self.terms
@@ -0,0 +1,18 @@
+from batch_verify import DEFAULT_SUMMARY, expand_document_paths
+
+
+def test_expand_skips_outputs_of_earlier_runs(tmp_path):
+    for name in ['a.md', 'b.md', 'a_verification_report.md', DEFAULT_SUMMARY.name, 'sum.md']:
+        (tmp_path / name).write_text('# doc\n')
+    (tmp_path / 'sub.md').mkdir()
+    
+    paths = expand_document_paths([str(tmp_path), str(tmp_path / '*.md')], exclude=[tmp_path / 'sum.md'])
+    assert [path.name for path in paths] == ['a.md', 'b.md']
+
+
+def test_expand_keeps_order_and_missing_files(tmp_path):
+    (tmp_path / 'b.md').write_text('')
+    (tmp_path / 'a.md').write_text('')
+    paths = expand_document_paths([str(tmp_path / 'b.md'), str(tmp_path), str(tmp_path / 'gone.md')])
+    assert paths == [tmp_path / 'b.md', tmp_path / 'a.md', tmp_path / 'gone.md']
+    assert expand_document_paths([str(tmp_path / '*.txt')]) == []
@@ -0,0 +1,46 @@
+from bloom_filter import BloomFilter, FilterSet
+from ontology_parser import OBOParser, build_index
+
+
+def test_no_false_negatives():
+    keys = [f'GO:{n:07d}' for n in range(5000)]
+    bloom = BloomFilter.from_keys(keys)
+    assert all(bloom.might_contain(key) for key in keys)
+    assert bloom.queries == len(keys)
+    assert bloom.rejected == 0
+
+
+def test_false_positive_rate():
+    bloom = BloomFilter.from_keys([f'GO:{n:07d}' for n in range(5000)], fp_rate=0.01)
+    absent = [f'CHEBI:{n}' for n in range(20000)]
+    passed = sum(bloom.might_contain(key) for key in absent)
+    assert bloom.expected_fp_rate < 0.02
+    assert passed / len(absent) < 0.03
+    assert bloom.rejected == len(absent) - passed
+
+
+def test_state_round_trip():
+    bloom = BloomFilter.from_keys(['OMP:0000173', 'OMP:0009999'])
+    restored = BloomFilter.from_state(bloom.get_state())
+    assert restored.bits == bloom.bits
+    assert (restored.size, restored.hashes, len(restored)) == (bloom.size, bloom.hashes, 2)
+    assert 'OMP:0000173' in restored
+
+
+def test_index_filter_covers_secondary_ids(data_dir):
+    index = build_index(OBOParser(data_dir / 'omp.obo').parse())
+    bloom = BloomFilter.for_index(index)
+    assert len(bloom) == len(index.terms) + 1
+    for term_id in [*index.terms, 'OMP:0009999']:
+        assert term_id in bloom
+
+
+def test_filter_set_candidates():
+    filters = FilterSet({
+        'OMP': BloomFilter.from_keys(['OMP:0000173', 'SHARED:1']),
+        'GO': BloomFilter.from_keys(['GO:0008150', 'SHARED:1']),
+    })
+    assert filters.candidates('OMP:0000173')[0] == 'OMP'
+    assert sorted(filters.candidates('SHARED:1')) == ['GO', 'OMP']
+    assert 'GO:0008150' in filters
+    assert filters.queries == 2
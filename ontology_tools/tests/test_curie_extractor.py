@@ -0,0 +1,44 @@
+import pytest
+
+from curie_extractor import CurieExtractor, PrefixRegistry
+
+
+@pytest.fixture
+def extractor():
+    return CurieExtractor(PrefixRegistry.from_ontology_paths(['GO', 'OMP', 'CHEBI', 'MODELSEED']))
+
+
+def _curies(extractor, text):
+    return [match.curie for match in extractor.extract(text.splitlines(keepends=True))]
+
+
+@pytest.mark.parametrize('text, curies', [
+    ('See GO:0008150 and CHEBI:17814.', ['GO:0008150', 'CHEBI:17814']),
+    ('(OMP:0000173), [CHEBI:16240]', ['OMP:0000173', 'CHEBI:16240']),
+    ('xGO:0008150 GO:0008150x GO:abc', []),
+    ('mco:has_condition 2024-01-01T10:30:00', []),
+    ('UNKNOWN:123 go:0008150', []),
+    ('MODELSEED:cpd00025 modelseed.compound:cpd00025 modelseed:rxn00001',
+     ['MODELSEED:cpd00025', 'modelseed.compound:cpd00025', 'modelseed:rxn00001']),
+    ('NCBITaxon:562; UniProt:P12345; EcoGene:EG10001', ['NCBITaxon:562', 'UniProt:P12345', 'EcoGene:EG10001']),
+])
+def test_matches(extractor, text, curies):
+    assert _curies(extractor, text) == curies
+
+
+def test_positions_across_blocks(extractor, monkeypatch):
+    monkeypatch.setattr('curie_extractor.BLOCK_LINES', 2)
+    lines = ['nothing\n', 'a GO:1\n', 'b\n', '  OMP:2 and GO:3\n', 'CHEBI:4']
+    matches = list(extractor.extract(lines))
+    assert [(m.curie, m.prefix, m.line, m.column) for m in matches] == [
+        ('GO:1', 'GO', 2, 3), ('OMP:2', 'OMP', 4, 3), ('GO:3', 'GO', 4, 13), ('CHEBI:4', 'CHEBI', 5, 1)]
+
+
+def test_selected_lines(extractor):
+    lines = ['GO:1\n', 'GO:2\n', 'GO:3\n']
+    assert [m.curie for m in extractor.extract_lines(lines, [3, 1])] == ['GO:3', 'GO:1']
+
+
+def test_longest_prefix_wins():
+    registry = PrefixRegistry({'modelseed': r'cpd[0-9]+', 'modelseed.compound': r'cpd[0-9]+'})
+    assert _curies(CurieExtractor(registry), 'modelseed.compound:cpd1') == ['modelseed.compound:cpd1']
@@ -0,0 +1,99 @@
+import pytest
+
+from ontology_parser import OBOParser, TERM_FIELDS
+
+# Repeated tags, tags before the id, a second id in one stanza and stanzas
+# the parser skips
+TRICKY_OBO = """format-version: 1.2
+ontology: x
+
+[Term]
+name: ignored before the id
+id: X:1
+name: first
+name: second
+synonym: "a" EXACT []
+synonym: "b \\"quoted\\"" RELATED []
+xref: Wikipedia:One
+xref: Wikipedia:Uno
+is_a: X:0 ! zero
+is_a: X:9 {source="x"}
+is_obsolete: false
+id: X:2
+def: "two" []
+
+[Instance]
+id: X:inst
+name: instance
+
+[Term]
+id: X:3
+is_obsolete: true
+replaced_by: X:2
+consider: X:1
+consider: X:0
+"""
+
+
+def _rows(terms):
+    return [tuple(getattr(term, field) for field in TERM_FIELDS) for term in terms.values()]
+
+
+@pytest.mark.parametrize('chunk_size', [OBOParser.CHUNK_SIZE, 16])
+def test_matches_reference_parser(data_dir, reference_obo, monkeypatch, chunk_size):
+    monkeypatch.setattr(OBOParser, 'CHUNK_SIZE', chunk_size)
+    path = data_dir / 'omp.obo'
+    reference = reference_obo(path)
+    parser = OBOParser(path)
+    assert _rows(parser.parse()) == _rows(reference.parse())
+    assert _rows(parser.typedefs) == _rows(reference.typedefs)
+    assert parser.header == reference.header
+
+
+def test_repeated_tags(reference_obo):
+    lines = TRICKY_OBO.splitlines(keepends=True)
+    terms = OBOParser('unused.obo').parse_lines(lines)
+    assert _rows(terms) == _rows(reference_obo('unused.obo').parse_lines(lines))
+    assert list(terms) == ['X:1', 'X:2', 'X:3']
+    assert terms['X:1'].name == 'second'
+    assert terms['X:1'].synonyms == ('a', 'b "quoted"')
+    assert terms['X:1'].xrefs == ('Wikipedia:One', 'Wikipedia:Uno')
+    assert terms['X:1'].parents == ('X:0', 'X:9')
+    assert terms['X:2'].name == '' and terms['X:2'].definition == 'two'
+    assert terms['X:3'].consider == ('X:1', 'X:0')
+
+
+def test_escapes(data_dir):
+    terms = OBOParser(data_dir / 'omp.obo').parse()
+    assert terms['OMP:0000173'].definition == 'A "utilization" phenotype for carbon.'
+    assert terms['OMP:0007777'].definition == 'Grows on "rich" medium\\agar.'
+    assert terms['OMP:0007777'].synonyms == ('the "rich" grower',)
+
+
+def test_redirect_tags(data_dir):
+    terms = OBOParser(data_dir / 'omp.obo').parse()
+    assert terms['OMP:0000336'].alt_ids == ('OMP:0009999',)
+    obsolete = terms['OMP:0001111']
+    assert obsolete.is_obsolete
+    assert obsolete.replaced_by == ('OMP:0006023',)
+    assert obsolete.consider == ('OMP:0000173',)
+
+
+def test_stanza_kinds(data_dir):
+    parser = OBOParser(data_dir / 'omp.obo')
+    terms = parser.parse()
+    assert parser.header == {'format-version': '1.2', 'ontology': 'omp'}
+    assert set(parser.typedefs) == {'part_of'}
+    assert parser.typedefs['part_of'].name == 'part of'
+    assert 'part_of' not in terms
+    assert 'OMP:inst1' not in terms
+    assert len(terms) == 7
+
+
+def test_single_stanza():
+    terms = OBOParser('unused.obo').parse_lines([
+        '[Term]\n', 'id: X:1\n', 'name: one\n', 'is_a: X:0 {source="x"} ! zero\n',
+        'relationship: part_of X:2 ! two\n',
+    ])
+    assert terms['X:1'].parents == ('X:0',)
+    assert terms['X:1'].relationships == (('part_of', 'X:2'),)
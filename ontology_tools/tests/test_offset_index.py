@@ -0,0 +1,46 @@
+import shutil
+
+import pytest
+
+from offset_index import OffsetIndex
+from ontology_cache import OntologyCache
+from ontology_parser import OBOParser, OWLParser, TERM_FIELDS
+
+
+def _fields(term):
+    return tuple(getattr(term, field) for field in TERM_FIELDS)
+
+
+@pytest.mark.parametrize('name, parser', [('omp.obo', OBOParser), ('chebi.owl', OWLParser)])
+def test_terms_match_full_parse(data_dir, name, parser):
+    terms = parser(data_dir / name).parse()
+    index = OffsetIndex.build(data_dir / name)
+    assert set(index.spans) == set(terms)
+    for term_id, term in terms.items():
+        assert _fields(index.get_term(term_id)) == _fields(term)
+
+
+@pytest.mark.parametrize('name, alt_id, primary', [
+    ('omp.obo', 'OMP:0009999', 'OMP:0000336'),
+    ('chebi.owl', 'CHEBI:9999', 'CHEBI:17814'),
+    ('chebi.owl', 'CHEBI:8888', 'CHEBI:16236'),
+])
+def test_secondary_ids(data_dir, name, alt_id, primary):
+    index = OffsetIndex.build(data_dir / name)
+    assert alt_id in index
+    assert index.get_term(alt_id).id == primary
+    assert index.get_term('CHEBI:0000001') is None
+
+
+def test_format_override_and_cache(data_dir, tmp_path):
+    path = tmp_path / 'omp.txt'
+    shutil.copy(data_dir / 'omp.obo', path)
+    with pytest.raises(ValueError):
+        OffsetIndex.build(path)
+    
+    cache = OntologyCache(tmp_path / 'cache')
+    built = OffsetIndex.load(path, cache, fmt='obo')
+    loaded = OffsetIndex.load(path, cache, fmt='obo')
+    assert loaded.spans == built.spans
+    assert loaded.aliases == {'OMP:0009999': 'OMP:0000336'}
+    assert loaded.get_term('OMP:0006023').name == 'utilization of galacturonate'
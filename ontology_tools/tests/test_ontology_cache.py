@@ -0,0 +1,35 @@
+import shutil
+
+from ontology_cache import OntologyCache
+from ontology_parser import OBOParser, TERM_FIELDS
+
+
+def _fields(terms):
+    return {term_id: tuple(getattr(term, field) for field in TERM_FIELDS)
+            for term_id, term in terms.items()}
+
+
+def test_load_terms_skips_postings(data_dir, tmp_path):
+    path = tmp_path / 'omp.obo'
+    shutil.copy(data_dir / 'omp.obo', path)
+    cache = OntologyCache(tmp_path / 'cache')
+    
+    terms = cache.load_terms(path)
+    assert _fields(terms) == _fields(OBOParser(path).parse())
+    assert cache.is_cached(path, 'terms')
+    assert not cache.is_cached(path)
+    assert _fields(cache.load_terms(path)) == _fields(terms)
+
+
+def test_index_reuses_cached_terms(data_dir, tmp_path):
+    path = tmp_path / 'omp.obo'
+    shutil.copy(data_dir / 'omp.obo', path)
+    cache = OntologyCache(tmp_path / 'cache')
+    cache.load_terms(path)
+    
+    built = cache.load_index(path)
+    assert cache.is_cached(path) and cache.is_cached(path, 'bloom')
+    loaded = cache.load_index(path)
+    assert _fields(loaded.terms) == _fields(built.terms)
+    assert loaded.postings == built.postings
+    assert loaded.alt_id_index == built.alt_id_index
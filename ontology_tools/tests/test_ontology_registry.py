@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from ontology_registry import DEFAULT_REGISTRY_PATH, OntologyRegistry
+
+
+@pytest.fixture
+def registry_path(tmp_path):
+    path = tmp_path / 'conf' / 'registry.json'
+    path.parent.mkdir()
+    path.write_text(json.dumps({
+        'ontology_dir': '../onto',
+        'cache_dir': 'cache',
+        'ontologies': {
+            'OMP': {'files': ['omp.obo', 'omp.owl']},
+            'MODELSEED': {'files': ['modelseed.rdf'], 'format': 'owl', 'cache_dir': 'seed-cache'},
+            'NCBITaxon': {'files': ['ncbitaxon.obo']},
+        },
+    }))
+    (tmp_path / 'onto').mkdir()
+    return path
+
+
+def test_load(registry_path):
+    registry = OntologyRegistry.load(registry_path, environ={})
+    onto = registry_path.parent / '../onto'
+    assert list(registry) == ['OMP', 'MODELSEED', 'NCBITaxon']
+    assert registry.sources['OMP'].files == [onto / 'omp.obo', onto / 'omp.owl']
+    assert registry.cache_dir == registry_path.parent / 'cache'
+    assert registry.sources['MODELSEED'].cache_dir == registry_path.parent / 'seed-cache'
+    assert registry.sources['OMP'].cache_dir is None
+    assert registry.sources['MODELSEED'].format == 'owl'
+
+
+def test_first_existing_file_wins(registry_path, tmp_path):
+    registry = OntologyRegistry.load(registry_path, environ={})
+    omp = registry.sources['OMP']
+    assert not omp.exists()
+    assert omp.path.name == 'omp.obo' and omp.format == 'obo'
+    (tmp_path / 'onto' / 'omp.owl').write_text('')
+    assert omp.exists()
+    assert omp.path.name == 'omp.owl' and omp.format == 'owl'
+
+
+def test_environment_overrides(registry_path, tmp_path):
+    elsewhere = tmp_path / 'elsewhere'
+    registry = OntologyRegistry.load(environ={
+        'ONTOLOGY_REGISTRY': str(registry_path),
+        'ONTOLOGY_DIR': str(elsewhere),
+        'ONTOLOGY_PATH_MODELSEED': str(tmp_path / 'seed.owl'),
+        'ONTOLOGY_PATH_NCBITAXON': str(tmp_path / 'taxa.obo'),
+    })
+    assert registry.sources['OMP'].files == [elsewhere / 'omp.obo', elsewhere / 'omp.owl']
+    assert registry.sources['MODELSEED'].files == [tmp_path / 'seed.owl']
+    assert registry.sources['NCBITaxon'].files == [tmp_path / 'taxa.obo']
+    
+    # An explicit directory beats $ONTOLOGY_DIR
+    registry = OntologyRegistry.load(registry_path, tmp_path, environ={'ONTOLOGY_DIR': str(elsewhere)})
+    assert registry.sources['OMP'].path == tmp_path / 'omp.obo'
+
+
+def test_os_environ_is_the_default(registry_path, monkeypatch, tmp_path):
+    monkeypatch.setenv('ONTOLOGY_REGISTRY', str(registry_path))
+    monkeypatch.setenv('ONTOLOGY_PATH_OMP', str(tmp_path / 'mine.obo'))
+    assert OntologyRegistry.load().sources['OMP'].path == tmp_path / 'mine.obo'
+
+
+@pytest.mark.parametrize('prefix, name', [
+    ('OMP', 'OMP'), ('omp', 'OMP'), ('ModelSEED', 'MODELSEED'),
+    ('NCBITaxon', 'NCBITaxon'), ('ncbitaxon', 'NCBITaxon'), ('GO', None),
+])
+def test_case_insensitive_prefixes(registry_path, prefix, name):
+    registry = OntologyRegistry.load(registry_path, environ={})
+    assert registry.name_for_prefix(prefix) == name
+    source = registry.resolve(f"{prefix}:0000001")
+    assert (source.prefix if source else None) == name
+
+
+def test_resolve_needs_a_curie(registry_path):
+    registry = OntologyRegistry.load(registry_path, environ={})
+    assert registry.resolve('OMP') is None
+    assert registry.source('omp').prefix == 'OMP'
+    assert 'OMP' in registry and 'omp' not in registry
+
+
+@pytest.mark.parametrize('entry, problem', [
+    ({'files': []}, 'no files'),
+    ({'files': ['x.ttl'], 'format': 'ttl'}, 'unknown format'),
+])
+def test_invalid_entries(tmp_path, entry, problem):
+    path = tmp_path / 'registry.json'
+    path.write_text(json.dumps({'ontologies': {'X': entry}}))
+    with pytest.raises(ValueError, match=problem):
+        OntologyRegistry.load(path, environ={})
+
+
+def test_shipped_registry():
+    registry = OntologyRegistry.load(DEFAULT_REGISTRY_PATH, environ={})
+    assert {'OMP', 'CHEBI', 'GO', 'MODELSEED'} <= set(registry)
+    assert registry.name_for_prefix('modelseed') == 'MODELSEED'
+
+
+def test_verifier_uses_per_ontology_cache(registry_path):
+    from ontology_cache import get_default_cache
+    from verify_term import OntologyVerifier
+    
+    verifier = OntologyVerifier(registry=OntologyRegistry.load(registry_path, environ={}))
+    assert verifier.cache_for('MODELSEED').cache_dir == registry_path.parent / 'seed-cache'
+    assert verifier.cache_for('OMP') is get_default_cache()
@@ -0,0 +1,29 @@
+import pytest
+
+from ontology_parser import OWLParser, TERM_FIELDS
+
+
+def _fields(terms):
+    return {term_id: tuple(getattr(term, field) for field in TERM_FIELDS) for term_id, term in terms.items()}
+
+
+def test_streaming_matches_tree(data_dir):
+    streamed = OWLParser(data_dir / 'chebi.owl').parse()
+    tree = OWLParser(data_dir / 'chebi.owl', streaming=False).parse()
+    assert list(streamed) == list(tree)
+    assert _fields(streamed) == _fields(tree)
+
+
+@pytest.mark.parametrize('streaming', [True, False])
+def test_class_annotations(data_dir, streaming):
+    terms = OWLParser(data_dir / 'chebi.owl', streaming=streaming).parse()
+    assert terms['CHEBI:16240'].parents == ('CHEBI:24431',)
+    assert terms['CHEBI:16240'].xrefs == ('KEGG:C00027',)
+    assert terms['CHEBI:16236'].definition == 'A primary alcohol.'
+    assert terms['CHEBI:16236'].relationships == (('part_of', 'CHEBI:24431'),)
+    # hasAlternativeId as a literal and as a resource
+    assert terms['CHEBI:17814'].alt_ids == ('CHEBI:9999',)
+    assert terms['CHEBI:16236'].alt_ids == ('CHEBI:8888',)
+    assert terms['CHEBI:17118'].is_obsolete
+    assert terms['CHEBI:17118'].replaced_by == ('CHEBI:17814',)
+
@@ -0,0 +1,70 @@
+from ontology_parser import (ALT_ID, CONSIDER, MAX_REDIRECT_HOPS, OBSOLETE, REPLACED_BY, OBOParser,
+                             OntologyTerm, Redirect, build_index, follow_redirects)
+
+
+def _lookup(*terms):
+    """lookup over terms that resolves alt_ids like OntologyIndex.resolve"""
+    by_id = {term.id: term for term in terms}
+    by_id.update({alt_id: term for term in terms for alt_id in term.alt_ids})
+    return by_id.get
+
+
+def test_current_and_unknown_ids():
+    lookup = _lookup(OntologyTerm('X:1'))
+    assert follow_redirects('X:1', lookup) is None
+    assert follow_redirects('X:404', lookup) is None
+
+
+def test_fixture_redirects(data_dir):
+    index = build_index(OBOParser(data_dir / 'omp.obo').parse())
+    assert index.redirect('OMP:0009999') == Redirect(ALT_ID, ('OMP:0000336',))
+    assert index.redirect('OMP:0001111') == Redirect(REPLACED_BY, ('OMP:0006023',))
+    assert index.redirect('OMP:0000173') is None
+
+
+def test_replaced_by_chain():
+    lookup = _lookup(
+        OntologyTerm('X:1', is_obsolete=True, replaced_by=['X:2']),
+        OntologyTerm('X:2', is_obsolete=True, replaced_by=['X:3']),
+        OntologyTerm('X:3', alt_ids=['X:9']),
+    )
+    assert follow_redirects('X:1', lookup) == Redirect(REPLACED_BY, ('X:3',))
+    assert follow_redirects('X:9', lookup) == Redirect(ALT_ID, ('X:3',))
+
+
+def test_alt_id_into_replaced_term():
+    # X:9 was merged into X:1, which was later replaced by X:2
+    lookup = _lookup(
+        OntologyTerm('X:1', is_obsolete=True, replaced_by=['X:2'], alt_ids=['X:9']),
+        OntologyTerm('X:2'),
+    )
+    assert follow_redirects('X:9', lookup) == Redirect(REPLACED_BY, ('X:2',))
+
+
+def test_chain_ending_in_consider():
+    lookup = _lookup(
+        OntologyTerm('X:1', is_obsolete=True, replaced_by=['X:2']),
+        OntologyTerm('X:2', is_obsolete=True, consider=['X:3', 'X:4']),
+    )
+    assert follow_redirects('X:1', lookup) == Redirect(CONSIDER, ('X:3', 'X:4'))
+
+
+def test_alt_id_of_dead_term_is_obsolete():
+    lookup = _lookup(OntologyTerm('X:1', is_obsolete=True, alt_ids=['X:2']))
+    assert follow_redirects('X:1', lookup) == Redirect(OBSOLETE, ())
+    assert follow_redirects('X:2', lookup) == Redirect(OBSOLETE, ())
+
+
+def test_cycle_and_long_chain_stop():
+    cycle = _lookup(
+        OntologyTerm('X:1', is_obsolete=True, replaced_by=['X:2']),
+        OntologyTerm('X:2', is_obsolete=True, replaced_by=['X:1']),
+    )
+    assert follow_redirects('X:1', cycle).kind == REPLACED_BY
+    
+    length = MAX_REDIRECT_HOPS * 2
+    chain = _lookup(*[OntologyTerm(f'X:{i}', is_obsolete=True, replaced_by=[f'X:{i + 1}'])
+                      for i in range(length)], OntologyTerm(f'X:{length}'))
+    redirect = follow_redirects('X:0', chain)
+    assert redirect.kind == REPLACED_BY
+    assert redirect.targets == (f'X:{MAX_REDIRECT_HOPS}',)
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from ontology_parser import OntologyTerm
+from rule_engine import DEFAULT_RULES_PATH, Rule, RuleEngine, TermUsage, build_usages
+
+
+def _rule(rule_id, **spec):
+    return Rule({'id': rule_id, 'message': '{term_id} ({name}) via ' + rule_id, **spec})
+
+
+NAME_RULES = [
+    _rule('acid', name='(?i)acid'),
+    _rule('d-form', name='^D-'),
+    _rule('verbose', name='(?x) uron  # a comment'),
+    _rule('doubled', name=r'(\w)\1'),
+    _rule('named', name=r'(?P<word>ose)\b'),
+]
+
+
+def test_default_rules_load():
+    engine = RuleEngine.load(DEFAULT_RULES_PATH)
+    with open(DEFAULT_RULES_PATH, encoding='utf-8') as f:
+        assert len(engine.rules) == len(json.load(f)['rules'])
+    assert all(rule.advice in engine.advice for rule in engine.rules if rule.advice)
+
+
+@pytest.mark.parametrize('name', ['D-galacturonic acid', 'ACID', 'glucose', 'aaron', 'D-', '', 'x\nacid'])
+def test_name_rules_match_every_pattern_on_its_own(name):
+    engine = RuleEngine(NAME_RULES)
+    expected = [rule.id for rule in NAME_RULES if rule.name_re.search(name)]
+    assert [rule.id for rule in engine.name_rules(name)] == expected
+
+
+def test_name_rules_are_indexed():
+    engine = RuleEngine(NAME_RULES)
+    # Back-references and named groups cannot share the combined regex
+    assert {rule.id for rule in engine._unindexed_names} == {'doubled', 'named'}
+    assert {rule.id for rule in engine._name_groups.values()} == {'acid', 'd-form', 'verbose'}
+    assert engine.name_rules('D-galacturonic acid') is engine.name_rules('D-galacturonic acid')
+
+
+def test_most_specific_rule_per_severity():
+    engine = RuleEngine([
+        _rule('any', prefix='*', severity='recommendation'),
+        _rule('by-name', name='phenotype'),
+        _rule('by-prefix', prefix='OMP', severity='warning'),
+        _rule('by-term', term='OMP:1', context='(?i)utiliz'),
+    ])
+    usage = TermUsage('OMP:1', 'verified', 'acid phenotype', lines=['no', 'Utilization of X'],
+                      line_numbers=[3, 7])
+    findings = engine.check([usage])
+    assert [(finding.rule.id, finding.line) for finding in findings] == [
+        ('by-term', 7), ('by-prefix', 3), ('any', 3)]
+    assert findings[0].message == 'OMP:1 (acid phenotype) via by-term'
+
+
+def test_selectors_and_filters():
+    engine = RuleEngine([
+        _rule('missing', prefix='GO', status='not_found'),
+        _rule('label', prefix='PATO', label='(?i)increased'),
+        _rule('absent', prefix='ECO', context_absent='PMID'),
+    ])
+    usages = [
+        TermUsage('GO:1', 'not_found', lines=['a'], line_numbers=[1]),
+        TermUsage('GO:2', 'verified', 'process', lines=['b'], line_numbers=[2]),
+        TermUsage('PATO:1', 'verified', 'increased', labels=['Increased size'], line_numbers=[3]),
+        TermUsage('PATO:2', 'verified', 'decreased', labels=['decreased'], line_numbers=[4]),
+        TermUsage('ECO:1', 'verified', 'evidence', lines=['ECO:1 PMID:5'], line_numbers=[5]),
+        TermUsage('ECO:2', 'verified', 'evidence', lines=['ECO:2 alone'], line_numbers=[6]),
+    ]
+    assert [(finding.curie, finding.line) for finding in engine.check(usages)] == [
+        ('GO:1', 1), ('PATO:1', 3), ('ECO:2', 6)]
+
+
+@pytest.mark.parametrize('spec, problem', [
+    ({'id': 'x', 'message': 'm'}, 'selector'),
+    ({'id': 'x', 'term': 'A:1', 'message': 'm', 'status': 'gone'}, 'status'),
+    ({'id': 'x', 'term': 'A:1', 'message': 'm', 'severity': 'fatal'}, 'severity'),
+])
+def test_invalid_rules(spec, problem):
+    with pytest.raises(ValueError, match=problem):
+        Rule(spec)
+
+
+def test_unknown_advice():
+    with pytest.raises(ValueError, match='advice'):
+        RuleEngine([_rule('x', term='A:1', advice='nowhere')])
+
+
+def test_build_usages():
+    lines = ['GO:1 here', 'GO:2 and X:9', 'GO:1 again']
+    terms = {'GO:1': OntologyTerm('GO:1', 'one'), 'GO:2': None}
+    usages = build_usages(lines, {'GO:1': [1, 3], 'GO:2': [2], 'X:9': [2]}, terms, {'GO:1': ['One']})
+    assert [(usage.term_id, usage.status, usage.name, usage.labels, usage.lines) for usage in usages] == [
+        ('GO:1', 'verified', 'one', ['One'], ['GO:1 here', 'GO:1 again']),
+        ('GO:2', 'not_found', '', [], ['GO:2 and X:9']),
+        ('X:9', 'unverified', '', [], ['GO:2 and X:9']),
+    ]
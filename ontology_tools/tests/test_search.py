@@ -0,0 +1,101 @@
+import math
+
+import pytest
+
+from ontology_parser import OntologyTerm, build_index
+from text_tokenizer import Tokenizer
+
+
+@pytest.fixture
+def index():
+    return build_index({term.id: term for term in [
+        OntologyTerm('CHEBI:1', 'formate', synonyms=['formic acid anion']),
+        OntologyTerm('CHEBI:2', 'isoleucine'),
+        OntologyTerm('CHEBI:3', 'theobromine'),
+        OntologyTerm('CHEBI:4', 'D-galacturonic acid'),
+        OntologyTerm('OMP:1', 'growth on formate as carbon source'),
+        OntologyTerm('OMP:2', 'salicin utilization'),
+    ]})
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('galactur', ['CHEBI:4']),
+    ('D-galac', ['CHEBI:4']),
+    ('form', ['CHEBI:1', 'OMP:1']),
+    ('carbon sou', ['OMP:1']),
+    ('growth on form', ['OMP:1']),
+    ('xyz', []),
+])
+def test_prefix(index, query, expected):
+    assert [term.id for term in index.search_prefix(query)] == expected
+
+
+@pytest.mark.parametrize('query, expected', [('for', 'CHEBI:1'), ('is', 'CHEBI:2'), ('the', 'CHEBI:3')])
+def test_prefix_that_is_a_stopword(index, query, expected):
+    assert [term.id for term in index.search_prefix(query)][:1] == [expected]
+
+
+def test_prefix_limit_prefers_short_names(index):
+    assert [term.id for term in index.search_prefix('form', limit=1)] == ['CHEBI:1']
+
+
+def test_split_prefix():
+    assert Tokenizer().split_prefix('growth on the') == (['growth'], 'the')
+    assert Tokenizer(stem=True).split_prefix('carbon sources') == (['carbon'], 'source')
+    assert Tokenizer().split_prefix('  ') == ([], '')
+
+
+def test_fuzzy(index):
+    results = index.search_fuzzy('salicn utilisation', max_distance=2)
+    assert [(term.id, distance) for term, distance in results] == [('OMP:2', 2)]
+    assert [term.id for term, _ in index.search_fuzzy('formate')] == ['CHEBI:1', 'OMP:1']
+    assert index.search_fuzzy('qqqqqq', max_distance=1) == []
+
+
+def test_fuzzy_distance_bound(index):
+    assert index.search_fuzzy('isolucine', max_distance=0) == []
+    assert [term.id for term, _ in index.search_fuzzy('isolucine', max_distance=1)] == ['CHEBI:2']
+
+
+@pytest.fixture
+def ranked_index():
+    return build_index({term.id: term for term in [
+        OntologyTerm('T:1', 'glucose utilization', definition='Growth on glucose as sole carbon source.'),
+        OntologyTerm('T:2', 'carbon source utilization', definition='Use of a carbon source.'),
+        OntologyTerm('T:3', 'lactose utilization', synonyms=['milk sugar utilization']),
+        OntologyTerm('T:4', 'acidophile', definition='Prefers low pH; glucose is fermented.'),
+        OntologyTerm('T:5', 'obsolete glucose phenotype', is_obsolete=True),
+    ]})
+
+
+def test_ranked_scores_descend(ranked_index):
+    results = ranked_index.search_ranked('glucose utilization')
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True) and all(score > 0 for score in scores)
+    assert 'T:5' not in {term.id for term, _ in results}
+
+
+def test_ranked_field_weights(ranked_index):
+    # A name hit outranks a definition hit for the same word
+    assert [term.id for term, _ in ranked_index.search_ranked('glucose')] == ['T:1', 'T:4']
+    assert [term.id for term, _ in ranked_index.search_ranked('sugar')] == ['T:3']
+
+
+def test_ranked_rare_words_count_more(ranked_index):
+    # 'lactose' occurs in one term, 'utilization' in three
+    assert [term.id for term, _ in ranked_index.search_ranked('lactose utilization', k=1)] == ['T:3']
+    assert ranked_index.search_ranked('utilization', k=2)[0][1] < \
+        ranked_index.search_ranked('lactose', k=1)[0][1]
+
+
+def test_ranked_bm25_score(ranked_index):
+    # One posting: idf * (k1 + 1) * f / (f + k1 * (1 - b + b * length / average length))
+    index = ranked_index
+    frequency = index.postings['acidophile']['T:4']
+    average = index.total_length / len(index.doc_lengths)
+    norm = index.BM25_K1 * (1 - index.BM25_B + index.BM25_B * index.doc_lengths['T:4'] / average)
+    idf = math.log(1 + (4 - 1 + 0.5) / (1 + 0.5))
+    expected = idf * (index.BM25_K1 + 1) * frequency / (frequency + norm)
+    (term, score), = index.search_ranked('acidophile')
+    assert term.id == 'T:4' and score == pytest.approx(expected)
+    assert index.search_ranked('nothing here') == []
@@ -0,0 +1,50 @@
+import pytest
+
+from ontology_parser import OBOParser, build_index
+
+np = pytest.importorskip('numpy')
+from similarity import SimilarityEngine  # noqa: E402
+
+
+@pytest.fixture
+def engine(data_dir):
+    return SimilarityEngine.for_index(build_index(OBOParser(data_dir / 'omp.obo').parse()))
+
+
+def test_lin_bounds(engine):
+    assert engine.similarity('OMP:0006023', 'OMP:0006023') == pytest.approx(1.0)
+    assert engine.similarity('OMP:0006023', 'OMP:0000173') > engine.similarity('OMP:0006023', 'OMP:0005009')
+    assert engine.similarity('OMP:0000000', 'OMP:0005009', 'resnik') == pytest.approx(
+        engine.information_content('OMP:0000000'))
+
+
+def test_rank_candidates(engine):
+    ranked = engine.rank_candidates(['OMP:0005009', 'OMP:0000173', 'OMP:4040404'], ['OMP:0006023'])
+    assert [term_id for term_id, _ in ranked] == ['OMP:0000173', 'OMP:0005009']
+    assert ranked[0][1] > ranked[1][1]
+    # Without known context the candidates keep their order
+    assert engine.rank_candidates(['OMP:0005009', 'OMP:0000173'], ['X:1']) == [
+        ('OMP:0005009', 0.0), ('OMP:0000173', 0.0)]
+
+
+def test_candidates_ranked_once_a_document_has_context(data_dir):
+    from batch_verify import _suggest_candidates
+    from verify_term import OntologyVerifier
+    
+    verifier = OntologyVerifier(lazy=True)
+    verifier.ontologies['OMP'] = index = build_index(OBOParser(data_dir / 'omp.obo').parse())
+    engines = {}
+    
+    # Nothing verified in OMP yet: candidates come back unranked
+    first = _suggest_candidates({'OMP:7777777': False}, {'OMP:7777777': ['utilization']},
+                                {}, verifier, use_server=False, engines=engines)
+    assert [c['score'] for c in first['OMP:7777777']] == [None] * len(first['OMP:7777777'])
+    assert engines == {}
+    
+    second = _suggest_candidates({'OMP:7777777': False, 'OMP:0006023': True},
+                                 {'OMP:7777777': ['phenotype']},
+                                 {'OMP:0006023': index.terms['OMP:0006023']},
+                                 verifier, use_server=False, engines=engines)
+    assert all(c['score'] is not None for c in second['OMP:7777777'])
+    assert second['OMP:7777777'][0]['term'] == 'OMP:0000173'
+    assert set(engines) == {'OMP'}
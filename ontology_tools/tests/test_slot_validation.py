@@ -0,0 +1,100 @@
+import pytest
+
+from ontology_parser import OntologyTerm
+
+pytest.importorskip('yaml')
+from slot_validation import SlotRuleEngine, yaml_blocks  # noqa: E402
+
+DOCUMENT = """# Example
+
+```yaml
+id: assoc-1
+predicate: RO:0002200
+evidence:
+  type: [ECO:0000006, GO:0008150]
+quality:
+  id: PATO:0000001
+  label: quality
+phenotype: OMP:0006023  # utilization of galacturonate
+publication:
+  - PMID:12345
+  - OMP:0000336
+```
+
+```yaml
+- id: assoc-2
+  taxon: NCBITaxon:562
+  evidence:
+    type:
+      - ECO:0000269  # experimental evidence
+      - ECO:0000006  # wrong label here
+```
+
+```yaml
+predicate: [unclosed
+```
+"""
+
+TERMS = {
+    'ECO:0000006': OntologyTerm('ECO:0000006', 'experimental evidence'),
+    'ECO:0000269': OntologyTerm('ECO:0000269', 'experimental evidence used in manual assertion'),
+    'PATO:0000001': OntologyTerm('PATO:0000001', 'quality'),
+    'OMP:0006023': OntologyTerm('OMP:0006023', 'utilization of galacturonate'),
+}
+
+
+@pytest.fixture
+def engine():
+    return SlotRuleEngine()
+
+
+@pytest.fixture
+def parsed(engine):
+    return engine.parse_document(DOCUMENT.splitlines(keepends=True))
+
+
+def _slots(values):
+    return [(value.line, value.slot, tuple(value.curies), value.label, value.association)
+            for value in values]
+
+
+def test_yaml_blocks():
+    blocks = list(yaml_blocks(DOCUMENT.splitlines(keepends=True)))
+    assert [first_line for first_line, _ in blocks] == [4, 18, 27]
+
+
+def test_list_items_take_the_slot_of_their_list(parsed):
+    values, findings = parsed
+    assert _slots(values) == [
+        (5, 'predicate', ('RO:0002200',), None, 'assoc-1'),
+        (7, 'evidence/type', ('ECO:0000006',), None, 'assoc-1'),
+        (7, 'evidence/type', ('GO:0008150',), None, 'assoc-1'),
+        (9, 'quality/id', ('PATO:0000001',), 'quality', 'assoc-1'),
+        (11, 'phenotype', ('OMP:0006023',), 'utilization of galacturonate', 'assoc-1'),
+        (13, 'publication', ('PMID:12345',), None, 'assoc-1'),
+        (14, 'publication', ('OMP:0000336',), None, 'assoc-1'),
+        (19, 'taxon', ('NCBITaxon:562',), None, 'assoc-2'),
+        (22, 'evidence/type', ('ECO:0000269',), 'experimental evidence', 'assoc-2'),
+        (23, 'evidence/type', ('ECO:0000006',), 'wrong label here', 'assoc-2'),
+    ]
+    # The unclosed flow sequence is reported where the parser gave up
+    assert [(finding.line, finding.slot) for finding in findings] == [(28, 'yaml')]
+
+
+def test_check(engine, parsed):
+    values, _ = parsed
+    findings = engine.check(values, TERMS)
+    assert [(finding.line, finding.curie) for finding in findings] == [
+        (7, 'GO:0008150'),
+        (14, 'OMP:0000336'),
+        (23, 'ECO:0000006'),
+    ]
+    assert 'expected ECO' in findings[0].message
+    assert "labelled 'wrong label here'" in findings[2].message
+
+
+def test_rule_for_prefers_the_longest_slot(engine):
+    assert engine.rule_for(('association', 'object', 'entity')).slot == 'object/entity'
+    assert engine.rule_for(('growth_medium', 'type')).slot == 'growth_medium/type'
+    assert engine.rule_for(('evidence', 'type')).prefixes == {'ECO'}
+    assert engine.rule_for(('type',)) is None
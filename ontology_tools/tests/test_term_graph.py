@@ -0,0 +1,51 @@
+import pytest
+
+from ontology_parser import OBOParser, OntologyTerm, build_index
+from term_graph import IS_A, PART_OF, TermGraph
+
+
+@pytest.fixture
+def index(data_dir):
+    return build_index(OBOParser(data_dir / 'omp.obo').parse())
+
+
+def test_closure(index):
+    assert index.ancestors('OMP:0006023') == ['OMP:0000000', 'OMP:0000173']
+    assert sorted(index.descendants('OMP:0000336')) == ['OMP:0005009']
+    assert index.is_descendant('OMP:0006023', 'OMP:0000000')
+    assert not index.is_descendant('OMP:0000000', 'OMP:0006023')
+    assert not index.is_descendant('OMP:0000173', 'OMP:0000173')
+
+
+def test_relations(index):
+    assert not index.is_descendant('OMP:0006023', 'OMP:0000336')
+    assert index.is_descendant('OMP:0006023', 'OMP:0000336', (IS_A, PART_OF))
+    assert index.graph.parents_of('OMP:0006023', PART_OF) == ['OMP:0000336']
+    assert sorted(index.descendants('OMP:0000336', (IS_A, PART_OF))) == ['OMP:0005009', 'OMP:0006023']
+
+
+def test_secondary_ids(index):
+    assert index.ancestors('OMP:0009999') == index.ancestors('OMP:0000336')
+    assert index.descendants('OMP:0009999') == ['OMP:0005009']
+    assert index.is_descendant('OMP:0005009', 'OMP:0009999')
+
+
+def test_unknown_ids(index):
+    assert index.ancestors('OMP:4040404') == []
+    assert not index.is_descendant('OMP:4040404', 'OMP:0000000')
+
+
+def test_diamond_and_imported_parents():
+    terms = {term.id: term for term in (
+        OntologyTerm('X:1'),
+        OntologyTerm('X:2', parents=['X:1']),
+        OntologyTerm('X:3', parents=['X:1', 'EXT:9']),
+        OntologyTerm('X:4', parents=['X:2', 'X:3']),
+    )}
+    graph = TermGraph.from_terms(terms)
+    # EXT:9 is not a term here but still gets a node
+    assert len(graph) == 5
+    assert sorted(graph.ancestors('X:4')) == ['EXT:9', 'X:1', 'X:2', 'X:3']
+    assert sorted(graph.descendants('X:1')) == ['X:2', 'X:3', 'X:4']
+    assert graph.is_descendant('X:4', 'EXT:9')
+    assert graph.edge_count(IS_A) == 5
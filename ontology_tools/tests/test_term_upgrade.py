@@ -0,0 +1,129 @@
+import io
+import os
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from ontology_parser import ALT_ID, CONSIDER, REPLACED_BY
+from term_upgrade import DiffWriter, plan_replacements, rewrite_line, upgrade_document
+
+
+def _apply(text, diff):
+    """Apply a unified diff of same-length hunks to text"""
+    lines = text.splitlines(keepends=True)
+    diff_lines = diff.splitlines(keepends=True)
+    assert diff_lines[0].startswith('--- ') and diff_lines[1].startswith('+++ ')
+    i = 2
+    while i < len(diff_lines):
+        start, length = map(int, re.match(r'@@ -(\d+),(\d+) \+\1,\2 @@', diff_lines[i]).groups())
+        i += 1
+        number = start - 1
+        while i < len(diff_lines) and not diff_lines[i].startswith('@@'):
+            line = diff_lines[i]
+            if i + 1 < len(diff_lines) and diff_lines[i + 1] == '\\ No newline at end of file\n':
+                line = line[:-1]
+                i += 1
+            if line[0] == ' ':
+                assert lines[number] == line[1:]
+                number += 1
+            elif line[0] == '-':
+                assert lines[number] == line[1:]
+            else:
+                lines[number] = line[1:]
+                number += 1
+            i += 1
+        assert number - start + 1 == length
+    return ''.join(lines)
+
+
+@pytest.mark.parametrize('changed, hunks', [
+    ({1}, 1),
+    ({1, 2, 20}, 2),
+    # Changes fewer than 2 * context unchanged lines apart share a hunk
+    ({3, 9}, 1),
+    ({3, 10}, 2),
+    ({40}, 1),
+])
+def test_diff_round_trip(changed, hunks):
+    old = [f'line {n}\n' for n in range(1, 41)]
+    old[-1] = 'line 40'
+    new = [line.replace('line', 'LINE') if n in changed else line for n, line in enumerate(old, 1)]
+    stream = io.StringIO()
+    writer = DiffWriter(stream, 'a/doc.md', 'b/doc.md')
+    for number, (a, b) in enumerate(zip(old, new), 1):
+        writer.line(number, a, b)
+    writer.close()
+    assert _apply(''.join(old), stream.getvalue()) == ''.join(new)
+    assert writer.hunks == hunks
+
+
+def test_rewrite_line_respects_boundaries():
+    line = 'OMP:0009999, OMP:00099990 and xOMP:0009999\n'
+    new, replaced = rewrite_line(line, {'OMP:0009999': 'OMP:0000336'})
+    assert new == 'OMP:0000336, OMP:00099990 and xOMP:0009999\n'
+    assert replaced == ['OMP:0009999']
+
+
+def test_plan_replacements():
+    definitions = {
+        'OMP:0009999': {'redirect': {'kind': ALT_ID, 'replacements': [{'term': 'OMP:0000336'}]}},
+        'OMP:0001111': {'redirect': {'kind': REPLACED_BY, 'replacements': [{'term': 'OMP:0006023'}]}},
+        'OMP:0002222': {'redirect': {'kind': CONSIDER, 'replacements': [{'term': 'OMP:0000173'}]}},
+        'OMP:0000173': {},
+    }
+    automatic, review = plan_replacements(definitions)
+    assert automatic == {'OMP:0009999': 'OMP:0000336', 'OMP:0001111': 'OMP:0006023'}
+    assert review == {'OMP:0002222': ['OMP:0000173']}
+
+
+def _document(tmp_path):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    path = docs / 'notes.md'
+    text = ''.join(f'filler {n}\n' for n in range(30))
+    text += 'Growth: OMP:0009999\n' + ''.join(f'more {n}\n' for n in range(10)) + 'Old: OMP:0001111 (OMP:0009999)'
+    path.write_text(text, encoding='utf-8')
+    lines = text.splitlines()
+    terms_with_lines = {term_id: [n for n, line in enumerate(lines, 1) if term_id in line]
+                        for term_id in ('OMP:0009999', 'OMP:0001111')}
+    return path, text, terms_with_lines
+
+
+def test_upgrade_in_place(tmp_path):
+    path, text, terms_with_lines = _document(tmp_path)
+    os.chmod(path, 0o640)
+    replacements = {'OMP:0009999': 'OMP:0000336', 'OMP:0001111': 'OMP:0006023'}
+    diff = io.StringIO()
+    result = upgrade_document(path, replacements, terms_with_lines, path, diff)
+    
+    assert result.replacements == 3
+    assert result.changed_lines == 2
+    assert result.counts == {('OMP:0009999', 'OMP:0000336'): 2, ('OMP:0001111', 'OMP:0006023'): 1}
+    assert path.read_text(encoding='utf-8') == text.replace('OMP:0009999', 'OMP:0000336').replace(
+        'OMP:0001111', 'OMP:0006023')
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert diff.getvalue().startswith('--- a/notes.md\n+++ b/notes.md\n')
+    assert _apply(text, diff.getvalue()) == path.read_text(encoding='utf-8')
+
+
+def test_dry_run_leaves_document(tmp_path):
+    path, text, terms_with_lines = _document(tmp_path)
+    result = upgrade_document(path, {'OMP:0009999': 'OMP:0000336'}, terms_with_lines)
+    assert result.replacements == 2
+    assert path.read_text(encoding='utf-8') == text
+    assert os.listdir(path.parent) == ['notes.md']
+
+
+@pytest.mark.skipif(shutil.which('patch') is None, reason='patch is not installed')
+def test_patch_undo(tmp_path):
+    path, text, terms_with_lines = _document(tmp_path)
+    patch_file = tmp_path / 'upgrade.patch'
+    with open(patch_file, 'w', encoding='utf-8') as diff:
+        upgrade_document(path, {'OMP:0009999': 'OMP:0000336'}, terms_with_lines, path, diff, base=tmp_path)
+    assert path.read_text(encoding='utf-8') != text
+    
+    with open(patch_file, 'rb') as diff:
+        subprocess.run(['patch', '-R', '-p1', '-s', '-d', str(tmp_path)], stdin=diff, check=True)
+    assert path.read_text(encoding='utf-8') == text
@@ -0,0 +1,45 @@
+import io
+import json
+from pathlib import Path
+
+from slot_validation import Finding
+from verification_records import RecordWriter, document_records, results_from_records
+
+
+def _result():
+    verification_results = {'OMP:0000173': True, 'OMP:0009999': True, 'OMP:1234567': False}
+    term_definitions = {
+        'OMP:0000173': {'name': 'carbon source utilization phenotype',
+                        'definition': 'A "utilization" phenotype for carbon.', 'obsolete': False},
+        'OMP:0009999': {'name': 'growth phenotype', 'definition': '', 'obsolete': False,
+                        'redirect': {'kind': 'alt_id',
+                                     'replacements': [{'term': 'OMP:0000336', 'name': 'growth phenotype'}]}},
+        'OMP:1234567': {'candidates': [{'term': 'OMP:0000336', 'name': 'growth phenotype', 'score': 0.5}]},
+    }
+    terms_with_lines = {'OMP:0000173': [3, 9], 'OMP:0009999': [4], 'OMP:1234567': [5], 'NCBITaxon:562': [2]}
+    findings = [Finding('error', 5, 'rule x', 'OMP:1234567', 'not found')]
+    return verification_results, term_definitions, terms_with_lines, findings
+
+
+def test_records_rebuild_result():
+    records = list(document_records(Path('doc.md'), _result()))
+    assert [record['type'] for record in records] == ['term'] * 5 + ['finding', 'document']
+    assert [record['line'] for record in records[:5]] == [2, 3, 4, 5, 9]
+    
+    rebuilt = results_from_records(records)[Path('doc.md')]
+    verification_results, term_definitions, terms_with_lines, findings = _result()
+    assert rebuilt[0] == verification_results
+    assert rebuilt[1] == term_definitions
+    assert rebuilt[2] == terms_with_lines
+    assert [(f.severity, f.line, f.curie) for f in rebuilt[3]] == [('error', 5, 'OMP:1234567')]
+
+
+def test_writer_summary():
+    stream = io.StringIO()
+    writer = RecordWriter(stream)
+    writer.write_all(document_records(Path('doc.md'), _result()))
+    summary = writer.summary()
+    assert len(stream.getvalue().splitlines()) == 7
+    assert json.loads(stream.getvalue().splitlines()[-1])['not_found'] == 1
+    assert (summary['terms'], summary['verified'], summary['not_found'], summary['unverified']) == (3, 2, 1, 1)
+    assert summary['occurrences'] == 5
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tokenizer shared by ontology indexing and querying.
+
+Text is lowercased and split into alphanumeric words, so trailing
+punctuation and parentheses never stick to a word. Hyphenated chemical
+names yield both the whole form and its parts ("D-galacturonic" gives
+"d-galacturonic", "d" and "galacturonic"). Stopwords are dropped and an
+optional light stemmer strips plural endings.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+STOPWORDS: FrozenSet[str] = frozenset("""
+    a an and any are as at be been by for from has have in into is it its
+    of on or such that the their them then there these this those to was
+    which with within without
+""".split())
+
+# Runs of letters/digits, optionally joined by hyphens
+_WORD_RE = re.compile(r"[^\W_]+(?:-[^\W_]+)*")
+
+
+@lru_cache(maxsize=65536)
+def light_stem(word: str) -> str:
+    """Strip English plural endings (the 'S' stemmer)"""
+    if len(word) <= 3 or not word.endswith('s'):
+        return word
+    if word.endswith('ies') and not word.endswith(('eies', 'aies')):
+        return word[:-3] + 'y'
+    if word.endswith('es') and not word.endswith(('aes', 'ees', 'oes')):
+        return word[:-1]
+    if word.endswith(('ss', 'us', 'is')):
+        return word
+    return word[:-1]
+
+
+class Tokenizer:
+    """Normalises text into index/query tokens"""
+    
+    def __init__(self, stem: bool = False, stopwords: Optional[Iterable[str]] = None):
+        self.stem = stem
+        self.stopwords = STOPWORDS if stopwords is None else frozenset(stopwords)
+    
+    def tokenize(self, text: str) -> List[str]:
+        """Split text into normalised tokens (duplicates are kept)"""
+        stopwords = self.stopwords
+        words = _WORD_RE.findall(text.lower())
+        tokens = [word for word in words if word not in stopwords]
+        if '-' in text:
+            for word in words:
+                if '-' in word:
+                    tokens.extend(part for part in word.split('-') if part not in stopwords)
+        if self.stem:
+            tokens = [light_stem(token) for token in tokens]
+        return tokens
+    
+    def split_prefix(self, text: str) -> Tuple[List[str], str]:
+        """Tokens of all but the last word, and the last word as typed
+        
+        For autocomplete the last word is a prefix still being typed, so it
+        is kept whole even if it is a stopword: 'for' may become 'formate'.
+        """
+        words = _WORD_RE.findall(text.lower())
+        if not words:
+            return [], ''
+        prefix = words[-1]
+        if self.stem:
+            prefix = light_stem(prefix)
+        return self.tokenize(' '.join(words[:-1])), prefix
+    
+    def config(self) -> Dict[str, object]:
+        """Settings needed to recreate this tokenizer"""
+        return {'stem': self.stem, 'stopwords': sorted(self.stopwords)}
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, object]) -> 'Tokenizer':
+        """Recreate a tokenizer from config()"""
+        return cls(stem=config['stem'], stopwords=config['stopwords'])
+
+
+DEFAULT_TOKENIZER = Tokenizer()
+
+
+if __name__ == "__main__":
+    import sys
+    
+    tokenizer = Tokenizer(stem='--stem' in sys.argv)
+    for text in (arg for arg in sys.argv[1:] if arg != '--stem'):
+        print(f"{text!r} -> {tokenizer.tokenize(text)}")
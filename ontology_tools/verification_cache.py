@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of term verification results and verified documents.
+
+Each result is stored with the content hash of the ontology file it was
+checked against, so editing or upgrading an ontology invalidates exactly
+the terms that belong to it. The last verified revision of each document
+is kept as well, letting batch_verify.py diff a new revision against it
+and re-read only the lines that changed.
+"""
+
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from ontology_parser import OntologyTerm
+from ontology_cache import get_default_cache
+
+
+# Bump whenever the layout of the stored results changes
+VERIFICATION_FORMAT = 5
+
+_MISSING = object()
+
+
+class VerificationCache:
+    """Term results keyed by (term ID, ontology version) plus per-document state"""
+    
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else get_default_cache().cache_dir / 'verification-results.pickle'
+        # term_id -> (ontology version, term or None)
+        self.results: Dict[str, Tuple[str, Optional[OntologyTerm]]] = {}
+        # resolved document path -> {'lines', 'terms_with_lines', 'sections'}
+        self.documents: Dict[str, Dict[str, object]] = {}
+        self._dirty = False
+        self._load()
+    
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return
+        if not isinstance(data, dict) or data.get('verification_format') != VERIFICATION_FORMAT:
+            return
+        self.results = data['results']
+        self.documents = data['documents']
+    
+    def save(self):
+        """Write the cache if anything changed, replacing the old file atomically"""
+        if not self._dirty:
+            return
+        data = {
+            'verification_format': VERIFICATION_FORMAT,
+            'results': self.results,
+            'documents': self.documents,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+    
+    def get(self, term_id: str, version: str, default: object = _MISSING) -> object:
+        """Cached result for a term at an ontology version, or default"""
+        cached = self.results.get(term_id)
+        if cached is None or cached[0] != version:
+            return default
+        return cached[1]
+    
+    def has(self, term_id: str, version: str) -> bool:
+        """True if the term was verified against this ontology version"""
+        return self.get(term_id, version) is not _MISSING
+    
+    def put(self, term_id: str, version: str, term: Optional[OntologyTerm]):
+        """Record a result, replacing any result from an older ontology version"""
+        self.results[term_id] = (version, term)
+        self._dirty = True
+    
+    def document(self, file_path: Path) -> Optional[Dict[str, object]]:
+        """State saved for the last verified revision of a document"""
+        return self.documents.get(str(Path(file_path).resolve()))
+    
+    def set_document(self, file_path: Path, lines: List[str],
+                     terms_with_lines: Dict[str, List[int]],
+                     sections: Dict[str, object]):
+        """Remember a document revision and its rendered report sections"""
+        self.documents[str(Path(file_path).resolve())] = {
+            'lines': lines,
+            'terms_with_lines': terms_with_lines,
+            'sections': sections,
+        }
+        self._dirty = True
+    
+    def clear(self):
+        """Forget all results and documents"""
+        self.results = {}
+        self.documents = {}
+        self._dirty = True
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Machine-readable verification results as a stream of JSON records.
+
+batch_verify.py --ndjson writes one JSON object per line as each document
+is finished, so downstream jobs can start consuming before the run ends:
+
+    {"type": "term", "document": "v6.md", "term": "OMP:0006023", "line": 57,
+     "verified": true, "obsolete": false, "name": "utilization of galacturonate",
+     "definition": "..."}
+    {"type": "finding", "document": "v6.md", "line": 57, "severity": "error",
+     "slot": "rule omp-acidophile", "term": "OMP:0005009", "message": "...",
+     "advice": "carbon-postcomposition"}
+    {"type": "document", "document": "v6.md", "terms": 37, "verified": 30, ...}
+    {"type": "summary", "documents": 3, "terms": 80, ...}
+
+A term record is written for every occurrence of a CURIE; "verified" is
+null when no ontology is configured for its prefix. Secondary and obsolete
+IDs carry a "redirect" object, e.g. {"kind": "replaced_by",
+"replacements": [{"term": "OMP:0006023", "name": "..."}]}, and null otherwise.
+A term that was not found may carry "candidates", replacements suggested
+from its label: [{"term": ..., "name": ..., "score": Lin similarity or
+null}]. The markdown reports are rendered from the same records (see
+results_from_records), and "verification_records.py report" re-renders
+them from a saved stream.
+"""
+
+import sys
+import json
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, IO, Iterable, Iterator, Optional, Tuple
+from slot_validation import Finding
+
+
+class RecordFinding(Finding):
+    """A Finding rebuilt from a record, keeping the rule's advice key"""
+    
+    __slots__ = ('advice',)
+    
+    def __init__(self, severity: str, line: int, slot: str, curie: Optional[str],
+                 message: str, advice: Optional[str] = None):
+        super().__init__(severity, line, slot, curie, message)
+        self.advice = advice
+
+
+def document_records(path: Path, result: Tuple) -> Iterator[Dict[str, object]]:
+    """Term, finding and document records for one verified document
+    
+    result is a (verification_results, term_definitions, terms_with_lines,
+    findings) tuple as produced by batch_verify.verify_documents.
+    """
+    verification_results, term_definitions, terms_with_lines, findings = result
+    document = str(path)
+    
+    occurrences = sorted((line, term_id) for term_id, lines in terms_with_lines.items()
+                         for line in lines)
+    for line, term_id in occurrences:
+        info = term_definitions.get(term_id, {})
+        yield {
+            'type': 'term',
+            'document': document,
+            'term': term_id,
+            'line': line,
+            'verified': verification_results.get(term_id),
+            'obsolete': info.get('obsolete', False),
+            'name': info.get('name', ''),
+            'definition': info.get('definition', ''),
+            'redirect': info.get('redirect'),
+            'candidates': info.get('candidates'),
+        }
+    
+    for finding in findings:
+        yield {
+            'type': 'finding',
+            'document': document,
+            'line': finding.line,
+            'severity': finding.severity,
+            'slot': finding.slot,
+            'term': finding.curie,
+            'message': finding.message,
+            'advice': getattr(finding, 'advice', None),
+        }
+    
+    verified = sum(1 for v in verification_results.values() if v)
+    yield {
+        'type': 'document',
+        'document': document,
+        'terms': len(verification_results),
+        'verified': verified,
+        'not_found': len(verification_results) - verified,
+        'obsolete': sum(1 for info in term_definitions.values() if info.get('obsolete')),
+        'redirected': sum(1 for info in term_definitions.values() if info.get('redirect')),
+        'unverified': len(terms_with_lines) - len(verification_results),
+        'occurrences': len(occurrences),
+        'errors': sum(1 for finding in findings if finding.severity == 'error'),
+        'warnings': sum(1 for finding in findings if finding.severity == 'warning'),
+    }
+
+
+def results_from_records(records: Iterable[Dict[str, object]]) -> Dict[Path, Tuple]:
+    """Rebuild per-document results (as verify_documents returns them) from records
+    
+    Summary records and record types added later are ignored.
+    """
+    results = {}
+    
+    def result_for(document: str) -> Tuple:
+        path = Path(document)
+        if path not in results:
+            results[path] = ({}, {}, defaultdict(list), [])
+        return results[path]
+    
+    for record in records:
+        kind = record.get('type')
+        if kind == 'term':
+            verification_results, term_definitions, terms_with_lines, _ = result_for(record['document'])
+            term_id = record['term']
+            terms_with_lines[term_id].append(record['line'])
+            if record['verified'] is None:
+                continue
+            verification_results[term_id] = record['verified']
+            if record['verified']:
+                term_definitions[term_id] = {'name': record['name'],
+                                             'definition': record.get('definition', ''),
+                                             'obsolete': record['obsolete']}
+                if record.get('redirect'):
+                    term_definitions[term_id]['redirect'] = record['redirect']
+            elif record.get('candidates'):
+                term_definitions[term_id] = {'candidates': record['candidates']}
+        elif kind == 'finding':
+            result_for(record['document'])[3].append(RecordFinding(
+                record['severity'], record['line'], record['slot'], record['term'],
+                record['message'], record.get('advice')))
+        elif kind == 'document':
+            result_for(record['document'])
+    
+    return {path: (verification_results, term_definitions, dict(terms_with_lines), findings)
+            for path, (verification_results, term_definitions, terms_with_lines, findings)
+            in results.items()}
+
+
+class RecordWriter:
+    """Writes records as NDJSON and tallies them for the run summary
+    
+    Only counters and the set of distinct terms are kept, so memory does
+    not grow with the number of occurrences written.
+    """
+    
+    def __init__(self, stream: Optional[IO[str]] = None):
+        self.stream = stream
+        self.documents = 0
+        self.occurrences = 0
+        self.status: Dict[str, Optional[bool]] = {}
+        self.obsolete = set()
+        self.findings: Dict[str, int] = defaultdict(int)
+    
+    def write(self, record: Dict[str, object]):
+        """Write one record and update the summary counters"""
+        kind = record['type']
+        if kind == 'term':
+            self.occurrences += 1
+            self.status[record['term']] = record['verified']
+            if record['obsolete']:
+                self.obsolete.add(record['term'])
+        elif kind == 'finding':
+            self.findings[record['severity']] += 1
+        elif kind == 'document':
+            self.documents += 1
+        if self.stream is not None:
+            self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+    
+    def write_all(self, records: Iterable[Dict[str, object]]):
+        """Write several records, then flush so consumers see them immediately"""
+        for record in records:
+            self.write(record)
+        self.flush()
+    
+    def flush(self):
+        if self.stream is not None:
+            self.stream.flush()
+    
+    def summary(self, elapsed: Optional[float] = None) -> Dict[str, object]:
+        """The run summary record"""
+        statuses = list(self.status.values())
+        summary = {
+            'type': 'summary',
+            'documents': self.documents,
+            'terms': sum(1 for status in statuses if status is not None),
+            'verified': sum(1 for status in statuses if status),
+            'not_found': sum(1 for status in statuses if status is False),
+            'obsolete': len(self.obsolete),
+            'unverified': sum(1 for status in statuses if status is None),
+            'occurrences': self.occurrences,
+            'findings': dict(self.findings),
+        }
+        if elapsed is not None:
+            summary['seconds'] = round(elapsed, 3)
+        return summary
+
+
+def read_records(file_path: str) -> Iterator[Dict[str, object]]:
+    """Stream records from an NDJSON file ('-' for stdin)"""
+    stream = sys.stdin if file_path == '-' else open(file_path, 'r', encoding='utf-8')
+    try:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def main():
+    """Render markdown reports or a summary from a saved record stream"""
+    parser = argparse.ArgumentParser(description='Work with NDJSON output of batch_verify.py --ndjson')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    report = subparsers.add_parser('report', help='Write the markdown report of every document in a stream')
+    report.add_argument('records', help='NDJSON file (- for stdin)')
+    report.add_argument('--output-dir', type=Path,
+                        help='Directory for the reports (default: next to each document)')
+    summary = subparsers.add_parser('summary', help='Print the JSON summary of a stream')
+    summary.add_argument('records', help='NDJSON file (- for stdin)')
+    
+    args = parser.parse_args()
+    
+    if args.command == 'summary':
+        writer = RecordWriter()
+        writer.write_all(record for record in read_records(args.records) if record['type'] != 'summary')
+        print(json.dumps(writer.summary(), indent=2))
+        return
+    
+    from batch_verify import generate_verification_report
+    for path, result in results_from_records(read_records(args.records)).items():
+        report_dir = args.output_dir or path.parent
+        report_path = report_dir / f"{path.stem}_verification_report.md"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(generate_verification_report(str(path), *result[:3], findings=result[3]))
+        print(f"{path} -> {report_path}")
+
+
+if __name__ == "__main__":
+    main()
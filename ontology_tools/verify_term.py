@@ -3,132 +3,460 @@
 Verify ontology terms and retrieve their definitions.
 """
 
-import sys
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, Dict, List
-from ontology_parser import parse_ontology, OntologyTerm, OntologyIndex
+from typing import Optional, Dict, List, Iterable, Set, Tuple
+from ontology_parser import (parse_ontology, build_index, pack_terms, unpack_terms, OntologyTerm,
+                            OntologyIndex, Redirect, follow_redirects, ALT_ID, REPLACED_BY, CONSIDER,
+                            OBSOLETE)
+from ontology_cache import OntologyCache, get_default_cache
+from ontology_registry import OntologyRegistry, get_default_registry
+from ontology_client import get_client
+from offset_index import OffsetIndex
+from bloom_filter import BloomFilter, FilterSet
+from term_graph import DEFAULT_RELATIONS
+
+
+# How each kind of redirect is introduced in reports
+REDIRECT_LABELS = {
+    ALT_ID: 'Use primary ID',
+    REPLACED_BY: 'Replaced by',
+    CONSIDER: 'Consider',
+}
+
+
+def _parse_term_columns(file_path: str, fmt: str) -> Tuple[Dict[str, list], float]:
+    """Worker for parallel loading: parse one ontology and return its term columns
+    
+    Columns of plain values pickle far more cheaply than a dictionary of
+    OntologyTerm objects, and leave the postings to be built once, in the
+    parent.
+    """
+    start = time.perf_counter()
+    terms = parse_ontology(file_path, use_cache=False, fmt=fmt)
+    return pack_terms(terms), time.perf_counter() - start
 
 
 class OntologyVerifier:
-    """Verify ontology terms against loaded ontologies"""
+    """Verify ontology terms against loaded ontologies
+    
+    In lazy mode nothing is parsed up front: an ontology is loaded the first
+    time a term with its prefix is verified. load_times records how long
+    each ontology that was actually loaded took.
+    
+    In quick mode an ontology that is not loaded is never parsed for a
+    lookup: the term's stanza is decoded straight from the file through a
+    byte-offset index (see offset_index.py), which resolves secondary IDs
+    too.
     
-    def __init__(self):
+    In both modes an ontology that is not in memory is first asked through
+    its cached Bloom filter (see bloom_filter.py), so most IDs it does not
+    hold are rejected without loading anything. Filters are written by the
+    parse cache; an ontology never loaded with the cache on has none yet.
+    """
+    
+    def __init__(self, use_cache: bool = True, lazy: bool = False, quick: bool = False,
+                 registry: Optional[OntologyRegistry] = None):
         self.ontologies: Dict[str, OntologyIndex] = {}
-        self.ontology_paths = {
-            'OMP': Path(__file__).parent.parent / 'ontologies' / 'omp.obo',
-            'MCO': Path(__file__).parent.parent / 'ontologies' / 'mco.obo',
-            'CHEBI': Path(__file__).parent.parent / 'ontologies' / 'chebi.owl',
-            'ECO': Path(__file__).parent.parent / 'ontologies' / 'eco.owl',
-            'ENVO': Path(__file__).parent.parent / 'ontologies' / 'envo.owl',
-            'GO': Path(__file__).parent.parent / 'ontologies' / 'go.owl',
-            'OBI': Path(__file__).parent.parent / 'ontologies' / 'obi-base.owl',
-            'PATO': Path(__file__).parent.parent / 'ontologies' / 'pato-base.owl',
-            'RO': Path(__file__).parent.parent / 'ontologies' / 'ro-base.owl',
-            'UO': Path(__file__).parent.parent / 'ontologies' / 'uo-base.owl',
-            'MODELSEED': Path(__file__).parent.parent / 'ontologies' / 'modelseed.owl'
-        }
-        
+        self.use_cache = use_cache
+        self.lazy = lazy
+        self.quick = quick
+        self.offset_indexes: Dict[str, Optional[OffsetIndex]] = {}
+        self.offset_times: Dict[str, float] = {}
+        self.load_times: Dict[str, float] = {}
+        self._attempted: Set[str] = set()
+        self.filters: Dict[str, Optional[BloomFilter]] = {}
+        self._filter_set: Optional[FilterSet] = None
+        self.registry = registry or get_default_registry()
+        self.ontology_paths: Dict[str, Path] = self.registry.paths()
+    
     def load_ontology(self, name: str, file_path: Optional[Path] = None):
         """Load an ontology file"""
+        self._attempted.add(name)
         if file_path is None:
             file_path = self.ontology_paths.get(name)
-            
+        
         if not file_path or not file_path.exists():
             print(f"Warning: Ontology file not found for {name}: {file_path}")
             return
-            
-        print(f"Loading {name} from {file_path}...")
-        terms = parse_ontology(str(file_path))
         
-        index = OntologyIndex()
-        index.add_terms(terms)
+        print(f"Loading {name} from {file_path}...")
+        start = time.perf_counter()
+        fmt = self._format(name, file_path)
+        if self.use_cache:
+            index = self.cache_for(name).load_index(file_path, fmt)
+        else:
+            index = build_index(parse_ontology(str(file_path), use_cache=False, fmt=fmt))
         self.ontologies[name] = index
+        self.load_times[name] = time.perf_counter() - start
+        
+        print(f"Loaded {len(index.terms)} terms from {name} in {self.load_times[name]:.2f}s")
+    
+    def _format(self, name: str, file_path: Path) -> str:
+        """Format of an ontology file: the registry's, unless the file was given explicitly"""
+        source = self.registry.source(name)
+        if source is not None and file_path == source.path:
+            return source.format
+        return file_path.suffix.lstrip('.')
+    
+    def cache_for(self, name: str) -> OntologyCache:
+        """Snapshot cache of one ontology: its own cache_dir in the registry, or the default"""
+        source = self.registry.source(name)
+        if source is None or source.cache_dir is None:
+            return get_default_cache()
+        return OntologyCache(source.cache_dir)
+    
+    def load_all(self, workers: int = 1):
+        """Load all configured ontologies, in parallel when workers > 1"""
+        self.load_many(self.ontology_paths, workers)
+    
+    def load_many(self, names: Iterable[str], workers: int = 1):
+        """Load several ontologies, parsing them in a process pool when workers > 1
         
-        print(f"Loaded {len(terms)} terms from {name}")
+        Ontologies with a current snapshot are loaded from it here; only the
+        ones that need parsing go to the pool, whose workers return term
+        columns. The index, snapshot and Bloom filter are then built here.
+        """
+        names = [name for name in names if name not in self.ontologies]
+        if workers <= 1 or len(names) <= 1:
+            for name in names:
+                self.load_ontology(name)
+            return
         
-    def load_all(self):
-        """Load all configured ontologies"""
-        for name in self.ontology_paths:
+        pending = {}
+        for name in names:
+            file_path = self.ontology_paths.get(name)
+            if not file_path or not file_path.exists():
+                self._attempted.add(name)
+                print(f"Warning: Ontology file not found for {name}: {file_path}")
+            elif self.use_cache and self.cache_for(name).is_cached(file_path):
+                self.load_ontology(name)
+            else:
+                self._attempted.add(name)
+                pending[name] = file_path
+        if not pending:
+            return
+        
+        # Largest files first so the longest parses start immediately
+        order = sorted(pending, key=lambda name: pending[name].stat().st_size, reverse=True)
+        workers = min(workers, len(order))
+        print(f"Loading {len(order)} ontologies with {workers} worker processes...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_parse_term_columns, str(pending[name]), self._format(name, pending[name])): name
+                for name in order
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                columns, seconds = future.result()
+                start = time.perf_counter()
+                index = build_index(unpack_terms(columns))
+                if self.use_cache:
+                    self.cache_for(name).store_index(pending[name], index)
+                self.ontologies[name] = index
+                self.load_times[name] = seconds + time.perf_counter() - start
+                print(f"Loaded {len(index.terms)} terms from {name} in {self.load_times[name]:.2f}s")
+    
+    def preload(self, names: Iterable[str], workers: int = 1):
+        """Load the named ontologies now, e.g. for long-running processes"""
+        names = [name for name in names if name not in self._attempted]
+        self.load_many(names, workers)
+    
+    def ontology_for_prefix(self, prefix: str) -> Optional[str]:
+        """Name of the registered ontology that owns a CURIE prefix"""
+        return self.registry.name_for_prefix(prefix)
+    
+    def ensure_loaded(self, name: str) -> Optional[OntologyIndex]:
+        """Return the index for an ontology, loading it on first use"""
+        if name not in self.ontologies and name not in self._attempted:
             self.load_ontology(name)
+        return self.ontologies.get(name)
+    
+    def offset_index(self, name: str) -> Optional[OffsetIndex]:
+        """Return the byte-offset index for an ontology, building it on first use"""
+        if name not in self.offset_indexes:
+            file_path = self.ontology_paths.get(name)
+            if not file_path or not file_path.exists():
+                print(f"Warning: Ontology file not found for {name}: {file_path}")
+                self.offset_indexes[name] = None
+            else:
+                start = time.perf_counter()
+                fmt = self._format(name, file_path)
+                index = (OffsetIndex.load(file_path, self.cache_for(name), fmt) if self.use_cache
+                         else OffsetIndex.build(file_path, fmt))
+                self.offset_indexes[name] = index
+                self.offset_times[name] = time.perf_counter() - start
+        return self.offset_indexes[name]
+    
+    def term_filter(self, name: str) -> Optional[BloomFilter]:
+        """Cached Bloom filter of an ontology's IDs, or None if none is stored"""
+        if name not in self.filters:
+            file_path = self.ontology_paths.get(name)
+            bloom = None
+            if self.use_cache and file_path and file_path.exists():
+                bloom = self.cache_for(name).load_filter(file_path)
+            self.filters[name] = bloom
+        return self.filters[name]
+    
+    def filter_set(self) -> FilterSet:
+        """Combined filter over every registered ontology with a stored filter"""
+        if self._filter_set is None:
+            filters = {name: self.term_filter(name) for name in self.ontology_paths}
+            self._filter_set = FilterSet({name: bloom for name, bloom in filters.items() if bloom})
+        return self._filter_set
+    
+    def _unloaded_filter(self, name: str) -> Optional[BloomFilter]:
+        """Filter to consult before a lookup that would have to load something"""
+        if not (self.lazy or self.quick) or name in self.ontologies or name in self.offset_indexes:
+            return None
+        return self.term_filter(name)
+    
+    def format_filter_report(self) -> str:
+        """Lookups the Bloom filters answered and how often they let an absent ID through"""
+        lines = ["Bloom filters:"]
+        for name, bloom in self.filters.items():
+            if bloom is None or not bloom.queries:
+                continue
+            lines.append(f"  {name:<10} {bloom.queries} queries, {bloom.rejected} lookups avoided, "
+                         f"{bloom.false_positives} false positives "
+                         f"(observed {bloom.observed_fp_rate:.1%}, expected {bloom.expected_fp_rate:.1%})")
+        if self._filter_set is not None and self._filter_set.queries:
+            lines.append(f"  Unregistered prefixes: {self._filter_set.queries} queries, "
+                         f"{self._filter_set.rejected} absent from all {len(self._filter_set)} filters")
+        return '\n'.join(lines) if len(lines) > 1 else ''
+    
+    def format_load_report(self) -> str:
+        """Summarise which ontologies were loaded and how long each took"""
+        lines = [f"Loaded {len(self.load_times)}/{len(self.ontology_paths)} ontologies:"]
+        for name, seconds in sorted(self.load_times.items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<10} {seconds:8.2f}s  ({len(self.ontologies[name].terms)} terms)")
+        for name, seconds in sorted(self.offset_times.items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<10} {seconds:8.2f}s  ({len(self.offset_indexes[name])} term offsets)")
+        skipped = [name for name in self.ontology_paths
+                   if name not in self.load_times and name not in self.offset_times]
+        if skipped:
+            lines.append(f"  Not loaded: {', '.join(skipped)}")
+        total = sum(self.load_times.values()) + sum(self.offset_times.values())
+        lines.append(f"  Summed load time: {total:.2f}s")
+        filter_report = self.format_filter_report()
+        if filter_report:
+            lines.append(filter_report)
+        return '\n'.join(lines)
     
     def verify_term(self, term_id: str) -> Optional[OntologyTerm]:
-        """Verify if a term exists in any loaded ontology"""
-        # Extract ontology prefix
-        if ':' in term_id:
-            prefix = term_id.split(':')[0]
-            
-            # Check specific ontology
-            if prefix in self.ontologies:
-                term = self.ontologies[prefix].get_term(term_id)
-                if term:
-                    return term
-                    
-        # Check all ontologies
-        for name, index in self.ontologies.items():
-            term = index.get_term(term_id)
+        """Verify if a term exists in the ontology registered for its prefix
+        
+        A term whose prefix is registered is looked up in that ontology only;
+        other IDs are looked for in every loaded ontology and, in lazy or
+        quick mode, in those not yet loaded whose Bloom filter may hold them.
+        """
+        prefix, colon, _ = term_id.partition(':')
+        name = self.ontology_for_prefix(prefix) if colon else None
+        if name is not None:
+            bloom = self._unloaded_filter(name)
+            if bloom is not None and not bloom.might_contain(term_id):
+                return None
+            term = self._lookup(name, term_id)
+            if term is None and bloom is not None:
+                bloom.false_positives += 1
+            return term
+        
+        # In-memory indexes are probed directly: a dict lookup is cheaper than hashing
+        candidates = self.filter_set().candidates(term_id) if self.lazy or self.quick else ()
+        for name in self.ontology_paths:
+            if name in self.ontologies:
+                term = self.ontologies[name].resolve(term_id)
+            elif name in candidates:
+                term = self._lookup(name, term_id)
+                if term is None:
+                    self.filters[name].false_positives += 1
+            else:
+                continue
             if term:
                 return term
-                
+        
         return None
     
+    def _lookup(self, name: str, term_id: str) -> Optional[OntologyTerm]:
+        """Look a term up in one ontology, loading it or its offset index as the mode allows"""
+        if self.quick and name not in self.ontologies:
+            offsets = self.offset_index(name)
+            return offsets.get_term(term_id) if offsets else None
+        index = self.ensure_loaded(name) if self.lazy else self.ontologies.get(name)
+        # A secondary ID resolves to its primary term
+        return index.resolve(term_id) if index else None
+    
+    def verify_terms(self, term_ids: Iterable[str]) -> Dict[str, Optional[OntologyTerm]]:
+        """Verify several terms at once"""
+        return {term_id: self.verify_term(term_id) for term_id in term_ids}
+    
+    def index_for_term(self, term_id: str) -> Optional[OntologyIndex]:
+        """Index of the ontology owning a term's prefix, loading it in lazy mode"""
+        name = self.ontology_for_prefix(term_id.split(':')[0])
+        if name is None:
+            return None
+        return self.ensure_loaded(name) if self.lazy else self.ontologies.get(name)
+    
+    def get_redirect(self, term_id: str) -> Optional[Redirect]:
+        """Current replacement for a secondary or obsolete ID (None if the ID is current)"""
+        name = self.ontology_for_prefix(term_id.split(':')[0])
+        if name and self.quick and name not in self.ontologies:
+            offsets = self.offset_index(name)
+            return follow_redirects(term_id, offsets.get_term) if offsets else None
+        index = self.index_for_term(term_id)
+        return index.redirect(term_id) if index else None
+    
+    def get_ancestors(self, term_id: str, relations: Iterable[str] = DEFAULT_RELATIONS) -> List[str]:
+        """Every ancestor of a term within its own ontology"""
+        index = self.index_for_term(term_id)
+        return index.ancestors(term_id, relations) if index else []
+    
+    def get_descendants(self, term_id: str, relations: Iterable[str] = DEFAULT_RELATIONS) -> List[str]:
+        """Every descendant of a term within its own ontology"""
+        index = self.index_for_term(term_id)
+        return index.descendants(term_id, relations) if index else []
+    
+    def is_descendant(self, term_id: str, ancestor_id: str,
+                      relations: Iterable[str] = DEFAULT_RELATIONS) -> bool:
+        """True if ancestor_id subsumes term_id, e.g. a specific phenotype under a class"""
+        index = self.index_for_term(term_id)
+        return index.is_descendant(term_id, ancestor_id, relations) if index else False
+    
+    def get_xref_mapping(self, term_id: str, target: str, source_prefix: Optional[str] = None) -> List[str]:
+        """Get IDs of terms in the target ontology that cross-reference term_id
+        
+        source_prefix is applied when term_id is a bare local ID such as '123'.
+        """
+        if self.lazy:
+            self.ensure_loaded(target)
+        if target not in self.ontologies:
+            return []
+        return self.ontologies[target].find_by_xref(term_id, default_prefix=source_prefix)
+    
     def get_chebi_modelseed_mapping(self, chebi_id: str) -> List[str]:
         """Get ModelSEED IDs that map to a CHEBI ID"""
-        if 'MODELSEED' not in self.ontologies:
-            return []
-            
-        modelseed_ids = []
-        modelseed_index = self.ontologies['MODELSEED']
-        
-        # Search through all ModelSEED terms for CHEBI xrefs
-        for term_id, term in modelseed_index.terms.items():
-            # Check if this ModelSEED term has the CHEBI ID as xref
-            if chebi_id in term.xrefs or f"CHEBI:{chebi_id}" in term.xrefs:
-                modelseed_ids.append(term_id)
-                
-        return modelseed_ids
-    
-    def format_verification_result(self, term_id: str, term: Optional[OntologyTerm]) -> str:
-        """Format verification result for display"""
+        return self.get_xref_mapping(chebi_id, 'MODELSEED', source_prefix='CHEBI')
+    
+    def format_verification_result(self, term_id: str, term: Optional[OntologyTerm], lookup=None) -> str:
+        """Format verification result for display
+        
+        Replacements of secondary and obsolete IDs are followed through
+        lookup when one is given (e.g. an OntologyClient), so nothing is
+        loaded locally while a server answers the queries.
+        """
         if term is None:
             return f"❌ {term_id}: NOT FOUND"
         
         result = f"✅ {term_id}: {term.name}"
+        if term.id != term_id:
+            result += f"\n   ⚠️  Secondary ID of {term.id}"
         if term.definition:
             result += f"\n   Definition: {term.definition}"
         if term.is_obsolete:
             result += "\n   ⚠️  WARNING: This term is obsolete"
+        redirect = None
+        if term.is_obsolete or term.id != term_id:
+            redirect = (follow_redirects(term_id, lookup.verify_term) if lookup is not None
+                        else self.get_redirect(term_id))
+        if redirect and redirect.targets and redirect.kind != ALT_ID:
+            result += f"\n   {REDIRECT_LABELS[redirect.kind]}: {', '.join(redirect.targets)}"
+        elif redirect and redirect.kind == OBSOLETE:
+            result += "\n   No replacement given"
         if term.xrefs:
             result += f"\n   Cross-references: {', '.join(term.xrefs[:5])}"
             if len(term.xrefs) > 5:
                 result += f" ... and {len(term.xrefs) - 5} more"
-                
+        
         return result
 
 
 def main():
     """Main verification function"""
-    if len(sys.argv) < 2:
-        print("Usage: verify_term.py <term_id> [<term_id> ...]")
-        print("Example: verify_term.py OMP:0005009 MCO:0000031")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description='Verify ontology terms',
+        epilog='Example: verify_term.py OMP:0005009 MCO:0000031')
+    parser.add_argument('term_ids', nargs='+', metavar='term_id',
+                       help='Term IDs to verify')
+    parser.add_argument('--eager', action='store_true',
+                       help='Load every configured ontology up front instead of on demand')
+    parser.add_argument('--preload', default='',
+                       help='Comma-separated ontologies to load before verifying (e.g. CHEBI,GO)')
+    parser.add_argument('--workers', '-j', type=int, default=1,
+                       help='Worker processes for loading several ontologies at once '
+                            f'(this host has {os.cpu_count()} CPUs)')
+    parser.add_argument('--quick', action='store_true',
+                       help='Decode single terms straight from the files via a byte-offset index '
+                            'instead of loading whole ontologies')
+    parser.add_argument('--timings', action='store_true',
+                       help='Report which ontologies were loaded and how long each took')
+    parser.add_argument('--no-server', action='store_true',
+                       help='Load ontologies locally even if an ontology server is running')
+    parser.add_argument('--ancestors', action='store_true',
+                       help='List every ancestor of each term')
+    parser.add_argument('--descendants', action='store_true',
+                       help='List every descendant of each term')
+    parser.add_argument('--is-a', metavar='ANCESTOR',
+                       help='Check whether each term is subsumed by ANCESTOR (e.g. OMP:0000173)')
+    parser.add_argument('--relations', default=','.join(DEFAULT_RELATIONS),
+                       help='Comma-separated relations followed by hierarchy queries '
+                            '(default: is_a; e.g. is_a,part_of)')
     
-    verifier = OntologyVerifier()
-    verifier.load_all()
+    args = parser.parse_args()
+    relations = [relation.strip() for relation in args.relations.split(',') if relation.strip()]
+    
+    verifier = OntologyVerifier(lazy=not args.eager, quick=args.quick and not args.eager)
+    # A running ontology_server.py already has everything in memory
+    client = None if args.no_server else get_client()
+    if client:
+        print(f"Using ontology server at {client.url}")
+        lookup = client
+    else:
+        lookup = verifier
+        if args.eager:
+            verifier.load_all(workers=args.workers)
+        else:
+            verifier.preload((name.strip().upper() for name in args.preload.split(',') if name.strip()),
+                             workers=args.workers)
     
     print("\nVerification Results:")
     print("=" * 60)
     
-    for term_id in sys.argv[1:]:
-        term = verifier.verify_term(term_id)
-        print(verifier.format_verification_result(term_id, term))
+    terms = lookup.verify_terms(args.term_ids)
+    for term_id in args.term_ids:
+        term = terms[term_id]
+        print(verifier.format_verification_result(term_id, term, client))
         
         # If it's a CHEBI term, also check ModelSEED mappings
         if term_id.startswith('CHEBI:'):
-            modelseed_ids = verifier.get_chebi_modelseed_mapping(term_id)
+            modelseed_ids = lookup.get_chebi_modelseed_mapping(term_id)
             if modelseed_ids:
                 print(f"   ModelSEED mappings: {', '.join(modelseed_ids)}")
         
+        if term and args.is_a:
+            verdict = 'is' if lookup.is_descendant(term_id, args.is_a, relations) else 'is NOT'
+            print(f"   {term_id} {verdict} a descendant of {args.is_a} ({', '.join(relations)})")
+        if term and args.ancestors:
+            ancestors = lookup.get_ancestors(term_id, relations)
+            print(f"   Ancestors ({len(ancestors)}): {', '.join(ancestors) or '-'}")
+        if term and args.descendants:
+            descendants = lookup.get_descendants(term_id, relations)
+            shown = ', '.join(descendants[:20]) or '-'
+            if len(descendants) > 20:
+                shown += f" ... and {len(descendants) - 20} more"
+            print(f"   Descendants ({len(descendants)}): {shown}")
+        
         print()
+    
+    if args.timings:
+        if client:
+            stats = client.stats()
+            print(f"Served by {client.url}: {len(stats['loaded'])} ontologies in memory, "
+                  f"{stats['requests']} requests so far")
+        else:
+            print(verifier.format_load_report())
 
 
 if __name__ == "__main__":
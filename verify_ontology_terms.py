@@ -3,8 +3,16 @@
 
 import re
 import os
+import json
+import mmap
+import sys
+import time
+import argparse
 from collections import defaultdict
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ontology_tools'))
+from ontology_registry import OntologyRegistry
+
 # All unique ontology terms from the v5 report
 terms = {
     'CHEBI': ['16240', '17118', '17814', '30849', '33830', '50505', '506227'],
@@ -20,70 +28,115 @@ terms = {
     'UO': ['0000027']
 }
 
-# Mapping of ontology prefixes to file names
-ontology_files = {
-    'CHEBI': 'chebi.owl',
-    'ECO': 'eco.owl',
-    'ENVO': 'envo.owl',
-    'GO': 'go.owl',
-    'MCO': ['mco.obo', 'mco.owl'],  # Check both formats
-    'OBI': 'obi-base.owl',
-    'OMP': ['omp.obo', 'omp.owl'],  # Check both formats
-    'PATO': 'pato-base.owl',
-    'RO': 'ro-base.owl',
-    'UO': 'uo-base.owl'
-}
-
-base_path = '/Users/jplfaria/repos/play/ontologies'
+# Ontology files per prefix come from the shared registry (ontology_tools/ontology_registry.json)
+registry = OntologyRegistry.load()
 results = defaultdict(lambda: {'found': [], 'not_found': []})
+scan_stats = []
 
-def check_term_in_file(filepath, prefix, term_id):
-    """Check if a term exists in an ontology file."""
-    full_term = f"{prefix}:{term_id}"
-    # Also check underscore format for OBO files
-    alt_term = f"{prefix}_{term_id}"
+
+def load_terms_file(path):
+    """Read the terms to check from a file.
     
-    try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-            if full_term in content or alt_term in content:
-                return True
-    except Exception as e:
-        print(f"Error reading {filepath}: {e}")
-    return False
+    JSON files map prefixes to lists of local IDs (the same shape as the
+    built-in `terms` dict); any other file is searched for CURIEs such as
+    GO:0008150.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if path.endswith('.json'):
+        return {prefix: [str(t) for t in ids] for prefix, ids in json.loads(content).items()}
+    loaded = defaultdict(list)
+    for prefix, term_id in re.findall(r'\b([A-Za-z][A-Za-z0-9]*):([0-9]+)\b', content):
+        if term_id not in loaded[prefix]:
+            loaded[prefix].append(term_id)
+    return dict(loaded)
+
+
+def scan_file(filepath, wanted):
+    """Find many terms in one pass over an ontology file.
+    
+    `wanted` maps prefixes to sets of local IDs. The file is memory-mapped
+    and a single compiled pattern matches every PREFIX:ID / PREFIX_ID
+    occurrence for the wanted prefixes; each hit is checked against the
+    wanted sets, and the scan stops as soon as everything has been seen.
+    Returns the found {prefix: set(ids)} and the number of bytes scanned.
+    """
+    remaining = sum(len(ids) for ids in wanted.values())
+    found = defaultdict(set)
+    size = os.path.getsize(filepath)
+    if remaining == 0 or size == 0:
+        return found, 0
+    
+    prefixes = b'|'.join(re.escape(p.encode('ascii')) for p in sorted(wanted, key=len, reverse=True))
+    pattern = re.compile(rb'(?<![A-Za-z0-9])(' + prefixes + rb')[:_]([A-Za-z0-9]+)(?![A-Za-z0-9])')
+    wanted_bytes = {p.encode('ascii'): {t.encode('ascii') for t in ids} for p, ids in wanted.items()}
+    
+    scanned = size
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for match in pattern.finditer(data):
+            prefix, term_id = match.group(1), match.group(2)
+            ids = wanted_bytes[prefix]
+            if term_id in ids:
+                ids.discard(term_id)
+                found[prefix.decode('ascii')].add(term_id.decode('ascii'))
+                remaining -= 1
+                if remaining == 0:
+                    scanned = match.end()
+                    break
+    return found, scanned
+
 
 def verify_terms():
-    """Verify all terms against their ontology files."""
+    """Verify all terms against their ontology files, reading each file once."""
     
-    # Skip NCBITaxon as we don't have that file
+    # Group pending terms by the file that should contain them
+    pending = {}
     for prefix, term_list in terms.items():
         if prefix == 'NCBITaxon':
             print(f"\nSkipping {prefix} - no local ontology file")
             continue
-            
-        print(f"\nChecking {prefix} terms...")
         
-        if prefix not in ontology_files:
+        if registry.source(prefix) is None:
             print(f"  WARNING: No ontology file mapping for {prefix}")
             continue
-            
-        files = ontology_files[prefix]
-        if not isinstance(files, list):
-            files = [files]
-            
+        
+        pending[prefix] = set(term_list)
+    
+    # Files listed as alternatives are tried in order for whatever is still missing
+    max_alternatives = max((len(registry.source(prefix).files) for prefix in pending), default=1)
+    for alternative in range(max_alternatives):
+        by_file = defaultdict(dict)
+        for prefix, remaining in pending.items():
+            files = registry.source(prefix).files
+            if remaining and alternative < len(files):
+                by_file[str(files[alternative])][prefix] = set(remaining)
+        
+        for filepath, wanted in sorted(by_file.items()):
+            filename = os.path.basename(filepath)
+            if not os.path.exists(filepath):
+                continue
+            print(f"\nScanning {filename} for {sum(len(ids) for ids in wanted.values())} terms "
+                  f"({', '.join(sorted(wanted))})...")
+            start = time.perf_counter()
+            try:
+                found, scanned = scan_file(filepath, wanted)
+            except (OSError, ValueError) as e:
+                print(f"Error reading {filepath}: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            scan_stats.append((filename, scanned, elapsed))
+            for prefix, ids in found.items():
+                pending[prefix] -= ids
+    
+    for prefix, term_list in terms.items():
+        if prefix not in pending:
+            continue
         for term_id in term_list:
-            found = False
-            for filename in files:
-                filepath = os.path.join(base_path, filename)
-                if os.path.exists(filepath):
-                    if check_term_in_file(filepath, prefix, term_id):
-                        results[prefix]['found'].append(term_id)
-                        found = True
-                        break
-            
-            if not found:
+            if term_id in pending[prefix]:
                 results[prefix]['not_found'].append(term_id)
                 print(f"  ❌ {prefix}:{term_id} - NOT FOUND")
+            else:
+                results[prefix]['found'].append(term_id)
 
 def print_summary():
     """Print summary of verification results."""
@@ -119,6 +172,16 @@ def print_summary():
     print(f"TOTAL: {total_found} found, {total_not_found} not found")
     print(f"{'='*60}")
     
+    if scan_stats:
+        total_bytes = sum(scanned for _, scanned, _ in scan_stats)
+        total_time = sum(elapsed for _, _, elapsed in scan_stats)
+        print("\nSCAN METRICS")
+        print("-" * 40)
+        for filename, scanned, elapsed in scan_stats:
+            rate = scanned / elapsed / 1e6 if elapsed else 0.0
+            print(f"  {filename:<16} {scanned / 1e6:10.1f} MB in {elapsed:6.2f}s ({rate:.0f} MB/s)")
+        print(f"  {'total':<16} {total_bytes / 1e6:10.1f} MB in {total_time:6.2f}s")
+    
     # Special analysis for ENVO:01001059
     print("\nSPECIAL ANALYSIS: ENVO:01001059")
     print("-" * 40)
@@ -128,7 +191,7 @@ def print_summary():
     
     # Search for correct culture medium terms
     print("\nSearching for correct 'culture medium' terms in ENVO...")
-    envo_file = os.path.join(base_path, 'envo.owl')
+    envo_file = str(registry.source('ENVO').path) if registry.source('ENVO') else ''
     if os.path.exists(envo_file):
         with open(envo_file, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
@@ -140,5 +203,19 @@ def print_summary():
                     print(f"  - {term}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check that ontology terms exist in local ontology files')
+    parser.add_argument('--terms-file', help='JSON {prefix: [ids]} or any text file containing CURIEs '
+                                             '(default: the built-in v5 term list)')
+    parser.add_argument('--ontology-dir', help='Directory holding the ontology files '
+                                               '(default: the registry\'s, or $ONTOLOGY_DIR)')
+    args = parser.parse_args()
+    
+    if args.ontology_dir:
+        registry = OntologyRegistry.load(ontology_dir=args.ontology_dir)
+    if args.terms_file:
+        terms = load_terms_file(args.terms_file)
+    
+    start = time.perf_counter()
     verify_terms()
-    print_summary()
\ No newline at end of file
+    print_summary()
+    print(f"\nWall-clock time: {time.perf_counter() - start:.2f}s")
\ No newline at end of file